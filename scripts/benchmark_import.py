@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Import time benchmark.
+
+Times, in fresh interpreters, `import sgtpolicysdk`, the creation of a DNACenterSGTPolicyAPI of one release
+(without connecting) and the import of the API wrappers of every release, which is what importing the package
+used to cost.
+
+Usage:
+    python scripts/benchmark_import.py [--runs 10] [--version 2.3.4]
+"""
+
+
+__copyright__ = "Copyright (c) 2019-2022 Cisco Systems."
+__license__ = "MIT"
+
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import sgtpolicysdk
+imported = time.perf_counter()
+{scenario}
+end = time.perf_counter()
+print(imported - start, end - imported, len([m for m in sys.modules if m.startswith("sgtpolicysdk.api.v")]))
+"""
+
+SCENARIOS = [
+    ("import sgtpolicysdk", ""),
+    ("+ one release client", "sgtpolicysdk.DNACenterSGTPolicyAPI(server='192.0.2.1', username='u', password='p', "
+                             "version={version!r}, connect=False, token_refresh=False)"),
+    ("+ every release", "from sgtpolicysdk.api import API_VERSIONS, load_api_version\n"
+                        "for release in API_VERSIONS: load_api_version(release)"),
+]
+
+
+def run(scenario, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", CHILD.format(scenario=scenario)])
+        samples.append([float(value) for value in output.split()])
+    import_ms = statistics.median(sample[0] for sample in samples) * 1e3
+    scenario_ms = statistics.median(sample[1] for sample in samples) * 1e3
+    return import_ms, scenario_ms, int(samples[-1][2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="interpreters started per scenario, the median is kept")
+    parser.add_argument("--version", default="2.3.4", help="release of the one release client")
+    args = parser.parse_args()
+
+    print("{:<22} {:>10} {:>12} {:>10} {:>12}".format("scenario", "import ms", "scenario ms", "total ms",
+                                                      "api modules"))
+    for label, scenario in SCENARIOS:
+        import_ms, scenario_ms, modules = run(scenario.format(version=args.version), args.runs)
+        print("{:<22} {:>10.1f} {:>12.1f} {:>10.1f} {:>12}".format(label, import_ms, scenario_ms,
+                                                                  import_ms + scenario_ms, modules))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""JSON backend micro-benchmark.
+
+Times the decoding and encoding of DNAC-like security group, contract and policy payloads with every
+installed backend of sgtpolicysdk.jsoncodec, against the previous json.loads(response.text) decoding.
+
+Usage:
+    python scripts/benchmark_json.py [--scale 1.0] [--repeat 5]
+"""
+
+
+__copyright__ = "Copyright (c) 2019-2022 Cisco Systems."
+__license__ = "MIT"
+
+
+import argparse
+import json
+import timeit
+
+from sgtpolicysdk.jsoncodec import BACKENDS, JsonCodec
+
+
+def security_groups(count):
+    return {"response": [{
+        "id": "6ed523e7-91e4-4600-b6ba-{:012d}".format(i),
+        "instanceId": 100000 + i,
+        "name": "SGT_{}".format(i),
+        "description": "Security group number {}".format(i),
+        "securityGroupTag": 1000 + i,
+        "propagateToAci": False,
+        "vnAgnostic": False,
+        "resourceVersion": 3,
+        "identitySource": {"type": "ISE", "state": "ACTIVE"},
+        "virtualNetworks": [{"idRef": "0c2d4e6f-vn-{:04d}".format(i % 16)}],
+    } for i in range(count)], "version": "1.0"}
+
+
+def contract_summary(count):
+    return {"response": [{
+        "totalContractCount": count,
+        "acaContractSummary": [{
+            "id": "9a8b7c6d-5e4f-3a2b-1c0d-{:012d}".format(i),
+            "name": "CONTRACT_{}".format(i),
+            "description": "Contract number {}".format(i),
+            "clauseCount": 3,
+            "policyCount": i % 40,
+            "isDeleted": False,
+        } for i in range(count)],
+    }], "version": "1.0"}
+
+
+def policy_summary(count):
+    return {"response": [{
+        "totalPolicyCount": count,
+        "acaGBPSummary": [{
+            "id": "1f2e3d4c-5b6a-7980-a1b2-{:012d}".format(i),
+            "name": "SGT_{}-SGT_{}".format(i % 100, i // 100),
+            "producerName": "SGT_{}".format(i % 100),
+            "producerSgtValue": 1000 + i % 100,
+            "consumerName": "SGT_{}".format(i // 100),
+            "consumerSgtValue": 1000 + i // 100,
+            "contractName": "CONTRACT_{}".format(i % 7),
+            "policyStatus": "ENABLED",
+            "isDeleted": False,
+        } for i in range(count)],
+    }], "version": "1.0"}
+
+
+def policies(count):
+    return [{
+        "name": "SGT_{}-SGT_{}".format(i % 100, i // 100),
+        "policyScope": "a4b5c6d7-e8f9-0a1b-2c3d-4e5f6a7b8c9d",
+        "priority": 65535,
+        "policyStatus": "ENABLED",
+        "producer": {"scalableGroup": [{"idRef": "6ed523e7-91e4-4600-b6ba-{:012d}".format(i % 100)}]},
+        "consumer": {"scalableGroup": [{"idRef": "6ed523e7-91e4-4600-b6ba-{:012d}".format(i // 100)}]},
+        "contract": {"idRef": "9a8b7c6d-5e4f-3a2b-1c0d-{:012d}".format(i % 7)},
+    } for i in range(count)]
+
+
+def best_time(statement, repeat):
+    return min(timeit.repeat(statement, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the payload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measure, the best one is kept")
+    args = parser.parse_args()
+
+    payloads = [
+        ("security groups", security_groups(int(5000 * args.scale))),
+        ("contract summary", contract_summary(int(5000 * args.scale))),
+        ("policy summary", policy_summary(int(10000 * args.scale))),
+        ("policy bulk body", policies(int(10000 * args.scale))),
+    ]
+    codecs = []
+    for name in BACKENDS:
+        try:
+            codecs.append(JsonCodec.load(name))
+        except ImportError:
+            print("{} is not installed, skipped.".format(name))
+
+    print("{:<18} {:>8} {:<8} {:>11} {:>11} {:>8}".format("payload", "size", "backend", "decode ms", "encode ms",
+                                                         "speedup"))
+    for label, payload in payloads:
+        content = json.dumps(payload).encode("utf-8")
+        baseline_decode = best_time(lambda: json.loads(content.decode("utf-8")), args.repeat)
+        baseline_encode = best_time(lambda: json.dumps(payload).encode("utf-8"), args.repeat)
+        print("{:<18} {:>7.1f}M {:<8} {:>11.2f} {:>11.2f} {:>8}".format(
+            label, len(content) / 1e6, "baseline", baseline_decode * 1e3, baseline_encode * 1e3, "1.0x"))
+        for codec in codecs:
+            decode = best_time(lambda: codec.loads(content), args.repeat)
+            encode = best_time(lambda: codec.dumps_bytes(payload), args.repeat)
+            print("{:<18} {:>8} {:<8} {:>11.2f} {:>11.2f} {:>7.1f}x".format(
+                "", "", codec.name, decode * 1e3, encode * 1e3,
+                (baseline_decode + baseline_encode) / (decode + encode)))
+
+
+if __name__ == "__main__":
+    main()
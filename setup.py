@@ -37,9 +37,8 @@ PACKAGE_CLASSIFIERS = [
     'Natural Language :: English',
     'License :: OSI Approved :: MIT License',
     'Programming Language :: Python :: 3',
-    'Programming Language :: Python :: 3.5',
-    'Programming Language :: Python :: 3.6',
     'Programming Language :: Python :: 3.7',
+    'Programming Language :: Python :: 3.8',
     'Topic :: System',
     'Topic :: System :: Networking',
     'Topic :: Utilities'
@@ -52,6 +51,10 @@ INSTALLATION_REQUIREMENTS = [
     'requests-toolbelt>=0.9.1',
 ]
 
+EXTRAS_REQUIREMENTS = {
+    'fastjson': ['orjson>=3.6'],
+}
+
 
 project_root = os.path.abspath(os.path.dirname(__file__))
 
@@ -89,5 +92,7 @@ setup(
 
     packages=find_packages(include=[PACKAGE_NAME, PACKAGE_NAME + '.*']),
 
+    python_requires='>=3.7',
     install_requires=INSTALLATION_REQUIREMENTS,
+    extras_require=EXTRAS_REQUIREMENTS,
 )
\ No newline at end of file
@@ -27,8 +27,10 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import logging
 
 from ._metadata import *
-from .api import DNACenterSGTPolicyAPI
+from .api import DNACenterSGTPolicyAPI, AsyncDNACenterSGTPolicyAPI
 from .client_manager import DnacClientManager
+from .async_client_manager import AsyncDnacClientManager
+from .polling import FixedInterval, ExponentialBackoff, AdaptiveBackoff
 from .exceptions import (
     DnacException,
     ApiClientException,
@@ -42,6 +44,14 @@ from .exceptions import (
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 logger = logging.getLogger(__name__)
 
-from pkg_resources import get_distribution
-release = get_distribution('sgtpolicysdk').version
+try:
+    from importlib.metadata import version as _distribution_version
+except ImportError:
+    # Python < 3.8, pkg_resources is much slower to import
+    from pkg_resources import get_distribution
+
+    def _distribution_version(name):
+        return get_distribution(name).version
+
+release = _distribution_version('sgtpolicysdk')
 __version__ = '.'.join(release.split('.')[:3])
@@ -17,6 +17,9 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import importlib
+from collections import OrderedDict
+
 from past.types import basestring
 
 from ..config import (
@@ -26,64 +29,79 @@ from ..config import (
     DEFAULT_SINGLE_REQUEST_TIMEOUT,
     DEFAULT_WAIT_ON_RATE_LIMIT,
     DEFAULT_VERIFY,
+    DEFAULT_KEEP_ALIVE,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_TOKEN_REFRESH,
+    DEFAULT_TOKEN_CACHE,
+    DEFAULT_RESPONSE_CACHE,
+    DEFAULT_COALESCE_REQUESTS,
+    DEFAULT_LAZY_CONNECT,
 )
 
 import sgtpolicysdk.environment as dnacsgtpolicy_environment
 from sgtpolicysdk.utils import check_type
 from sgtpolicysdk.client_manager import DnacClientManager
-#Internal Modules From Version 2.3.3 (Guardian Release)
-from .v2_3_3.task import Task as Task_v2_3_3
-from .v2_3_3.securitygroups import SecurityGroups as SecurityGroups_v2_3_3
-from .v2_3_3.accesscontracts import AccessContracts as AccessContracts_v2_3_3
-from .v2_3_3.sgtpolicy import SGTPolicy as SGTPolicy_v2_3_3
-
-#Internal Modules From Version 2.3.4 (Groot Release)
-from .v2_3_4.task import Task as Task_v2_3_4
-from .v2_3_4.securitygroups import SecurityGroups as SecurityGroups_v2_3_4
-from .v2_3_4.accesscontracts import AccessContracts as AccessContracts_v2_3_4
-from .v2_3_4.sgtpolicy import SGTPolicy as SGTPolicy_v2_3_4
-
-#Internal Modules From Version 1_2_10( Release)
-from .v1_2_10.task import Task as Task_v1_2_10
-from .v1_2_10.securitygroups import SecurityGroups as SecurityGroups_v1_2_10
-from .v1_2_10.accesscontracts import AccessContracts as AccessContracts_v1_2_10
-from .v1_2_10.sgtpolicy import SGTPolicy as SGTPolicy_v1_2_10
-
-#Internal Modules From Version 1.3.0( Release)
-from .v1_3_0.task import Task as Task_v1_3_0
-from .v1_3_0.securitygroups import SecurityGroups as SecurityGroups_v1_3_0
-from .v1_3_0.accesscontracts import AccessContracts as AccessContracts_v1_3_0
-from .v1_3_0.sgtpolicy import SGTPolicy as SGTPolicy_v1_3_0
-
-#Internal Modules From Version 1.3.1 ( Release)
-from .v1_3_1.task import Task as Task_v1_3_1
-from .v1_3_1.securitygroups import SecurityGroups as SecurityGroups_v1_3_1
-from .v1_3_1.accesscontracts import AccessContracts as AccessContracts_v1_3_1
-from .v1_3_1.sgtpolicy import SGTPolicy as SGTPolicy_v1_3_1
-
-#Internal Modules From Version 1.3.3 ( Release)
-from .v1_3_3.task import Task as Task_v1_3_3
-from .v1_3_3.securitygroups import SecurityGroups as SecurityGroups_v1_3_3
-from .v1_3_3.accesscontracts import AccessContracts as AccessContracts_v1_3_3
-from .v1_3_3.sgtpolicy import SGTPolicy as SGTPolicy_v1_3_3
-
-#Internal Modules From Version 2.1.2 ( Release)
-from .v2_1_2.task import Task as Task_v2_1_2
-from .v2_1_2.securitygroups import SecurityGroups as SecurityGroups_v2_1_2
-from .v2_1_2.accesscontracts import AccessContracts as AccessContracts_v2_1_2
-from .v2_1_2.sgtpolicy import SGTPolicy as SGTPolicy_v2_1_2
-
-#Internal Modules From Version 2.2.1 ( Release)
-from .v2_2_1.task import Task as Task_v2_2_1
-from .v2_2_1.securitygroups import SecurityGroups as SecurityGroups_v2_2_1
-from .v2_2_1.accesscontracts import AccessContracts as AccessContracts_v2_2_1
-from .v2_2_1.sgtpolicy import SGTPolicy as SGTPolicy_v2_2_1
-
-#Internal Modules From Version 2.2.3 ( Release)
-from .v2_2_3.task import Task as Task_v2_2_3
-from .v2_2_3.securitygroups import SecurityGroups as SecurityGroups_v2_2_3
-from .v2_2_3.accesscontracts import AccessContracts as AccessContracts_v2_2_3
-from .v2_2_3.sgtpolicy import SGTPolicy as SGTPolicy_v2_2_3
+from sgtpolicysdk.cache import ResponseCache
+from sgtpolicysdk.async_client_manager import AsyncDnacClientManager, AsyncApiWrapper, AsyncTask
+
+#: Package of the API wrappers of each DNA Center release, in matching
+#: order: a version string that is not a release is matched against the
+#: releases as substrings, the first one found wins (e.g. the default
+#: '2.2.3.3' is release 2.3.3).
+API_VERSIONS = OrderedDict([
+    ('2.3.3', 'v2_3_3'),   # Guardian Release
+    ('2.3.4', 'v2_3_4'),   # Groot Release
+    ('1.2.10', 'v1_2_10'),
+    ('1.3.0', 'v1_3_0'),
+    ('1.3.1', 'v1_3_1'),
+    ('1.3.3', 'v1_3_3'),
+    ('2.1.2', 'v2_1_2'),
+    ('2.2.1', 'v2_2_1'),
+    ('2.2.3', 'v2_2_3'),
+])
+
+
+def resolve_api_version(version):
+    """Find the API package of a DNA Center version string.
+    Args:
+        version(basestring): DNA Center release, e.g. '2.3.4', or a string
+            containing one, e.g. '2.2.3.3' or 'v2.3.4-groot'.
+
+    Returns:
+        basestring: The package name, e.g. 'v2_3_4', None when no
+        supported release matches.
+    """
+    package = API_VERSIONS.get(version)
+    if package is not None:
+        return package
+    for release, package in API_VERSIONS.items():
+        if release in version:
+            return package
+    return None
+
+
+def load_api_version(version):
+    """Import the API wrappers of a DNA Center release.
+    Only the four modules of the requested release are imported, on first
+    use. The release is resolved with resolve_api_version.
+    Args:
+        version(basestring): DNA Center release.
+
+    Returns:
+        tuple: The Task, SecurityGroups, AccessContracts and SGTPolicy
+        classes, None when the release is not supported.
+    """
+    package = resolve_api_version(version)
+    if package is None:
+        return None
+    package = __name__ + '.' + package
+    return (importlib.import_module(package + '.task').Task,
+            importlib.import_module(package + '.securitygroups').SecurityGroups,
+            importlib.import_module(package + '.accesscontracts').AccessContracts,
+            importlib.import_module(package + '.sgtpolicy').SGTPolicy)
+
 
 class DNACenterSGTPolicyAPI(object):
     """Cisco DNA Center API wrapper.
@@ -92,6 +110,9 @@ class DNACenterSGTPolicyAPI(object):
     and checks all responses for error conditions.
     DNASGTPolicyCenterAPI wraps all of the individual DNA SGTPolicy Center APIs and represents
     them in a simple hierarchical structure.
+    A single DNACenterSGTPolicyAPI object is thread-safe: it can be shared by
+    the worker threads of a ThreadPoolExecutor, each request carries its own
+    copy of the headers and re-authentication is synchronized.
     """
 
     def __init__(self,
@@ -105,7 +126,15 @@ class DNACenterSGTPolicyAPI(object):
                  version='2.3.3',
                  api_version="v1",
                  debug=None,
-                 connect=True):
+                 connect=True,
+                 keep_alive=None,
+                 pool_connections=None,
+                 pool_maxsize=None,
+                 token_refresh=None,
+                 token_cache=None,
+                 response_cache=None,
+                 coalesce_requests=None,
+                 lazy_connect=None):
         """Create a new DNASGTPolicyCenterAPI object.
         An access token is required to interact with the DNA Center APIs.
         This package supports two methods for you to generate the
@@ -154,10 +183,42 @@ class DNACenterSGTPolicyAPI(object):
                 DNA Center APIs' request and response process.
                 Defaults to the DNA_CENTER_DEBUG environment variable or False
                 if the environment variable is not set.
+            keep_alive(bool): Reuse pooled keep-alive HTTP connections for all
+                the API calls of this object (securitygroups, accesscontracts,
+                sgtpolicy and task share the same pool). Defaults to
+                sgtpolicysdk.config.DEFAULT_KEEP_ALIVE.
+            pool_connections(int): Number of per-host connection pools to
+                cache. Defaults to sgtpolicysdk.config.DEFAULT_POOL_CONNECTIONS.
+            pool_maxsize(int): Maximum number of keep-alive connections kept
+                open per host. Defaults to
+                sgtpolicysdk.config.DEFAULT_POOL_MAXSIZE.
+            token_refresh(bool): Renew the authentication cookie on a
+                background timer before it expires, even when the object is
+                idle. Defaults to sgtpolicysdk.config.DEFAULT_TOKEN_REFRESH.
+            token_cache(bool,basestring): Reuse the authentication cookie
+                of earlier processes for the same server and username, stored
+                in sgtpolicysdk.config.DEFAULT_TOKEN_CACHE_PATH (True) or in
+                the given file. Defaults to the DNA_CENTER_TOKEN_CACHE
+                environment variable or sgtpolicysdk.config.DEFAULT_TOKEN_CACHE.
+            response_cache(bool,ResponseCache): Cache the GET responses of
+                the security group, contract, policy and virtual network
+                resources, invalidated by the writes of this object. True for
+                a sgtpolicysdk.cache.ResponseCache with the default ttl.
+                Defaults to sgtpolicysdk.config.DEFAULT_RESPONSE_CACHE.
+            coalesce_requests(bool): Concurrent identical GET requests share
+                one HTTP request and receive a copy of its response. Defaults
+                to sgtpolicysdk.config.DEFAULT_COALESCE_REQUESTS.
+            lazy_connect(bool): Authenticate on the first API call instead of
+                in this constructor, which then sends no request. Concurrent
+                first calls share one login. Defaults to
+                sgtpolicysdk.config.DEFAULT_LAZY_CONNECT.
 
         Returns:
             DNACenterAPI: A new DNACenterAPI object.
 
+        Raises:
+            ValueError: If no supported release matches version.
+
         """
         username = username or dnacsgtpolicy_environment.get_env_username()
         password = password or dnacsgtpolicy_environment.get_env_password()
@@ -186,110 +247,70 @@ class DNACenterSGTPolicyAPI(object):
         check_type(password, basestring, may_be_none=True)
         check_type(verify, (bool, basestring), may_be_none=False)
 
+        if keep_alive is None:
+            keep_alive = DEFAULT_KEEP_ALIVE
+
+        if pool_connections is None:
+            pool_connections = DEFAULT_POOL_CONNECTIONS
+
+        if pool_maxsize is None:
+            pool_maxsize = DEFAULT_POOL_MAXSIZE
+
+        if token_refresh is None:
+            token_refresh = DEFAULT_TOKEN_REFRESH
+
+        if token_cache is None:
+            token_cache = dnacsgtpolicy_environment.get_env_token_cache() or DEFAULT_TOKEN_CACHE
+
+        if response_cache is None:
+            response_cache = DEFAULT_RESPONSE_CACHE
+
+        if coalesce_requests is None:
+            coalesce_requests = DEFAULT_COALESCE_REQUESTS
+
+        if lazy_connect is None:
+            lazy_connect = DEFAULT_LAZY_CONNECT
+
+        check_type(keep_alive, bool)
+        check_type(pool_connections, int)
+        check_type(pool_maxsize, int)
+        check_type(token_refresh, bool)
+        check_type(token_cache, (bool, basestring))
+        check_type(response_cache, (bool, ResponseCache))
+        check_type(coalesce_requests, bool)
+        check_type(lazy_connect, bool)
+
         if isinstance(debug, str):
             debug = 'true' in debug.lower()
 
+        api_classes = load_api_version(version)
+        if api_classes is None:
+            raise ValueError("No matching version provided: {}, expected one of {}."
+                             .format(version, ", ".join(API_VERSIONS)))
+
         # Create the API session
         # All of the API calls associated with a DNASGTpolicyCenterAPI object will
         # leverage a single RESTful 'session' connecting to the DNA Center
         # cloud.
         
-        self._session = DnacClientManager(server=server,username=username, password=password,base_url=base_url)
+        self._session = DnacClientManager(server=server,username=username, password=password,base_url=base_url,
+                                          connect=connect,
+                                          keep_alive=keep_alive,
+                                          pool_connections=pool_connections,
+                                          pool_maxsize=pool_maxsize,
+                                          token_refresh=token_refresh,
+                                          token_cache=token_cache,
+                                          wait_on_rate_limit=wait_on_rate_limit,
+                                          response_cache=response_cache,
+                                          coalesce_requests=coalesce_requests,
+                                          lazy_connect=lazy_connect)
 
         # API wrappers
-        if version == '2.3.3' or version.find("2.3.3") != -1:
-            self.task = \
-                Task_v2_3_3(self._session)
-            self.securitygroups = \
-                SecurityGroups_v2_3_3(self)
-            self.accesscontracts = \
-                AccessContracts_v2_3_3(self)
-            self.sgtpolicy = \
-                SGTPolicy_v2_3_3(self)
-        elif version == '2.3.4' or version.find("2.3.4") != -1:
-            self.task = \
-                Task_v2_3_4(self._session)
-            self.securitygroups = \
-                SecurityGroups_v2_3_4(self)
-            self.accesscontracts = \
-                AccessContracts_v2_3_4(self)
-            self.sgtpolicy = \
-                SGTPolicy_v2_3_4(self)
-        elif version == '1.2.10' or version.find("1.2.10") != -1:
-            self.task = \
-                Task_v1_1_10(self._session)
-            self.securitygroups = \
-                SecurityGroups_v1_2_10(self)
-            self.accesscontracts = \
-                AccessContracts_v1_2_10(self)
-            self.sgtpolicy = \
-                SGTPolicy_v1_2_10(self)
-        elif version == '1.3.0' or version.find("1.3.0") != -1:
-            self.task = \
-                Task_v1_3_0(self._session)
-            self.securitygroups = \
-                SecurityGroups_v1_3_0(self)
-            self.accesscontracts = \
-                AccessContracts_v1_3_0(self)
-            self.sgtpolicy = \
-                SGTPolicy_v1_3_0(self)
-        elif version == '1.3.1' or version.find("1.3.1") != -1:
-            self.task = \
-                Task_v1_3_1(self._session)
-            self.securitygroups = \
-                SecurityGroups_v1_3_1(self)
-            self.accesscontracts = \
-                AccessContracts_v1_3_1(self)
-            self.sgtpolicy = \
-                SGTPolicy_v1_3_1(self)
-        elif version == '1.3.1' or version.find("1.3.1") != -1:
-            self.task = \
-                Task_v1_3_1(self._session)
-            self.securitygroups = \
-                SecurityGroups_v1_3_1(self)
-            self.accesscontracts = \
-                AccessContracts_v1_3_1(self)
-            self.sgtpolicy = \
-                SGTPolicy_v1_3_1(self)
-        elif version == '1.3.3' or version.find("1.3.3") != -1:
-            self.task = \
-                Task_v1_3_3(self._session)
-            self.securitygroups = \
-                SecurityGroups_v1_3_3(self)
-            self.accesscontracts = \
-                AccessContracts_v1_3_3(self)
-            self.sgtpolicy = \
-                SGTPolicy_v1_3_3(self)
-        elif version == '2.1.2' or version.find("2.1.2") != -1:
-            self.task = \
-                Task_v2_1_2(self._session)
-            self.securitygroups = \
-                SecurityGroups_v2_1_2(self)
-            self.accesscontracts = \
-                AccessContracts_v2_1_2(self)
-            self.sgtpolicy = \
-                SGTPolicy_v2_1_2(self)
-        elif version == '2.2.1' or version.find("2.2.1") != -1:
-            self.task = \
-                Task_v2_2_1(self._session)
-            self.securitygroups = \
-                SecurityGroups_v2_2_1(self)
-            self.accesscontracts = \
-                AccessContracts_v2_2_1(self)
-            self.sgtpolicy = \
-                SGTPolicy_v2_2_1(self)
-        elif version == '2.2.3' or version.find("2.2.3") != -1:
-            self.task = \
-                Task_v2_2_3(self._session)
-            self.securitygroups = \
-                SecurityGroups_v2_2_3(self)
-            self.accesscontracts = \
-                AccessContracts_v2_2_3(self)
-            self.sgtpolicy = \
-                SGTPolicy_v2_2_3(self)
-        else:
-            print("No Matching version provided.")
-            return False
+        Task, SecurityGroups, AccessContracts, SGTPolicy = api_classes
+        self.task = Task(self._session)
+        self.securitygroups = SecurityGroups(self)
+        self.accesscontracts = AccessContracts(self)
+        self.sgtpolicy = SGTPolicy(self)
 
     @property
     def session(self):
@@ -344,3 +365,82 @@ class DNACenterSGTPolicyAPI(object):
         self._session.wait_on_rate_limit = value
 
         
+
+
+class AsyncDNACenterSGTPolicyAPI(object):
+    """Cisco DNA Center API wrapper for asyncio applications.
+    Mirrors DNACenterSGTPolicyAPI, every method of task, securitygroups,
+    accesscontracts and sgtpolicy is awaitable. At most max_concurrency
+    requests run against DNA Center at the same time.
+
+    Usage:
+        async with AsyncDNACenterSGTPolicyAPI(server=server, username=username,
+                                              password=password,
+                                              version="2.3.4") as sdk:
+            await sdk.securitygroups.createSecurityGroup("SGT1", 1001)
+    """
+
+    def __init__(self, max_concurrency=None, **kwargs):
+        """Create a new AsyncDNACenterSGTPolicyAPI object.
+        Authentication is deferred to connect() (or `async with`) so the
+        constructor never blocks the event loop.
+        Args:
+            max_concurrency(int): Maximum number of DNA Center requests in
+                flight. Defaults to sgtpolicysdk.config.DEFAULT_MAX_CONCURRENCY.
+            kwargs: Any DNACenterSGTPolicyAPI argument (server, username,
+                password, version, ...).
+
+        Returns:
+            AsyncDNACenterSGTPolicyAPI: A new AsyncDNACenterSGTPolicyAPI object.
+        """
+        if max_concurrency is None:
+            max_concurrency = DEFAULT_MAX_CONCURRENCY
+        check_type(max_concurrency, int)
+
+        kwargs["connect"] = False
+        if kwargs.get("pool_maxsize") is None:
+            kwargs["pool_maxsize"] = max_concurrency
+        self._api = DNACenterSGTPolicyAPI(**kwargs)
+        self._session = AsyncDnacClientManager(client=self._api.session,
+                                               max_concurrency=max_concurrency)
+
+        # API wrappers
+        self.task = AsyncTask(self._api.task, self._session)
+        self.securitygroups = AsyncApiWrapper(self._api.securitygroups, self._session)
+        self.accesscontracts = AsyncApiWrapper(self._api.accesscontracts, self._session)
+        self.sgtpolicy = AsyncApiWrapper(self._api.sgtpolicy, self._session)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.disconnect()
+        self.close()
+
+    async def connect(self, force=False):
+        """Authenticate against DNA Center without blocking the event loop."""
+        await self._session.connect(force=force)
+
+    async def disconnect(self):
+        """Drop the authentication cookie, the worker pool is kept."""
+        await self._session.disconnect()
+
+    def close(self):
+        """Release the worker pool, a later call creates a new one."""
+        self._session.close()
+
+    @property
+    def session(self):
+        """The asyncio DNA Center API session."""
+        return self._session
+
+    @property
+    def max_concurrency(self):
+        """Maximum number of DNA Center requests in flight."""
+        return self._session.max_concurrency
+
+    @property
+    def version(self):
+        """The API version of DNA Center."""
+        return self._api.version
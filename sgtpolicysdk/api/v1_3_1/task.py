@@ -1,6 +1,9 @@
 import traceback
 import time
+import functools
+import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from past.builtins import basestring
 logger = logging.getLogger("TaskManager")
 TASK_COMPLETION_POLL_INTERVAL=2
@@ -11,12 +14,102 @@ from ...utils import (
     dict_from_items_with_values,
     dict_of_str,
 )
+from ...polling import AdaptiveBackoff, TaskPoller, TaskFuture, DEFAULT_CALLBACK_WORKERS, task_duration
 
 class Task(object):
-    def __init__(self, session):
+    def __init__(self, session, poll_strategy=None):
         self._session = session
+        self.poll_strategy = poll_strategy or AdaptiveBackoff()
+        self._poller = None
+        self._callback_executor = None
+        self._poller_lock = threading.Lock()
         self.log = logger
 
+    def set_poll_strategy(self, poll_strategy):
+        '''
+            Function: set_poll_strategy
+            Input: poll_strategy: sgtpolicysdk.polling strategy (FixedInterval, ExponentialBackoff,
+                   AdaptiveBackoff) deciding the sleep between two task checks.
+        '''
+        self.poll_strategy = poll_strategy
+
+    @property
+    def poller(self):
+        '''
+            TaskPoller shared by track and wait_for_many, created on first use.
+        '''
+        if self._poller is None:
+            with self._poller_lock:
+                if self._poller is None:
+                    self._poller = TaskPoller(self.get_task_by_id, self.poll_strategy)
+        return self._poller
+
+    def track(self, response, timeout=GLOBAL_TASK_TIMEOUT):
+        '''
+            Function: track
+            Input: response containing task details.
+                timeout: Max time the Task considered completed.
+            Result: concurrent.futures.Future resolved with the task response, or False when the
+                task didn't complete in time. The task is polled by the shared background poller.
+        '''
+        check_type(response,dict)
+        check_type(timeout,int)
+        return self.poller.track(response['response']['taskId'], timeout, poll_strategy=self.poll_strategy)
+
+    def handle(self, response, handler, wait=True, timeout=GLOBAL_TASK_TIMEOUT):
+        '''
+            Function: handle
+            Input: response containing task details.
+                handler: callable turning the task response into the operation result, a task which
+                    didn't complete in time is handed over as a failed task.
+                wait: True to wait for the task, False to return a TaskFuture right away.
+                timeout: Max time the Task considered completed.
+            Result: handler result, or a TaskFuture resolved with it when wait is False.
+        '''
+        check_type(wait,bool)
+        handler = functools.partial(self.__complete, handler, response['response']['taskId'], timeout)
+        if wait:
+            return handler(self.wait_for_task_complete(response, timeout=timeout))
+        if self._callback_executor is None:
+            with self._poller_lock:
+                if self._callback_executor is None:
+                    self._callback_executor = ThreadPoolExecutor(max_workers=DEFAULT_CALLBACK_WORKERS)
+        return TaskFuture(self.track(response, timeout=timeout), handler, self._callback_executor,
+                          task_id=response['response']['taskId'])
+
+    def __complete(self, handler, task_id, timeout, task_response):
+        if not task_response:
+            task_response = {'id': task_id, 'isError': True,
+                             'failureReason': "Task {} didn't complete within {} seconds".format(task_id, timeout)}
+        return handler(task_response)
+
+    def resolved(self, result, wait=True):
+        '''
+            Function: resolved
+            Input: result of an operation which ended without submitting a task.
+                wait: False to wrap it in a done TaskFuture.
+            Result: result, or a TaskFuture holding it when wait is False.
+        '''
+        return result if wait else TaskFuture.resolved(result)
+
+    def wait_for_many(self, task_responses, timeout=GLOBAL_TASK_TIMEOUT):
+        '''
+            Function: wait_for_many
+            Input: task_responses: list of responses containing task details.
+                timeout: Max time each Task considered completed.
+            Result: iterator of (task id, task response or False on timeout), in completion order.
+                Every task is tracked right away by one shared poller.
+        '''
+        check_type(task_responses,list)
+        check_type(timeout,int)
+        futures = dict((self.track(response, timeout=timeout), response['response']['taskId'])
+                       for response in task_responses)
+        return self.__iter_completed(futures)
+
+    def __iter_completed(self, futures):
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
     def wait_for_task_complete(self, response, timeout=GLOBAL_TASK_TIMEOUT, count=2):
         '''
             Function: wait_for_task_complete
@@ -146,6 +239,7 @@ class Task(object):
         task_completed = False
         start_time = time.time()
         task_response = None
+        delays = None
         while not task_completed:
             if time.time() > (start_time + timeout):
                 assert False, ("Task {0} didn't complete within {1} seconds"
@@ -154,10 +248,12 @@ class Task(object):
             self.log.info(task_response)
             if self.__is_task_success(task_response) or self.__is_task_failed(task_response):
                 task_completed = True
+                self.__observe(task_response, start_time)
                 return task_response
             else:
                 self.log.info("Task not completed yet, waiting:{}".format(task_response))
-                time.sleep(TASK_COMPLETION_POLL_INTERVAL)
+                delays = delays or self.poll_strategy.delays(task_response.get("serviceType"))
+                self.__sleep(delays, start_time, timeout)
         return task_response
 
     def __wait_for_task_success(self, task_id=None, timeout=None):
@@ -171,6 +267,7 @@ class Task(object):
         task_completed = False
         start_time = time.time()
         task_response = None
+        delays = None
         while not task_completed:
             if time.time() > (start_time + timeout):
                 assert False, ("Task {0} didn't complete within {1} seconds"
@@ -179,14 +276,17 @@ class Task(object):
             if self.__is_task_success(task_response):
                 self.log.info("Task Completed, Task Response:{}".format(task_response))
                 task_completed = True
+                self.__observe(task_response, start_time)
                 return task_response
             elif self.__is_task_failed(task_response):
                 task_completed = True
+                self.__observe(task_response, start_time)
                 assert False, ("Task failed, task response {0}".format(
                     task_response))
             else:
                 self.log.info("Task not success yet, waiting:{}".format(task_response))
-                time.sleep(TASK_COMPLETION_POLL_INTERVAL)
+                delays = delays or self.poll_strategy.delays(task_response.get("serviceType"))
+                self.__sleep(delays, start_time, timeout)
         return task_response
 
     def __wait_for_task_failure(self, task_id, timeout=None):
@@ -204,6 +304,7 @@ class Task(object):
         task_completed = False
         task_response = None
         start_time = time.time()
+        delays = None
         while not task_completed:
             if time.time() > (start_time + timeout):
                 msg = "Task {0} didn't complete within {1} seconds".format(task_response,
@@ -217,9 +318,25 @@ class Task(object):
                 task_completed = True
             else:
                 self.log.info("Task not failed yet, waiting:{}".format(task_response))
-                time.sleep(TASK_COMPLETION_POLL_INTERVAL)
+                delays = delays or self.poll_strategy.delays(task_response.get("serviceType"))
+                self.__sleep(delays, start_time, timeout)
+        self.__observe(task_response, start_time)
         return task_response
 
+    def __sleep(self, delays, start_time, timeout):
+        '''
+            Internal Function: sleep the next poll strategy delay, never past the wait timeout
+        '''
+        remaining = start_time + timeout - time.time()
+        time.sleep(max(0, min(next(delays), remaining)))
+
+    def __observe(self, task_response, start_time):
+        '''
+            Internal Function: report the completion time of a task to the poll strategy
+        '''
+        self.poll_strategy.observe(task_response.get("serviceType"),
+                                   task_duration(task_response, time.time() - start_time))
+
     def __is_task_failed(self, task_response):
         assert task_response is not None
         return task_response["isError"] is True
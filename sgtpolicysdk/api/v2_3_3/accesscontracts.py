@@ -19,6 +19,7 @@ SOFTWARE.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import functools
 from builtins import *
 
 from past.builtins import basestring
@@ -67,7 +68,7 @@ class AccessContracts(object):
         self.log = logger
 
 
-    def createNewContract(self,contract_name,description=None,contract_data = []):
+    def createNewContract(self,contract_name,description=None,contract_data = [], wait=True):
         """
         Create access contract
         Args:
@@ -79,6 +80,7 @@ class AccessContracts(object):
                   "dstNetworkIdentities"(Mandatory):[{"protocol":"UDP","ports":"9207"},
                                           {"protocol":"TCP","ports":"9207"}], 
                   "logging"(Mandatory): "OFF"}]
+            wait(bool): False to return a TaskFuture instead of waiting for the task
             
         Raises:
             TypeError: If the parameter types are incorrect.
@@ -86,6 +88,7 @@ class AccessContracts(object):
         check_type(contract_name,basestring)
         check_type(description,basestring)
         check_type(contract_data,list)
+        check_type(wait,bool)
         
         self.log.info("Start to create new contract {} in DNAC".format(contract_name))
         new_contract = [
@@ -98,11 +101,15 @@ class AccessContracts(object):
             }
         ]
         contract_response = self.post_contractAccess(json=new_contract, timeout=DEFAULT_AC_TIMEOUT)
-        taskStatus = self._task.wait_for_task_complete(contract_response, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(contract_response, functools.partial(self._createNewContractDone, contract_name),
+                                 wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _createNewContractDone(self, contract_name, taskStatus):
+        """ Completes createNewContract once its task ended. """
         self.log.info(taskStatus)
         if (taskStatus['isError']):
             self.log.error("creating new contract failed:{0}".format(taskStatus['failureReason']))
-            return {'status':False, "failureReason":"Creating access contract {} failed:{}".format(taskStatus['failureReason'])}
+            return {'status':False, "failureReason":"Creating access contract {} failed:{}".format(contract_name, taskStatus['failureReason'])}
         else:
             self.log.info("##################################################################################")
             self.log.info("#----SUCCESSFULLY CREATED NEW CONTRACT {}----#".format(contract_name))
@@ -185,7 +192,7 @@ class AccessContracts(object):
                                     "or have different information".format(exist_list))
                 return {'status':True, 'failureReason':"Some contracts still exist in DNAC."}
 
-    def updateAccessContract(self, contract_name,description=None,contract_data=None,clause=None,**kwargs):
+    def updateAccessContract(self, contract_name,description=None,contract_data=None,clause=None,wait=True,**kwargs):
         """
         Update access contract
         Args:
@@ -198,6 +205,7 @@ class AccessContracts(object):
                                           {"protocol":"TCP","ports":"9207"}], 
                   "logging"(Mandatory): "OFF"}]
             clause(list): Global parameter for contract data 
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect.
         """
@@ -205,6 +213,7 @@ class AccessContracts(object):
         check_type(description,basestring)
         check_type(contract_data,list)
         check_type(clause,list)
+        check_type(wait,bool)
 
         self.log.info("Start to update contract {}".format(contract_name))
         self.log.info("Update contract")
@@ -228,7 +237,11 @@ class AccessContracts(object):
             ac_data["clause"] = clause
        
         contract_response = self.put_contractAccess(json=[ac_data], timeout=DEFAULT_SUMMARY_TIMEOUT)
-        taskStatus = self._task.wait_for_task_complete(contract_response, timeout=DEFAULT_SUMMARY_TIMEOUT)
+        return self._task.handle(contract_response, functools.partial(self._updateAccessContractDone, contract_name),
+                                 wait=wait, timeout=DEFAULT_SUMMARY_TIMEOUT)
+
+    def _updateAccessContractDone(self, contract_name, taskStatus):
+        """ Completes updateAccessContract once its task ended. """
         self.log.info(taskStatus)
         if (taskStatus['isError']):
             self.log.error("Updating contract failed:{0}".format(taskStatus['failureReason']))
@@ -239,11 +252,12 @@ class AccessContracts(object):
             self.log.info("###################################################################")
             return {'status':True}
 
-    def delete_contractAccessByName(self, contract_name, **kwargs):
+    def delete_contractAccessByName(self, contract_name, wait=True, **kwargs):
         """ delete a single contract with the given instance uuid
 
         Args:
             contract_name(str): Access Contract name
+            wait(bool): False to return a TaskFuture instead of waiting for the task
             kwargs (dict): additional parameters to be passed
 
         Returns:
@@ -254,13 +268,14 @@ class AccessContracts(object):
             ApiClientException: when unexpected query parameters are passed.
         """
         check_type(contract_name,basestring)
+        check_type(wait,bool)
 
         url = '/'+ DEFAULT_VERSION + CONTRACT_URL_PATH2
         contract_response = self.get_contractAccessSummary()
         delete_list = [ac['id'] for i,ac in enumerate((contract_response['response'][0]['acaContractSummary'])) if ac['name'] == contract_name]
         if len(delete_list) == 0:
             self.log.error("No contract name exist to delete it")
-            return {"status" : False}
+            return self._task.resolved({"status" : False}, wait=wait)
         else:
             self.log.info("Contract exist for deletion") 
             ac_data = {
@@ -269,7 +284,11 @@ class AccessContracts(object):
         
         delete_response = self.post_contractAccess(url=url,json=ac_data)
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response)
+        return self._task.handle(delete_response, functools.partial(self._deleteContractAccessByNameDone,
+                                 contract_name), wait=wait)
+
+    def _deleteContractAccessByNameDone(self, contract_name, taskStatus):
+        """ Completes delete_contractAccessByName once its task ended. """
         self.log.info(taskStatus)
         if (taskStatus['isError']):
             self.log.error("Deleting access contract failed:{0}".format(taskStatus['failureReason']))
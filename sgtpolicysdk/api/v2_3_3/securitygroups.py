@@ -19,9 +19,11 @@ SOFTWARE.
 """
 
 from __future__ import absolute_import, division, print_function, unicode_literals
+import functools
 import pprint
 from builtins import *
 from past.builtins import basestring
+from ...cache import SecurityGroupIndex, DEFAULT_SG_INDEX_TTL, DEFAULT_SG_INDEX_MAX_SIZE
 from ...client_manager import DnacClientManager
 from ...utils import (
     apply_path_params,
@@ -35,6 +37,7 @@ import json
 #Default Timers
 DEFAULT_SGT_TIMEOUT=60
 DEFAULT_TASK_COMPLETION_TIMEOUT=120
+DEFAULT_SGT_PAGE_SIZE=500
 
 #URLs
 PATH_SG = '/v2/data/customer-facing-service/scalablegroup/access'
@@ -62,9 +65,84 @@ class SecurityGroups(object):
         super(SecurityGroups, self).__init__()
         self._session = session._session
         self._task = session.task
+        self._sg_index = None
         self.log = logger
 
-    def createSecurityGroup(self, sgName, sgTag, sgDescription="", virtualNetworks=[], **kwargs):
+    def enableSecurityGroupIndex(self, ttl=DEFAULT_SG_INDEX_TTL, max_size=DEFAULT_SG_INDEX_MAX_SIZE):
+        '''
+            Function: enableSecurityGroupIndex
+            Description: Serve name -> {id, securityGroupTag, resourceVersion} lookups from one
+                         paginated inventory fetch instead of one GET per lookup. Security Groups
+                         written through this object are queried again on their next lookup.
+            Input:
+                ttl = seconds the index stays valid, None to never expire
+                max_size = maximum number of Security Groups kept (LRU), None for no bound
+        '''
+        check_type(ttl,int)
+        check_type(max_size,int)
+        self._sg_index = SecurityGroupIndex(self._getAllSecurityGroups, self._getSecurityGroupsByName,
+                                            ttl=ttl, max_size=max_size)
+        self.log.info("Security group index enabled, ttl:{} max_size:{}".format(ttl, max_size))
+
+    def disableSecurityGroupIndex(self):
+        '''
+            Function: disableSecurityGroupIndex
+            Description: Every lookup queries DNAC again.
+        '''
+        self._sg_index = None
+
+    def refreshSecurityGroupIndex(self):
+        '''
+            Function: refreshSecurityGroupIndex
+            Description: Reload the Security Group index from DNAC.
+            Output:
+                When Success : {'status':True}
+                When Failed  : {status:False, "failureReason":"<failure reason>"}
+        '''
+        if self._sg_index is None:
+            return {'status':False, 'failureReason':'Security group index is not enabled'}
+        self._sg_index.load()
+        return {'status':True}
+
+    def _invalidateSecurityGroupIndex(self, *names):
+        if self._sg_index is not None:
+            self._sg_index.invalidate(*names)
+
+    def _getSecurityGroupsByName(self, name):
+        return self.get_securityGroup(params={"name": name}, timeout=DEFAULT_SGT_TIMEOUT)['response']
+
+    def getSecurityGroupIdsByNames(self, names):
+        '''
+            Function: getSecurityGroupIdsByNames
+            Description: Resolve many Security Group names to ids with one paginated inventory walk,
+                         or from the Security Group index when enabled.
+            Input: names = list of Security Group names
+            Output: {<name>: <id>} for the names found in DNAC
+        '''
+        check_type(names,list)
+        if self._sg_index is not None:
+            entries = [self._sg_index.lookup(name) for name in names]
+            return dict((entry['name'], entry['id']) for entry in entries if entry)
+        wanted = set(names)
+        return dict((sg['name'], sg['id']) for sg in self._getAllSecurityGroups() if sg['name'] in wanted)
+
+    def _getAllSecurityGroups(self, page_size=DEFAULT_SGT_PAGE_SIZE):
+        '''
+            Function: _getAllSecurityGroups
+            Description: GET every Security Group in DNAC, page_size Security Groups per request.
+            Output: list of Security Groups
+        '''
+        security_groups = []
+        offset = 0
+        while True:
+            params = {'offset': offset, 'limit': page_size}
+            page = self.get_securityGroup(params=params)['response']
+            security_groups.extend(page)
+            if len(page) < page_size:
+                return security_groups
+            offset += page_size
+
+    def createSecurityGroup(self, sgName, sgTag, sgDescription="", virtualNetworks=[], wait=True, **kwargs):
         '''
             Ceate a security group in DNAC.
             Function: createSecurityGroup
@@ -73,6 +151,7 @@ class SecurityGroups(object):
                 sgTag = Security Group Tag
                 sgDescription =  Security Group Description
                 virtualNetworks =  list of Virtual Networks.
+                wait = False to return a TaskFuture instead of waiting for the task
             Output:
                 When Success : {'status':True}  
                 When Failed  : {status:False, "failureReason":"<failure reason>"}
@@ -81,6 +160,7 @@ class SecurityGroups(object):
         check_type(sgTag,int)
         check_type(sgDescription,basestring)
         check_type(virtualNetworks,list)
+        check_type(wait,bool)
         security_groups = [
             {
                 "description": sgDescription,
@@ -92,8 +172,15 @@ class SecurityGroups(object):
         self.log.info("Creating a new security group {}".format(pprint.pformat(security_groups)))
         sg_response = self.post_securityGroup(json=security_groups, timeout=DEFAULT_SGT_TIMEOUT)
         self.log.info(sg_response)
-        taskStatus = self._task.wait_for_task_complete(sg_response, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(sg_response, functools.partial(self._createSecurityGroupDone, sgName,
+                                 virtualNetworks, wait), wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _createSecurityGroupDone(self, sgName, virtualNetworks, wait, taskStatus):
+        '''
+            Internal Function: completes createSecurityGroup once its task ended
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(sgName)
         if (taskStatus['isError']):
             self.log.error("Creating a new security group failed:{0}".format(taskStatus['failureReason']))
             return {'status':False, "failureReason":"Creating security group {} failed:{}".format(sgName,taskStatus['failureReason'])}
@@ -101,27 +188,29 @@ class SecurityGroups(object):
             self.log.info("#---- SUCCESSFULLY CREATED SECURITY GROUP {} ----#".format(sgName))
         if not virtualNetworks:
             virtualNetworks = ['DEFAULT_VN']
-        return self.addSecurityGroupToVirtualNetwork(sgName, virtualNetworks)
+        return self.addSecurityGroupToVirtualNetwork(sgName, virtualNetworks, wait=wait)
 
-    def addSecurityGroupToVirtualNetwork(self, sg_name, virtualNetworks):
+    def addSecurityGroupToVirtualNetwork(self, sg_name, virtualNetworks, wait=True):
         '''
             Function: addSecurityGroupToVirtualNetwork
             INPUTs:
                 virtualNetworks : List of Virtual Network Names
                 sg_name : Security Group Name
+                wait : False to return a TaskFuture instead of waiting for the task
             OUTPUT:
                 When Success: {"status":True, "failureReason":""}
                 {"status":False, "failureReason":"<Failure expanation>"
         '''
         check_type(sg_name,basestring)
         check_type(virtualNetworks,list)
+        check_type(wait,bool)
 
         securityGroup = self.getSecurityGroupIdByName(sg_name)
         self.log.info(securityGroup)
         if securityGroup['status']:
             sg_idref = {"idRef":securityGroup['id']}
         else:
-            return {'status':False, 'failureReason':securityGroup['failureReason']}
+            return self._task.resolved({'status':False, 'failureReason':securityGroup['failureReason']}, wait=wait)
         self.log.info("Updating virtualNetworks")
         updatedVnData=[]
         vn_list = self.getVirtualNetwork()
@@ -132,10 +221,16 @@ class SecurityGroups(object):
                     updatedVnData.append(vndata)
 
         if len(updatedVnData) != len(virtualNetworks):
-            return {'status':False, 'failureReason':'Not all virtualNetworks provided, exist in DNAC, Create VirtualNetwork in DNAC first'}
+            return self._task.resolved({'status':False, 'failureReason':'Not all virtualNetworks provided, exist in DNAC, Create VirtualNetwork in DNAC first'}, wait=wait)
         response = self.putVirtualNetwork(json=updatedVnData)
         self.log.info(response)
-        taskStatus = self._task.wait_for_task_complete(response, timeout=240)
+        return self._task.handle(response, functools.partial(self._addSecurityGroupToVirtualNetworkDone, sg_name,
+                                 virtualNetworks), wait=wait, timeout=240)
+
+    def _addSecurityGroupToVirtualNetworkDone(self, sg_name, virtualNetworks, taskStatus):
+        '''
+            Internal Function: completes addSecurityGroupToVirtualNetwork once its task ended
+        '''
         if (taskStatus['isError']):
             self.log.error("Add sg to vn failed:{0}".format(taskStatus['failureReason']))
             return {'status':False, 
@@ -145,7 +240,7 @@ class SecurityGroups(object):
         self.log.info("#######################################################################################")
         return {"status":True}
 
-    def updateSecurityGroup(self, name, securityGroupTag=None, description="",propagateToAci=None, virtualNetworks=[]):
+    def updateSecurityGroup(self, name, securityGroupTag=None, description="",propagateToAci=None, virtualNetworks=[], wait=True):
         '''
             Function: updateSecurityGroup
             INPUTs:
@@ -153,6 +248,7 @@ class SecurityGroups(object):
                 name : Security Group Name
                 securityGroupTag: optional tag value
                 description: Optional Description
+                wait: False to return a TaskFuture instead of waiting for the task
             OUTPUT:
                 When Success: {"status":True, "failureReason":""}
                 {"status":False, "failureReason":"<Failure expanation>"
@@ -162,10 +258,14 @@ class SecurityGroups(object):
         check_type(description,basestring)
         check_type(securityGroupTag,int)
         check_type(propagateToAci,bool)
+        check_type(wait,bool)
 
         self.log.info("Updating security group")
         params= { "name" : name }
         response_sg = self.get_securityGroup(params=params)
+        if not response_sg['response']:
+            return self._task.resolved({"status" : False,'failureReason':'No response from get operation'},\
+                                       wait=wait)
         sgt_data= {
                     "id":response_sg['response'][0]['id'],
                     "resourceVersion":response_sg['response'][0]['resourceVersion'],
@@ -183,14 +283,21 @@ class SecurityGroups(object):
         if propagateToAci:
             sgt_data["propagateToAci"] = propagateToAci
         sg_response = self.put_securityGroup(json=[sgt_data])
-        taskStatus = self._task.wait_for_task_complete(sg_response, timeout=240)
+        return self._task.handle(sg_response, functools.partial(self._updateSecurityGroupDone, name,
+                                 virtualNetworks, wait), wait=wait, timeout=240)
+
+    def _updateSecurityGroupDone(self, name, virtualNetworks, wait, taskStatus):
+        '''
+            Internal Function: completes updateSecurityGroup once its task ended
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(name)
         if (taskStatus['isError']):
             self.log.error("Updating security group failed:{0}".format(taskStatus['failureReason']))
             return {'status':False, 
                     'failureReason':'Failed in updating Security Group with reason: {}'.format(taskStatus['failureReason'])}
         if virtualNetworks:
-            return self.addSecurityGroupToVirtualNetwork(name,virtualNetworks)
+            return self.addSecurityGroupToVirtualNetwork(name,virtualNetworks,wait=wait)
         return {'status':True}
 
     def checkSecurityGroupsExistingInDnac(self, securityGroupList, expect=True):
@@ -204,15 +311,16 @@ class SecurityGroups(object):
         check_type(securityGroupList,list)
         check_type(expect,bool) 
         self.log.info("Start to check sg_list in DNAC")
-        missing_list=[]
-        exist_list=[]
-        for sg in securityGroupList:
-            params= { "name" : sg }
-            response = self.get_securityGroup(params=params)
-            if response['response']:
-                exist_list.append(sg)
-            else:
-                missing_list.append(sg)
+        names = set(securityGroupList)
+        # One inventory walk when it takes fewer requests than one GET per name. A walk costs the
+        # count and at least one page, so up to 2 names are always checked one by one, without the count.
+        count = self.getSecurityGroupCount() if len(names) > 2 else {'status': False}
+        if count['status'] and len(names) > count['count'] // DEFAULT_SGT_PAGE_SIZE + 1:
+            found = set(sg['name'] for sg in self._getAllSecurityGroups()) & names
+        else:
+            found = set(sg for sg in names if self.get_securityGroup(params={"name": sg})['response'])
+        exist_list = [sg for sg in securityGroupList if sg in found]
+        missing_list = [sg for sg in securityGroupList if sg not in found]
 
         if expect and missing_list:
             return {'status':False, 'failureReason':"These expected security groups are missing in DNAC: {}".format(missing_list)}
@@ -232,6 +340,12 @@ class SecurityGroups(object):
         check_type(name,basestring)
 
         self.log.info("Fetching security group id for {}".format(name))
+        if self._sg_index is not None:
+            entry = self._sg_index.lookup(name)
+            if entry:
+                return {"status" : True, 'id':entry['id']}
+            self.log.error('No security group with name {} found in DNAC.'.format(name))
+            return {"status" : False, 'id':'', 'failureReason':'No security group with name {} found in DNAC.'.format(name)}
         params = { "name" : name }
         response_sg = self.get_securityGroup(params=params)
         self.log.debug(response_sg)
@@ -253,6 +367,12 @@ class SecurityGroups(object):
         check_type(name,basestring)
 
         self.log.info("Fetching security group tag for {}".format(name))
+        if self._sg_index is not None:
+            entry = self._sg_index.lookup(name)
+            if entry:
+                return {"status" : True, 'securityGroupTag':entry['securityGroupTag']}
+            self.log.error('No security group with name {} found in DNAC.'.format(name))
+            return {"status" : False, 'securityGroupTag':'', 'failureReason':'No security group with name {} found in DNAC.'.format(name)}
         params = { "name": name}
         response_sg = self.get_securityGroup(params=params)
         self.log.debug(response_sg)
@@ -282,19 +402,24 @@ class SecurityGroups(object):
         else:
             return {'status':False, "count":0, 'failureReason':"No Summary response from DNAC"}
 
-    def deleteSecurityGroupByName(self, name):
+    def deleteSecurityGroupByName(self, name, wait=True):
         '''
             deleteSecurityGroupByName
             description: Delete a give security group
             INPUT: name
+                   wait: False to return a TaskFuture instead of waiting for the task
             OUTPUT:
                 status:True 
                 status:False, failureReason: <reason> 
         '''
         check_type(name,basestring)
+        check_type(wait,bool)
 
         params= { "name" : name }
         response_sg = self.get_securityGroup(params=params)
+        if not response_sg['response']:
+            return self._task.resolved({"status" : False,'failureReason':'No response from get operation'},\
+                                       wait=wait)
         sgt_data= {
                     "id":response_sg['response'][0]['id'],
                     "resourceVersion":response_sg['response'][0]['resourceVersion'],
@@ -306,27 +431,27 @@ class SecurityGroups(object):
                 }
         delete_response = self.put_securityGroup(json=sgt_data)
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response)
-        self.log.info(taskStatus)
-        if (taskStatus['isError']):
-            self.log.error("Deleting security group failed:{0}".format(taskStatus['failureReason']))
-            return {"status" : False, 'failureReason':'Deleting security group {} failed:{}'.format(name,taskStatus['failureReason'])}
-        self.log.info("#----SUCCESSFULLY DELETED Security Group {}----#".format(sg_name))
-        return { "status" : True }
+        return self._task.handle(delete_response, functools.partial(self._deleteSecurityGroupDone,
+                                 sgt_data["name"]), wait=wait)
 
-    def deleteSecurityGroupByTag(self, securityGroupTag):
+    def deleteSecurityGroupByTag(self, securityGroupTag, wait=True):
         '''
             deleteSecurityGroupByTag
             description: Delete a give security group
             INPUT: securityGroupTag
+                   wait: False to return a TaskFuture instead of waiting for the task
             OUTPUT:
                 status:True 
                 status:False, failureReason: <reason> 
         '''
         check_type(securityGroupTag,int)
+        check_type(wait,bool)
 
         params = { 'securityGroupTag' : securityGroupTag }
         response_sg = self.get_securityGroup(params=params)
+        if not response_sg['response']:
+            return self._task.resolved({"status" : False,'failureReason':'No response from get operation'},\
+                                       wait=wait)
         sgt_data= {
                     "id":response_sg['response'][0]['id'],
                     "resourceVersion":response_sg['response'][0]['resourceVersion'],
@@ -339,12 +464,19 @@ class SecurityGroups(object):
         
         delete_response = self.put_securityGroup(json=sgt_data)
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response)
+        return self._task.handle(delete_response, functools.partial(self._deleteSecurityGroupDone,
+                                 sgt_data["name"]), wait=wait)
+
+    def _deleteSecurityGroupDone(self, name, taskStatus):
+        '''
+            Internal Function: completes deleteSecurityGroupByName and deleteSecurityGroupByTag once their task ended
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(name)
         if (taskStatus['isError']):
             self.log.error("Deleting security group failed:{0}".format(taskStatus['failureReason']))
             return {"status" : False, 'failureReason':'Deleting security group {} failed:{}'.format(name,taskStatus['failureReason'])}
-        self.log.info("#----SUCCESSFULLY DELETED Security Group {}----#".format(sg_name))
+        self.log.info("#----SUCCESSFULLY DELETED Security Group {}----#".format(name))
         return { "status" : True }
 
     #Deploy Functions
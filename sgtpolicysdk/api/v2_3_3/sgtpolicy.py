@@ -21,8 +21,10 @@ SOFTWARE.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from builtins import *
+import functools
 import uuid
 from past.builtins import basestring
+from ...cache import PolicyMatrixIndex, DEFAULT_POLICY_INDEX_TTL
 from ...client_manager import DnacClientManager
 from ...utils import (
     apply_path_params,
@@ -37,6 +39,7 @@ logger = logging.getLogger("SecurityGroupsPolicy")
 DEFAULT_TIMEOUT=60
 DEFAULT_TASK_COMPLETION_TIMEOUT=120
 DEFAULT_SUMMARY_TIMEOUT=240
+DEFAULT_POLICY_BATCH_SIZE=100
 
 DEFAULT_VERSION = "v2"
 POLICY_PATH = "/data/customer-facing-service/policy/access"
@@ -66,9 +69,80 @@ class SGTPolicy(object):
         self._task = session.task
         self._contract = session.accesscontracts
         self._securitygroup = session.securitygroups
+        self._policy_index = None
+        self._policy_scope = None
         self.log = logger
 
-    def createSecurityGroupPolicyFromSourceToDestinations(self, srcSGName, dstSGNames, accessContract, isEnabled=True, priority=65535):
+    def enablePolicyMatrixIndex(self, ttl=DEFAULT_POLICY_INDEX_TTL):
+        '''
+            Description: Fetch the policy list once (and every ttl seconds) into a dict keyed by
+                         (producer idRef, consumer idRef) instead of once per policy lookup.
+                         Policies created, updated or deleted through this object update the index.
+            Inputs:
+                ttl (int) : Seconds the index stays valid, None to never expire
+        '''
+        check_type(ttl,int)
+        self._policy_index = PolicyMatrixIndex(lambda: self.get_policyaccess()["response"], ttl=ttl)
+        self.log.info("Policy matrix index enabled, ttl:{}".format(ttl))
+
+    def disablePolicyMatrixIndex(self):
+        '''
+            Description: Every policy lookup fetches the policy list again.
+        '''
+        self._policy_index = None
+
+    def getPolicyScope(self, refresh=False):
+        '''
+            Description: Policy scope new policies are created in. It is read once from a single policy (limit=1)
+                         and cached, see setPolicyScope for clusters without policies.
+            Inputs:
+                refresh (boolean) : Read the scope from DNAC again
+            Return:
+                {'status':True, 'policyScope':<id>}
+                {'status':False, 'failureReason':"<Failure reason>"}
+        '''
+        check_type(refresh,bool)
+        if self._policy_scope is None or refresh:
+            policy_response = self.get_policyaccess(params={'offset': 0, 'limit': 1})
+            if not policy_response["response"]:
+                self.log.error("No policy in DNAC to read the policy scope from")
+                return {'status':False, 'failureReason':'No policy in DNAC to read the policy scope from, provide it with setPolicyScope'}
+            self._policy_scope = policy_response["response"][0]["policyScope"]
+        return {'status':True, 'policyScope':self._policy_scope}
+
+    def setPolicyScope(self, policyScope):
+        '''
+            Description: Set the policy scope new policies are created in, instead of reading it from DNAC.
+            Inputs:
+                policyScope (String) : Policy scope id
+        '''
+        check_type(policyScope,basestring,may_be_none=False)
+        self._policy_scope = policyScope
+
+    def _getPolicyBetween(self, src_sg_id, dst_sg_id):
+        '''
+            Description: Policy from a source to a destination security group id, None when not found.
+        '''
+        if self._policy_index is not None:
+            return self._policy_index.lookup(src_sg_id, dst_sg_id)
+        policy_response = self.get_policyaccess()
+        for aca in policy_response["response"]:
+            if dst_sg_id == aca["consumer"]["scalableGroup"][0]["idRef"] and src_sg_id == aca["producer"]["scalableGroup"][0]["idRef"]:
+                return aca
+        return None
+
+    def _updatePolicyIndex(self, taskStatus, action, *args):
+        '''
+            Description: Apply a policy write (PolicyMatrixIndex add/update/remove) to the index, when enabled.
+        '''
+        if self._policy_index is None:
+            return
+        if taskStatus and not taskStatus['isError']:
+            getattr(self._policy_index, action)(*args)
+        else:
+            self._policy_index.invalidate()
+
+    def createSecurityGroupPolicyFromSourceToDestinations(self, srcSGName, dstSGNames, accessContract, isEnabled=True, priority=65535, batch_size=DEFAULT_POLICY_BATCH_SIZE):
         '''
             Description: Create a SG Policy from a Single source to single or Multiple Destination
             Inputs:  
@@ -77,20 +151,18 @@ class SGTPolicy(object):
                 accessContract (String): Accesscontract name to be used for policy.
                 isEnabled (boolean) : Policy status (default enabled)
                 priority (int) :    Policy Priority (default Value 65535)
+                batch_size (int) :  Policies created per request (default Value 100)
             Return:
-                {status: True}  : When polic is successfully created.
-                {status: False, 'failureReason':"<failure description>"} When policy failed to be created with failure reason.
+                {status: True, 'results': [...]}  : When all policies are successfully created.
+                {status: False, 'failureReason':"<failure description>", 'results': [...]} When some policies failed to be created.
+                results holds one {'source', 'destination', 'status', 'failureReason'} entry per destination.
         '''
         check_type(srcSGName,basestring)
         check_type(dstSGNames,list)
-        for dstSGName in dstSGNames:
-            status = self.createSecurityGroupPolicy(srcSGName,dstSGName,accessContract,isEnabled=isEnabled,priority=priority)
-            if not status['status']:
-                self.log.error("Failed to create policy")
-                return status
-        return {'status': True} 
-
-    def createSecurityGroupPolicyFromDestinationToSources(self, srcSGNames, dstSGName, accessContract, isEnabled=True, priority=65535):
+        return self._createSecurityGroupPolicies([(srcSGName, dstSGName) for dstSGName in dstSGNames],
+                                                 accessContract, isEnabled, priority, batch_size)
+
+    def createSecurityGroupPolicyFromDestinationToSources(self, srcSGNames, dstSGName, accessContract, isEnabled=True, priority=65535, batch_size=DEFAULT_POLICY_BATCH_SIZE):
         '''
             Description: Create a SG Policy from a Single or Multiple source to single Destination Security Group
             Inputs:  
@@ -99,20 +171,108 @@ class SGTPolicy(object):
                 accessContract (String): Accesscontract name to be used for policy.
                 isEnabled (boolean) : Policy status (default enabled)
                 priority (int) :    Policy Priority (default Value 65535)
+                batch_size (int) :  Policies created per request (default Value 100)
             Return:
-                {status: True}  : When polic is successfully created.
-                {status: False, 'failureReason':"<failure description>"} When policy failed to be created with failure reason.
+                {status: True, 'results': [...]}  : When all policies are successfully created.
+                {status: False, 'failureReason':"<failure description>", 'results': [...]} When some policies failed to be created.
+                results holds one {'source', 'destination', 'status', 'failureReason'} entry per source.
         '''
         check_type(dstSGName,basestring)
         check_type(srcSGNames,list)
-        for srcSGName in srcSGNames:
-            status = self.createSecurityGroupPolicy(srcSGName,dstSGName,accessContract,isEnabled=isEnabled,priority=priority)
-            if not status['status']:
-                self.log.error("Failed to create policy")
-                return status
-        return {'status': True} 
-
-    def createSecurityGroupPolicy(self, srcSGName, dstSGName, accessContract, isEnabled=True, priority=65535):
+        return self._createSecurityGroupPolicies([(srcSGName, dstSGName) for srcSGName in srcSGNames],
+                                                 accessContract, isEnabled, priority, batch_size)
+
+    def _createSecurityGroupPolicies(self, sgPairs, accessContract, isEnabled, priority, batch_size):
+        '''
+            Description: Create the policies of many (source, destination) security group pairs. The security
+                         groups, the contract and the policy scope are resolved once and the policies are posted
+                         batch_size at a time, with one task wait per batch. A batch which raises fails its own
+                         pairs only.
+            Return: see createSecurityGroupPolicyFromSourceToDestinations
+        '''
+        check_type(accessContract,basestring)
+        check_type(priority,int)
+        check_type(batch_size,int)
+        for srcSGName, dstSGName in sgPairs:
+            check_type(srcSGName,basestring)
+            check_type(dstSGName,basestring)
+        if not accessContract:
+            return {'status':False, "failureReason":"Provide valid access contract"}
+        if batch_size < 1:
+            return {'status':False, "failureReason":"batch_size must be a positive integer"}
+
+        contract_id=None
+        contract_response = self._contract.get_contractAccessByName(accessContract)
+        for response in contract_response["response"]:
+            if response["name"] == accessContract:
+                contract_id = str(response["id"])
+        if not contract_id:
+            self.log.error("Could not create policies, as access contract:{} is not found".format(accessContract))
+            return {'status':False, "failureReason": "Access contract: {} is not found".format(accessContract)}
+
+        sg_names = set()
+        for sgPair in sgPairs:
+            sg_names.update(sgPair)
+        sg_ids = self._securitygroup.getSecurityGroupIdsByNames(list(sg_names))
+
+        results = []
+        pending = []
+        for srcSGName, dstSGName in sgPairs:
+            result = {'source': srcSGName, 'destination': dstSGName, 'status': False}
+            results.append(result)
+            missing = [name for name in (srcSGName, dstSGName) if name not in sg_ids]
+            if missing:
+                result['failureReason'] = "Security Group(s) {} not found in DNAC".format(missing)
+                continue
+            pending.append((result, {
+                "isEnabled": isEnabled,
+                "contract": {"idRef": contract_id},
+                "producer": {"scalableGroup": [{"idRef": sg_ids[srcSGName]}]},
+                "consumer": {"scalableGroup": [{"idRef": sg_ids[dstSGName]}]},
+                "priority": priority,
+                "name": str(uuid.uuid4())
+                }))
+
+        if pending:
+            scope_response = self.getPolicyScope()
+            if not scope_response["status"]:
+                for result, sgtpolicy in pending:
+                    result['failureReason'] = scope_response['failureReason']
+                pending = []
+            for result, sgtpolicy in pending:
+                sgtpolicy["policyScope"] = scope_response["policyScope"]
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            self.log.info("Creating policies {} to {} of {}".format(start + 1, start + len(batch), len(pending)))
+            try:
+                policy_response = self.post_policyaccess(json=[sgtpolicy for result, sgtpolicy in batch])
+                taskStatus = self._task.wait_for_task_complete(policy_response, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+            except Exception as error:
+                # Only this batch fails, the results of the other batches are kept
+                reason = str(error) or type(error).__name__
+            else:
+                self.log.info(taskStatus)
+                if taskStatus and not taskStatus['isError']:
+                    for result, sgtpolicy in batch:
+                        result['status'] = True
+                        self._updatePolicyIndex(taskStatus, "add", sgtpolicy)
+                    continue
+                reason = taskStatus['failureReason'] if taskStatus else 'Task did not complete'
+            self.log.error("Creating policies failed:{0}".format(reason))
+            # Part of the batch may have been created, reload the index on its next lookup
+            if self._policy_index is not None:
+                self._policy_index.invalidate()
+            for result, sgtpolicy in batch:
+                result['failureReason'] = "Creating Policy failed:{}".format(reason)
+
+        failed = ["{}->{}".format(result['source'], result['destination']) for result in results if not result['status']]
+        if failed:
+            self.log.error("Failed to create policies: {}".format(failed))
+            return {'status': False, 'failureReason': "Failed to create policies: {}".format(failed), 'results': results}
+        self.log.info("#----SUCCESSFULLY CREATED {} TRUSTSEC POLICIES with contract {}----#".format(len(results), accessContract))
+        return {'status': True, 'results': results}
+
+    def createSecurityGroupPolicy(self, srcSGName, dstSGName, accessContract, isEnabled=True, priority=65535, wait=True):
         '''
             Description: Create a SG Policy from a Single/Multiple source to single/multiple destination security groups
             Inputs:  
@@ -121,6 +281,7 @@ class SGTPolicy(object):
                 accessContract (String) : Accesscontract name to be used for policy.
                 isEnabled (boolean)     : Policy status (default enabled)
                 priority (int)          :    Policy Priority (default Value 65535)
+                wait (boolean)          : False to return a TaskFuture instead of waiting for the task
             Return:
                 {status: True}                                           : When polic is successfully created.
                 {status: False, 'failureReason':"<failure description>"} : When policy failed to be created with failure reason.
@@ -130,13 +291,14 @@ class SGTPolicy(object):
         check_type(srcSGName,basestring)
         check_type(dstSGName,basestring)
         check_type(accessContract,basestring)
+        check_type(wait,bool)
 
         if not dstSGName:
-            return {'status':False, "failureReason":"Provide Source Security Group/Groups"}
+            return self._task.resolved({'status':False, "failureReason":"Provide Source Security Group/Groups"}, wait=wait)
         if not dstSGName:
-            return {'status':False, "failureReason":"Provide Destination Security Group/Groups"}
+            return self._task.resolved({'status':False, "failureReason":"Provide Destination Security Group/Groups"}, wait=wait)
         if not accessContract:
-            return {'status':False, "failureReason":"Provide valid access contract"}
+            return self._task.resolved({'status':False, "failureReason":"Provide valid access contract"}, wait=wait)
         self.log.info("Start to create policy:{} from {} to {} with contract {}".format(policy_name, dstSGName, dstSGName, accessContract))
         srcSGIDRef=[]
         src_sg = self._securitygroup.getSecurityGroupIdByName(srcSGName)
@@ -144,14 +306,14 @@ class SGTPolicy(object):
             srcSGIDRef.append({"idRef": src_sg['id']})
         else:
             self.log.error("Could not create policy {}, as Source Security Group:{} is not found".format(policy_name,srcSGName))
-            return src_sg
+            return self._task.resolved(src_sg, wait=wait)
         dstSGIDRef=[]
         dst_sg = self._securitygroup.getSecurityGroupIdByName(dstSGName)
         if dst_sg['status']:
             dstSGIDRef.append({"idRef": dst_sg['id']})
         else:
             self.log.error("Could not create policy {}, as Destination Security Group:{} is not found".format(policy_name,dstSGName))
-            return dst_sg
+            return self._task.resolved(dst_sg, wait=wait)
         self.log.info("get contract info")
         contract_id=None
         contract_response = self._contract.get_contractAccessByName(accessContract)
@@ -159,8 +321,10 @@ class SGTPolicy(object):
             if response["name"] == accessContract:
                 contract_id = str(response["id"])
         if contract_id:
-            access_policy_response = self.get_policyaccess()
-            policy_scope_id = access_policy_response["response"][0]["policyScope"]
+            scope_response = self.getPolicyScope()
+            if not scope_response["status"]:
+                return self._task.resolved(scope_response, wait=wait)
+            policy_scope_id = scope_response["policyScope"]
             self.log.info("Inside create new policy the Idref of the contract is: {0}".format(contract_id))
             sgtpolicy_data = [{
                 "isEnabled": isEnabled,
@@ -178,18 +342,26 @@ class SGTPolicy(object):
                 "name": policy_name
                 }]
             policy_response = self.post_policyaccess(json=sgtpolicy_data)
-            taskStatus = self._task.wait_for_task_complete(policy_response, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
-            self.log.info(taskStatus)
-            if (taskStatus['isError']):
-                self.log.error("Creating policy failed:{0}".format(taskStatus['failureReason']))
-                return {'status':False, "failureReason":"Creating Policy {} failed:{}".format(taskStatus['failureReason'])}
-            self.log.info("######################################################################################################")
-            self.log.info("#----SUCCESSFULLY CREATED TRUSTSEC POLICY from {} to {} with contract {}----#".format(srcSGName, dstSGName, accessContract))
-            self.log.info("######################################################################################################")
-            return {'status':True, 'taskStatus': taskStatus}
+            return self._task.handle(policy_response, functools.partial(self._createSecurityGroupPolicyDone,
+                                     srcSGName, dstSGName, accessContract, policy_name, sgtpolicy_data[0]),
+                                     wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
         else:
             self.log.error("Could not create policy {}, as access contract:{} is not found".format(policy_name,accessContract))
-            return {'status':False, "failureReason": "Access contract: {} is not found".format(accessContract)}
+            return self._task.resolved({'status':False, "failureReason": "Access contract: {} is not found".format(accessContract)}, wait=wait)
+
+    def _createSecurityGroupPolicyDone(self, srcSGName, dstSGName, accessContract, policy_name, policy, taskStatus):
+        '''
+            Description: Completes createSecurityGroupPolicy once its task ended.
+        '''
+        self.log.info(taskStatus)
+        self._updatePolicyIndex(taskStatus, "add", policy)
+        if (taskStatus['isError']):
+            self.log.error("Creating policy failed:{0}".format(taskStatus['failureReason']))
+            return {'status':False, "failureReason":"Creating Policy {} failed:{}".format(policy_name, taskStatus['failureReason'])}
+        self.log.info("######################################################################################################")
+        self.log.info("#----SUCCESSFULLY CREATED TRUSTSEC POLICY from {} to {} with contract {}----#".format(srcSGName, dstSGName, accessContract))
+        self.log.info("######################################################################################################")
+        return {'status':True, 'taskStatus': taskStatus}
 
     def deploy(self,timeout=DEFAULT_TASK_COMPLETION_TIMEOUT):
         """
@@ -210,12 +382,13 @@ class SGTPolicy(object):
         self.log.info("######################################################################################################")
         return {'status':True, 'taskStatus': taskStatus}
 
-    def deleteSecurityGroupPolicy(self, srcSGName, dstSGName):
+    def deleteSecurityGroupPolicy(self, srcSGName, dstSGName, wait=True):
         """
         Delete deleteSecurityGroupPolicy
         Args:
             srcSGName(str): Source security group name
             dstSGName(str): Destination security group name
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raise:
             TypeError: If the parameter types are incorrect.
         Return:
@@ -224,10 +397,11 @@ class SGTPolicy(object):
         """
         check_type(srcSGName,basestring)
         check_type(dstSGName,basestring)
+        check_type(wait,bool)
         if not srcSGName:
-            return {'status':False, "failureReason":"Provide Valid Source Security Group"}
+            return self._task.resolved({'status':False, "failureReason":"Provide Valid Source Security Group"}, wait=wait)
         if not dstSGName:
-            return {'status':False, "failureReason":"Provide Valid Destination Security Group"}
+            return self._task.resolved({'status':False, "failureReason":"Provide Valid Destination Security Group"}, wait=wait)
 
         self.log.info("Delete policy from {} to {}".format(srcSGName, dstSGName))
         delete_id = ""
@@ -239,38 +413,43 @@ class SGTPolicy(object):
             src_sg_id= src_sg['id']
         else:
             self.log.error("Could not delete policy as Source Security Group:{} is not found".format(srcSGName))
-            return src_sg
+            return self._task.resolved(src_sg, wait=wait)
 
         dst_sg = self._securitygroup.getSecurityGroupIdByName(dstSGName)
         if dst_sg['status']:
             dst_sg_id= dst_sg['id']
         else:
             self.log.error("Could not delete policy as Destination Security Group:{} is not found".format(dstSGName))
-            return dst_sg
+            return self._task.resolved(dst_sg, wait=wait)
 
-        policy_response = self.get_policyaccess()
         if src_sg_id == '' or dst_sg_id == '' :
             self.log.error("The source or destination security group is not found")
-            return {'status':False, 'failureReason': "The source or destination security group is not found"}
+            return self._task.resolved({'status':False, 'failureReason': "The source or destination security group is not found"}, wait=wait)
 
-        for aca in policy_response["response"]:
-            if dst_sg_id == aca["consumer"]["scalableGroup"][0]["idRef"] and src_sg_id == aca["producer"]["scalableGroup"][0]["idRef"]:
-                delete_id = aca["id"]
-                self.log.info("Policy id {} found n between source SG {} to destination SG {}".format(delete_id,srcSGName,dstSGName))
+        aca = self._getPolicyBetween(src_sg_id, dst_sg_id)
+        if aca is not None:
+            delete_id = aca["id"]
+            self.log.info("Policy id {} found n between source SG {} to destination SG {}".format(delete_id,srcSGName,dstSGName))
 
         if delete_id == '':
             self.log.error("No policy found in between source SG {} to destination SG {}".format(srcSGName,dstSGName))
-            return {'status':False, 'failureReason': "No policy found in between source SG {} to destination SG {}".format(srcSGName,dstSGName)}
+            return self._task.resolved({'status':False, 'failureReason': "No policy found in between source SG {} to destination SG {}".format(srcSGName,dstSGName)}, wait=wait)
 
         delete_response = self.delete_policyaccessById(delete_id)
         self.log.info(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(delete_response, functools.partial(self._deleteSecurityGroupPolicyDone,
+                                 srcSGName, dstSGName, src_sg_id, dst_sg_id, delete_id),
+                                 wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _deleteSecurityGroupPolicyDone(self, srcSGName, dstSGName, src_sg_id, dst_sg_id, delete_id, taskStatus):
+        """ Completes deleteSecurityGroupPolicy once its task ended. """
         self.log.info(taskStatus)
+        self._updatePolicyIndex(taskStatus, "remove", src_sg_id, dst_sg_id)
         if (taskStatus['isError']):
             self.log.error("Deleting policy failed:{0}".format(taskStatus['failureReason']))
-            return {'status':False, "failureReason":"Deleting Policy {} failed:{}".format(taskStatus['failureReason'])}
+            return {'status':False, "failureReason":"Deleting Policy {} failed:{}".format(delete_id, taskStatus['failureReason'])}
         self.log.info("###############################################################################################")
-        self.log.info("#----SUCCESSFULLY DELETED TRUSTSEC POLICY from {} to {}----#".format(src_sg_name, dst_sg_name))
+        self.log.info("#----SUCCESSFULLY DELETED TRUSTSEC POLICY from {} to {}----#".format(srcSGName, dstSGName))
         self.log.info("###############################################################################################")
         return {'status':True, 'taskStatus': taskStatus}
 
@@ -322,22 +501,20 @@ class SGTPolicy(object):
             self.log.error("Could not get policy detail as destination security group:{} is not found".format(dstSGName))
             return dst_sg
 
-        policy_response = self.get_policyaccess()
         if src_sg_id == '' or dst_sg_id == '' :
             self.log.error("The source or destination security group is not found")
             return {'status':False, 'failureReason': "The source or destination security group is not found"}
 
-        for aca in policy_response["response"]:
-            if dst_sg_id == aca["consumer"]["scalableGroup"][0]["idRef"] and src_sg_id == aca["producer"]["scalableGroup"][0]["idRef"]:
-                policy_data = aca
-                self.log.info("Policy id {} found in between source SG {} to destination SG {}".format(aca['id'],srcSGName,dstSGName))
+        policy_data = self._getPolicyBetween(src_sg_id, dst_sg_id)
+        if policy_data:
+            self.log.info("Policy id {} found in between source SG {} to destination SG {}".format(policy_data['id'],srcSGName,dstSGName))
 
         if not policy_data:
             self.log.error("No policy found in between source SG {} to destination SG {}".format(srcSGName,dstSGName))
             return {'status':False, 'failureReason': "No policy found in between source SG {} to destination SG {}".format(srcSGName,dstSGName)}
         return {'status':True, 'response':policy_data}
 
-    def updatePolicyStatusContract(self, src_sg_name, dst_sg_name, mode=None, new_contract_name=None):
+    def updatePolicyStatusContract(self, src_sg_name, dst_sg_name, mode=None, new_contract_name=None, wait=True):
         """
         Update policy details
         Args:
@@ -345,6 +522,7 @@ class SGTPolicy(object):
             dst_sg_name(str): Destination security group name
             mode(str): Mode of policy
             new_contract_name(str): contract name to be updated
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect.        
         """
@@ -352,6 +530,7 @@ class SGTPolicy(object):
         check_type(dst_sg_name,basestring)
         check_type(mode,basestring)
         check_type(new_contract_name,basestring)
+        check_type(wait,bool)
         
         self.log.info("Start to update policy from {} to {} in DNAC".format(src_sg_name, dst_sg_name))
         policy_id = ""
@@ -359,32 +538,31 @@ class SGTPolicy(object):
         src_sg_id = ""
         dst_sg_id = ""
         
-        src_sg = self._securitygroup.getSecurityGroupIdByName(srcSGName)
+        src_sg = self._securitygroup.getSecurityGroupIdByName(src_sg_name)
         if src_sg['status']:
             src_sg_id= src_sg['id']
         else:
-            self.log.error("Could not get policy details as source security group:{} is not found".format(srcSGName))
-            return src_sg
+            self.log.error("Could not get policy details as source security group:{} is not found".format(src_sg_name))
+            return self._task.resolved(src_sg, wait=wait)
 
-        dst_sg = self._securitygroup.getSecurityGroupIdByName(dstSGName)
+        dst_sg = self._securitygroup.getSecurityGroupIdByName(dst_sg_name)
         if dst_sg['status']:
             dst_sg_id= dst_sg['id']
         else:
-            self.log.error("Could not get policy detail as destination security group:{} is not found".format(dstSGName))
-            return dst_sg
-        for aca in policy_response["response"]:
-            if dst_sg_id in aca["consumer"]["scalableGroup"][0]["idRef"] and src_sg_id in aca["producer"]["scalableGroup"][0]["idRef"]:
-                policy_id = aca["id"]
-                policy_scope = aca['policyScope']
-                policy_name = aca['name']
-                policy_status = aca['policyStatus']
-                contract_id = aca['contract']['idRef']
-                policy_priority = aca['priority']
-                self.log.info(policy_id)
-                break
+            self.log.error("Could not get policy detail as destination security group:{} is not found".format(dst_sg_name))
+            return self._task.resolved(dst_sg, wait=wait)
+        aca = self._getPolicyBetween(src_sg_id, dst_sg_id)
+        if aca is not None:
+            policy_id = aca["id"]
+            policy_scope = aca['policyScope']
+            policy_name = aca['name']
+            policy_status = aca['policyStatus']
+            contract_id = aca['contract']['idRef']
+            policy_priority = aca['priority']
+            self.log.info(policy_id)
         if policy_id == '':
             self.log.error('Policy isnot found')
-            return {"status": False, 'failureReason': "No Policy found with source SG:{} and destination SG:{}".format(src_sg_name,dst_sg_name)}
+            return self._task.resolved({"status": False, 'failureReason': "No Policy found with source SG:{} and destination SG:{}".format(src_sg_name,dst_sg_name)}, wait=wait)
 
         if mode is not None:
             policy_status = mode
@@ -397,7 +575,7 @@ class SGTPolicy(object):
                     break
             if contract_id == '':
                 self.log.error('The new contract {} is not found'.format(new_contract_name))
-                return {"status": False,'failureReason': 'The new contract {} is not found'.format(new_contract_name)}
+                return self._task.resolved({"status": False,'failureReason': 'The new contract {} is not found'.format(new_contract_name)}, wait=wait)
         sgtpolicy_data = [{
                 "id": policy_id,
                 "policyScope": policy_scope,
@@ -410,8 +588,14 @@ class SGTPolicy(object):
                 }]
 
         policy_response = self.put_policyaccess(json=sgtpolicy_data)
-        taskStatus = self._task.wait_for_task_complete(policy_response, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(policy_response, functools.partial(self._updatePolicyStatusContractDone,
+                                 src_sg_name, dst_sg_name, sgtpolicy_data[0]),
+                                 wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _updatePolicyStatusContractDone(self, src_sg_name, dst_sg_name, policy, taskStatus):
+        """ Completes updatePolicyStatusContract once its task ended. """
         self.log.info(taskStatus)
+        self._updatePolicyIndex(taskStatus, "update", policy)
         if (taskStatus['isError']):
             self.log.error("Updating policy failed:{0}".format(taskStatus['failureReason']))
             return {'status':False,
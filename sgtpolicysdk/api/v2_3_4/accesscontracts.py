@@ -19,11 +19,14 @@ SOFTWARE.
 """
 
 from __future__ import absolute_import, division, print_function, unicode_literals
+import functools
 import logging
 from builtins import *
 from past.builtins import basestring
 from ...client_manager import DnacClientManager
+from ...pagination import paginate, fetch_all, DEFAULT_PAGE_SIZE, DEFAULT_FETCH_WORKERS
 from ...utils import check_type
+from ...verification import verify_inventory, field_key
 
 logger = logging.getLogger("accessContracts")
 
@@ -61,7 +64,7 @@ class AccessContracts(object):
         self._task = session.task
         self.log = logger
 
-    def createNewContract(self,contract_name,description=None,contract_data = None):
+    def createNewContract(self,contract_name,description=None,contract_data = None, wait=True):
         """
         Create access contract for Group Based Access Control
 
@@ -74,17 +77,20 @@ class AccessContracts(object):
                   "dstNetworkIdentities"(Mandatory):[{"protocol":"UDP","ports":"9207"},
                                           {"protocol":"TCP","ports":"9207"}],
                   "logging"(Mandatory): "OFF"}]
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect.
         """
         check_type(contract_name,basestring)
         check_type(description,basestring)
         check_type(contract_data,list)
+        check_type(wait,bool)
 
         if description is None:
             description = ""
         if contract_data is None:
-            return {"status" : False,"reason": "Contract data input is Mandatory"}
+            return self._task.resolved({"status" : False,"reason": "Contract data input is Mandatory"},\
+                                       wait=wait)
         new_contract = [
             {
                 "name" : contract_name,
@@ -96,8 +102,13 @@ class AccessContracts(object):
         ]
         contract_response = self.post_contractAccess(json=new_contract, \
                                              timeout=DEFAULT_AC_TIMEOUT)
-        taskStatus = self._task.wait_for_task_complete(contract_response,\
-                                timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(contract_response, functools.partial(self._createNewContractDone,\
+                                 contract_name), wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _createNewContractDone(self, contract_name, taskStatus):
+        """
+        Complete createNewContract once its task ended.
+        """
         self.log.info(taskStatus)
         if (taskStatus['isError']):
             self.log.error("creating new contract failed:{0}".format\
@@ -113,7 +124,7 @@ class AccessContracts(object):
             return {'status':True,'TaskStatus': taskStatus}
 
     def updateAccessContract(self, contract_name,description=None,contract_data=None,\
-                                                           clause=None):
+                                                           clause=None, wait=True):
         """
         Update Access Contract for Group Based Access Control
 
@@ -127,6 +138,7 @@ class AccessContracts(object):
                                           {"protocol":"TCP","ports":"9207"}],
                   "logging"(Mandatory): "OFF"}]
             clause(list): Global parameter for contract data
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect.
         """
@@ -134,13 +146,15 @@ class AccessContracts(object):
         check_type(description,basestring)
         check_type(contract_data,list)
         check_type(clause,list)
+        check_type(wait,bool)
 
         self.log.info("Start to update contract {}".format(contract_name))
         self.log.info("Update contract")
         params = {"name" : contract_name}
         contract_response = self.get_contractAccess(params=params)
         if not contract_response['response']:
-            return {'status':False,'failureReason':"Not got output from get operation"}
+            return self._task.resolved({'status':False,'failureReason':"Not got output from get operation"},\
+                                       wait=wait)
         ac_data = {
             "id": contract_response['response'][0]['id'],
             "name":contract_response['response'][0]['name'],
@@ -160,8 +174,13 @@ class AccessContracts(object):
 
         contract_response = self.put_contractAccess(json=[ac_data],\
                                                         timeout=DEFAULT_SUMMARY_TIMEOUT)
-        taskStatus = self._task.wait_for_task_complete(contract_response, \
-                                                        timeout=DEFAULT_SUMMARY_TIMEOUT)
+        return self._task.handle(contract_response, functools.partial(self._updateAccessContractDone,\
+                                 contract_name), wait=wait, timeout=DEFAULT_SUMMARY_TIMEOUT)
+
+    def _updateAccessContractDone(self, contract_name, taskStatus):
+        """
+        Complete updateAccessContract once its task ended.
+        """
         self.log.info(taskStatus)
         if (taskStatus['isError']):
             self.log.error("Updating contract failed:{0}".format(taskStatus['failureReason']))
@@ -173,19 +192,20 @@ class AccessContracts(object):
             self.log.info("################################################################")
             return {'status':True}
 
-    def delete_contractAccessByName(self, contract_name):
+    def delete_contractAccessByName(self, contract_name, wait=True):
         """
         DELETE a single contract with the given name
 
         Args:
             contract_name(str): Access Contract name
-            kwargs (dict): additional parameters to be passed
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Returns:
             dict: response of api call
         Raises:
             ApiClientException: when unexpected query parameters are passed.
         """
         check_type(contract_name,basestring)
+        check_type(wait,bool)
 
         url = '/'+ DEFAULT_VERSION + CONTRACT_URL_PATH2
         contract_response = self.get_contractAccessSummary()
@@ -193,7 +213,7 @@ class AccessContracts(object):
                                   ['acaContractSummary'])) if ac['name'] == contract_name]
         if len(delete_list) == 0:
             self.log.error("No contract name exist to delete it")
-            return {"status" : False}
+            return self._task.resolved({"status" : False}, wait=wait)
         else:
             ac_data = {
                 "deleteList": delete_list,
@@ -201,7 +221,13 @@ class AccessContracts(object):
 
         delete_response = self.post_contractAccess(url=url,json=ac_data)
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response)
+        return self._task.handle(delete_response, functools.partial(self._delete_contractAccessByNameDone,\
+                                 contract_name), wait=wait)
+
+    def _delete_contractAccessByNameDone(self, contract_name, taskStatus):
+        """
+        Complete delete_contractAccessByName once its task ended.
+        """
         self.log.info(taskStatus)
         if (taskStatus['isError']):
             self.log.error("Deleting access contract failed:{0}".\
@@ -224,7 +250,7 @@ class AccessContracts(object):
             ApiClientException: when parameters are passed
         """
         self.log.info("Start to count contract in DNAC")
-        params = {'offset': 0, 'limit': 5000, 'contractSummary': 'true'}
+        params = {'offset': 0, 'limit': 10, 'contractSummary': 'true'}
         contract_response = self.get_contractAccessSummary(params=params,\
                                                          timeout=DEFAULT_SUMMARY_TIMEOUT)
         self.log.info(contract_response)
@@ -232,26 +258,77 @@ class AccessContracts(object):
         count = contract_response_sum["totalContractCount"]
         return {'status':True,'Total Contract Count':count}
 
-    def getAllContractName(self):
+    def getAllContractName(self, stream=False):
         """
         GET all contract name list
 
+        Args:
+            stream(bool): read the summary records one at a time while they are received, see
+                          iter_contractAccessSummary
         Returns:
             Total Contract name list present in DNAC.
         Raises:
             ApiClientException: when parameters are passed.
         """
+        check_type(stream,bool)
         self.log.info("Start to get all contract names in DNAC")
-        contractlist = []
         params = {'offset': 0, 'limit': 5000, 'contractSummary': 'true'}
-        contract_response = self.get_contractAccessSummary(params=params,\
-                                                       timeout=DEFAULT_SUMMARY_TIMEOUT)
-        contract_response_sum = contract_response["response"][0]
-        for response in contract_response_sum["acaContractSummary"]:
-            name = response["name"]
-            contractlist.append(name)
+        if stream:
+            contract_summary = self.iter_contractAccessSummary(params=params, timeout=DEFAULT_SUMMARY_TIMEOUT)
+        else:
+            contract_response = self.get_contractAccessSummary(params=params,\
+                                                           timeout=DEFAULT_SUMMARY_TIMEOUT)
+            contract_summary = contract_response["response"][0]["acaContractSummary"]
+        contractlist = [response["name"] for response in contract_summary]
         return {"status": True,'ContractNameList': contractlist}
 
+    def getAllContracts(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_FETCH_WORKERS):
+        """
+        GET every access contract in DNAC. The pages are planned from the contract count of the
+        summary and fetched by up to max_workers concurrent requests.
+
+        Args:
+            page_size(int): number of contracts per request
+            max_workers(int): maximum number of requests in flight
+        Returns:
+            dict: status and ContractList, the access contracts in DNAC order
+        Raises:
+            TypeError: If the parameter types are incorrect.
+        """
+        check_type(page_size,int,may_be_none=False)
+        check_type(max_workers,int,may_be_none=False)
+
+        total = self.getContractCount()['Total Contract Count']
+
+        def fetch_page(offset, limit):
+            params = {'offset': offset, 'limit': limit}
+            return self.get_contractAccess(params=params, timeout=DEFAULT_SUMMARY_TIMEOUT)["response"]
+        contracts = fetch_all(fetch_page, total, page_size=page_size, max_workers=max_workers)
+        return {"status": True, 'ContractList': contracts}
+
+    def iter_contracts(self, page_size=DEFAULT_PAGE_SIZE, prefetch=True, params=None):
+        """
+        Iterate over the access contracts in DNAC, requesting them page_size at a time.
+        The next page is fetched in the background while the current one is consumed.
+
+        Args:
+            page_size(int): number of contracts per request
+            prefetch(bool): False to fetch a page only once the previous one is consumed
+            params(dict): additional query parameters, e.g. {'name': 'PERMIT_HTTP'}
+        Returns:
+            generator: access contracts
+        Raises:
+            TypeError: If the parameter types are incorrect.
+        """
+        check_type(page_size,int,may_be_none=False)
+        check_type(prefetch,bool)
+        check_type(params,dict)
+
+        def fetch_page(offset, limit):
+            page_params = dict(params or {}, offset=offset, limit=limit)
+            return self.get_contractAccess(params=page_params, timeout=DEFAULT_SUMMARY_TIMEOUT)["response"]
+        return paginate(fetch_page, page_size=page_size, prefetch=prefetch)
+
     def verifyContractExistInDnac(self, contract_list, expect=True):
         """
         Verify access contract present in DNAC.
@@ -269,8 +346,9 @@ class AccessContracts(object):
         missing_list= []
         exist_list = []
         contractlist_aca = self.getAllContractName()['ContractNameList']
+        contract_names = set(contractlist_aca)
         for name in contract_list:
-            if name in contractlist_aca:
+            if name in contract_names:
                 exist_list.append(name)
             else:
                 missing_list.append(name)
@@ -299,6 +377,25 @@ class AccessContracts(object):
                                      "or have different information".format(exist_list))
                 return False
 
+    def verifyContracts(self, contracts):
+        """
+        Verify many access contracts with one paginated fetch of the contract inventory.
+
+        Args:
+            contracts(list): contract names, or contract dicts whose other fields are compared
+                             with DNAC, e.g. {'name': 'PERMIT_HTTP', 'description': 'http only'}
+        Returns:
+            dict: status, exist and missing (sets of names) and mismatches
+                  (name -> field -> expected and actual values)
+        Raises:
+            TypeError: If the parameter types are incorrect.
+        """
+        check_type(contracts,list)
+
+        self.log.info("Start to verify {} contracts in DNAC".format(len(contracts)))
+        inventory = self.getAllContracts()['ContractList']
+        return verify_inventory(contracts, inventory, field_key('name'))
+
     #============================      Base APIs   ====================================
     #==================================================================================
     def get_contractAccess(self, **kwargs):
@@ -341,6 +438,25 @@ class AccessContracts(object):
         self.log.info("Response {}".format(response))
         return response
 
+    def iter_contractAccessSummary(self, **kwargs):
+        """
+        GET contract access summary, yielding the acaContractSummary records one at a time
+
+        The response is streamed and parsed incrementally, so the memory used does not depend on the number
+        of contracts. It bypasses the response cache.
+
+        Args:
+            kwargs (dict): additional parameters to be passed
+        Returns:
+            generator: acaContractSummary records
+        Raises:
+            ApiClientException: when unexpected query parameters are passed.
+        """
+        url = '/'+ DEFAULT_VERSION + CONTRACT_URL_SUMMARY_PATH
+        method = 'GET'
+        self.log.info("Method {} \nURL {} \nData {}".format(method, url, kwargs))
+        return self._session.stream_items(method, url, ("response", 0, "acaContractSummary"), **kwargs)
+
     def _get_contractAccessById(self, instance_uuid,**kwargs):
         """
         GET request for contract access by Instace ID
@@ -19,11 +19,15 @@ SOFTWARE.
 """
 
 from __future__ import absolute_import, division, print_function, unicode_literals
+import functools
 import logging
 from builtins import *
 from past.builtins import basestring
+from ...cache import SecurityGroupIndex, DEFAULT_SG_INDEX_TTL, DEFAULT_SG_INDEX_MAX_SIZE
 from ...client_manager import DnacClientManager
+from ...pagination import paginate, fetch_all, DEFAULT_FETCH_WORKERS
 from ...utils import check_type
+from ...verification import verify_inventory, field_key
 
 logger = logging.getLogger("SecurityGroups")
 
@@ -32,6 +36,11 @@ DEFAULT_SGT_TIMEOUT=60
 DEFAULT_TASK_COMPLETION_TIMEOUT=120
 DEFAULT_SUMMARY_TIMEOUT=240
 
+#Default Batch and Page Sizes
+DEFAULT_SGT_BATCH_SIZE=100
+DEFAULT_SGT_PAGE_SIZE=500
+DEFAULT_VN_BATCH_SIZE=50
+
 #URLs
 PATH_SG = '/v2/data/customer-facing-service/scalablegroup/access'
 PATH_SG_SUM = "/v2/data/customer-facing-service/summary/scalablegroup/access"
@@ -59,10 +68,64 @@ class SecurityGroups(object):
         super(SecurityGroups, self).__init__()
         self._session = session._session
         self._task = session.task
+        self._sg_index = None
         self.log = logger
 
+    def enableSecurityGroupIndex(self, ttl=DEFAULT_SG_INDEX_TTL, max_size=DEFAULT_SG_INDEX_MAX_SIZE):
+        '''
+        Enable the in-memory Security Group index.
+
+        Name to {id, securityGroupTag, resourceVersion} lookups are then served from one
+        paginated inventory fetch, refreshed every ttl seconds, instead of one GET per
+        lookup. Security Groups created, updated or deleted through this object are
+        invalidated and queried again on their next lookup.
+
+        Args:
+            ttl(int): Seconds the index stays valid, None to never expire
+            max_size(int): Maximum number of Security Groups kept (LRU), None for no bound
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        check_type(ttl,int)
+        check_type(max_size,int)
+
+        self._sg_index = SecurityGroupIndex(self._getAllSecurityGroups, self._getSecurityGroupsByName,
+                                            ttl=ttl, max_size=max_size)
+        self.log.info("Security group index enabled, ttl:{} max_size:{}".format(ttl, max_size))
+
+    def disableSecurityGroupIndex(self):
+        '''
+        Disable the in-memory Security Group index, every lookup queries DNAC again.
+        '''
+        self._sg_index = None
+
+    def refreshSecurityGroupIndex(self):
+        '''
+        Reload the in-memory Security Group index from DNAC.
+
+        Returns:
+            dict: {'status': True/False, 'failureReason': <reason>}
+        '''
+        if self._sg_index is None:
+            return {'status':False, 'failureReason':'Security group index is not enabled'}
+        self._sg_index.load()
+        return {'status':True}
+
+    def _invalidateSecurityGroupIndex(self, *names):
+        '''
+        Drop Security Groups changed by a write from the index, when enabled.
+        '''
+        if self._sg_index is not None:
+            self._sg_index.invalidate(*names)
+
+    def _getSecurityGroupsByName(self, name):
+        '''
+        GET the Security Groups matching a name.
+        '''
+        return self.get_securityGroup(params={"name": name}, timeout=DEFAULT_SGT_TIMEOUT)['response']
+
     def createSecurityGroup(self, sgName, sgTag, sgDescription=None,\
-                                              virtualNetworks=None):
+                                              virtualNetworks=None, wait=True):
         '''
         Create Security Group in DNAC.
 
@@ -71,6 +134,7 @@ class SecurityGroups(object):
             sgTag(int): Tag number of Security Group
             sgDescription(str): Description of Security Group
             virtualNetworks(list): list of Virtual Networks
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect
         '''
@@ -78,6 +142,7 @@ class SecurityGroups(object):
         check_type(sgTag,int)
         check_type(sgDescription,basestring)
         check_type(virtualNetworks,list)
+        check_type(wait,bool)
 
         if sgDescription is None:
             sgDescription = ""
@@ -93,9 +158,16 @@ class SecurityGroups(object):
         sg_response = self.post_securityGroup(json=security_groups, \
                                       timeout=DEFAULT_SGT_TIMEOUT)
         self.log.info(sg_response)
-        taskStatus = self._task.wait_for_task_complete(sg_response, \
-                          timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(sg_response, functools.partial(self._createSecurityGroupDone,\
+                                 sgName, virtualNetworks, wait), wait=wait,\
+                                 timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _createSecurityGroupDone(self, sgName, virtualNetworks, wait, taskStatus):
+        '''
+        Complete createSecurityGroup once its task ended, chaining the Virtual Network update.
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(sgName)
         if (taskStatus['isError']):
             self.log.error("Creating a new security group failed:{0}".format\
                                                (taskStatus['failureReason']))
@@ -107,27 +179,345 @@ class SecurityGroups(object):
                                                           .format(sgName))
         if virtualNetworks is None:
             virtualNetworks = ['DEFAULT_VN']
-        return self.addSecurityGroupToVirtualNetwork(sgName, virtualNetworks)
+        return self.addSecurityGroupToVirtualNetwork(sgName, virtualNetworks, wait=wait)
+
+    def createSecurityGroups(self, securityGroups, batch_size=DEFAULT_SGT_BATCH_SIZE):
+        '''
+        Create many Security Groups in DNAC.
 
-    def addSecurityGroupToVirtualNetwork(self, sg_name, virtualNetworks):
+        Every batch of batch_size Security Groups is created with one POST and one
+        task wait. The created Security Groups are then added to their Virtual Networks
+        in bulk, with one name resolution for all the batches, see
+        addSecurityGroupsToVirtualNetworks. A batch which raises fails its own
+        Security Groups only.
+
+        Args:
+            securityGroups(list): list of dicts, one per Security Group:
+                {"sgName"(Mandatory): "SGT1",
+                 "sgTag"(Mandatory): 1001,
+                 "sgDescription": "Sample SGT",
+                 "virtualNetworks": ["DEFAULT_VN"]}
+            batch_size(int): Number of Security Groups created per request
+        Returns:
+            dict: {'status': True/False, 'results': [{'name':<sgName>, 'status':True/False,
+                   'failureReason':<reason>}, ...]} with one result per Security Group,
+                   in input order
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        check_type(securityGroups,list)
+        check_type(batch_size,int)
+        for sg in securityGroups:
+            check_type(sg,dict)
+            check_type(sg.get("sgName"),basestring,may_be_none=False)
+            check_type(sg.get("sgTag"),int,may_be_none=False)
+            check_type(sg.get("sgDescription"),basestring)
+            check_type(sg.get("virtualNetworks"),list)
+        if batch_size < 1:
+            return {'status':False, 'failureReason':'batch_size must be a positive integer'}
+
+        results = []
+        sgVnMap = {}
+        for start in range(0, len(securityGroups), batch_size):
+            batch = securityGroups[start:start + batch_size]
+            self.log.info("Creating security groups {} to {} of {}".format(start + 1,\
+                                            start + len(batch), len(securityGroups)))
+            try:
+                batch_results = self._createSecurityGroupBatch(batch)
+            except Exception as error:
+                self.log.error("Creating security groups {} to {} failed:{}".format(start + 1,\
+                                                          start + len(batch), error))
+                batch_results = [{'name':sg["sgName"], 'status':False, 'failureReason':
+                                  "Creating security group {} failed:{}".format(sg["sgName"], error)}
+                                 for sg in batch]
+            for sg, result in zip(batch, batch_results):
+                if result['status']:
+                    sgVnMap[sg["sgName"]] = sg.get("virtualNetworks") or ['DEFAULT_VN']
+            results.extend(batch_results)
+
+        if sgVnMap:
+            vn_results = dict((result['name'], result) for result in\
+                              self._updateVirtualNetworkMembershipSafely(sgVnMap))
+            results = [vn_results[result['name']] if result['status'] else result for result in results]
+
+        failed = [result['name'] for result in results if not result['status']]
+        if failed:
+            self.log.error("Creating security groups failed for: {}".format(failed))
+        else:
+            self.log.info("#----SUCCESSFULLY CREATED {} SECURITY GROUPS----#".format(len(results)))
+        return {'status':not failed, 'results':results}
+
+    def _createSecurityGroupBatch(self, batch):
+        '''
+        Create one batch of Security Groups, their Virtual Networks are left to the caller.
+
+        Args:
+            batch(list): Security Group specs, see createSecurityGroups
+        Returns:
+            list: per Security Group results, in batch order
+        '''
+        security_groups = [
+            {
+                "description": sg.get("sgDescription") or "",
+                "name": sg["sgName"],
+                "scalableGroupType": "USER_DEVICE",
+                "securityGroupTag": sg["sgTag"]
+            } for sg in batch
+        ]
+        sg_response = self.post_securityGroup(json=security_groups, \
+                                      timeout=DEFAULT_SGT_TIMEOUT)
+        self.log.info(sg_response)
+        taskStatus = self._task.wait_for_task_complete(sg_response, \
+                          timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(*[sg["sgName"] for sg in batch])
+        if not taskStatus or taskStatus['isError']:
+            reason = taskStatus['failureReason'] if taskStatus else 'Task did not complete'
+            self.log.error("Creating security groups failed:{0}".format(reason))
+            return [{'name':sg["sgName"], 'status':False,
+                     'failureReason':"Creating security group {} failed:{}".format(sg["sgName"], reason),
+                     'TaskStatus':taskStatus} for sg in batch]
+        return [{'name':sg["sgName"], 'status':True, 'TaskStatus':taskStatus} for sg in batch]
+
+    def addSecurityGroupsToVirtualNetworks(self, sgVnMap, batch_size=DEFAULT_VN_BATCH_SIZE):
+        '''
+        Add many Security Groups to many Virtual Networks.
+
+        The Virtual Network list and the Security Group ids are fetched once, all the
+        idRefs are merged in memory and the changed Virtual Networks are updated with
+        one putVirtualNetwork (and one task wait) per batch_size Virtual Networks.
+
+        Args:
+            sgVnMap(dict): Security Group name -> list of Virtual Network names
+            batch_size(int): Number of Virtual Networks updated per request
+        Returns:
+            dict: {'status': True/False, 'results': [{'name':<sg name>, 'status':True/False,
+                   'failureReason':<reason>}, ...]}
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        return self._changeVirtualNetworkMembership(sgVnMap, batch_size, remove=False)
+
+    def removeSecurityGroupsFromVirtualNetworks(self, sgVnMap, batch_size=DEFAULT_VN_BATCH_SIZE):
+        '''
+        Remove many Security Groups from many Virtual Networks.
+
+        Counterpart of addSecurityGroupsToVirtualNetworks, Virtual Networks which do not
+        hold the Security Group are left untouched.
+
+        Args:
+            sgVnMap(dict): Security Group name -> list of Virtual Network names
+            batch_size(int): Number of Virtual Networks updated per request
+        Returns:
+            dict: {'status': True/False, 'results': [{'name':<sg name>, 'status':True/False,
+                   'failureReason':<reason>}, ...]}
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        return self._changeVirtualNetworkMembership(sgVnMap, batch_size, remove=True)
+
+    def _changeVirtualNetworkMembership(self, sgVnMap, batch_size, remove):
+        '''
+        Validate the input of the bulk Virtual Network functions and run them.
+        '''
+        check_type(sgVnMap,dict)
+        check_type(batch_size,int)
+        for sg_name, virtualNetworks in sgVnMap.items():
+            check_type(sg_name,basestring)
+            check_type(virtualNetworks,list,may_be_none=False)
+        if batch_size < 1:
+            return {'status':False, 'failureReason':'batch_size must be a positive integer'}
+
+        results = self._updateVirtualNetworkMembershipSafely(sgVnMap, batch_size=batch_size, remove=remove)
+        failed = [result['name'] for result in results if not result['status']]
+        if failed:
+            self.log.error("Updating VirtualNetworks failed for: {}".format(failed))
+        else:
+            self.log.info("#----SUCCESSFULLY {} {} SG(s) {} VirtualNetworks----#".format(
+                "REMOVED" if remove else "ADDED", len(results), "from" if remove else "to"))
+        return {'status':not failed, 'results':results}
+
+    def _updateVirtualNetworkMembershipSafely(self, sgVnMap, batch_size=DEFAULT_VN_BATCH_SIZE,\
+                                                                               remove=False):
+        '''
+        _updateVirtualNetworkMembership, failing every Security Group when the Security
+        Group ids or the Virtual Networks can't be read.
+        '''
+        try:
+            return self._updateVirtualNetworkMembership(sgVnMap, batch_size=batch_size, remove=remove)
+        except Exception as error:
+            self.log.error("Updating VirtualNetworks failed:{}".format(error))
+            return [{'name':sg_name, 'status':False, 'failureReason':
+                     'Failed in updating SG in VirtualNetworks: {}'.format(error)} for sg_name in sgVnMap]
+
+    def _updateVirtualNetworkMembership(self, sgVnMap, batch_size=DEFAULT_VN_BATCH_SIZE,\
+                                                                         remove=False):
+        '''
+        Add (or remove) many Security Groups to (from) their Virtual Networks.
+        The names are resolved once for every batch, a batch which raises fails the
+        Security Groups it changes only.
+
+        Args:
+            sgVnMap(dict): Security Group name -> list of Virtual Network names
+            batch_size(int): Number of Virtual Networks updated per request
+            remove(bool): Remove the Security Groups instead of adding them
+        Returns:
+            list: per Security Group results, in sgVnMap order
+        '''
+        results = {}
+        sg_ids = self.getSecurityGroupIdsByNames(list(sgVnMap))
+        vn_list = self.getVirtualNetwork()
+        vn_by_name = dict((vndata['name'], vndata) for vndata in vn_list['response'])
+        updatedVnData = {}
+        changed_by = {}
+        for sg_name, virtualNetworks in sgVnMap.items():
+            if sg_name not in sg_ids:
+                results[sg_name] = {'name':sg_name, 'status':False, 'failureReason':
+                                    'No security group with name {} found in DNAC.'.format(sg_name)}
+                continue
+            missing_vns = [vn for vn in virtualNetworks if vn not in vn_by_name]
+            if missing_vns:
+                results[sg_name] = {'name':sg_name, 'status':False, 'failureReason':
+                                    'VirtualNetworks {} do not exist in DNAC, Create '
+                                    'VirtualNetwork in DNAC first'.format(missing_vns)}
+                continue
+            sg_idref = {"idRef":sg_ids[sg_name]}
+            for vn in virtualNetworks:
+                vndata = vn_by_name[vn]
+                scalableGroup = vndata["scalableGroup"]
+                if remove and sg_idref in scalableGroup:
+                    scalableGroup.remove(sg_idref)
+                elif not remove and sg_idref not in scalableGroup:
+                    scalableGroup.append(sg_idref)
+                else:
+                    continue
+                updatedVnData[vn] = vndata
+                changed_by.setdefault(vn, []).append(sg_name)
+            results[sg_name] = {'name':sg_name, 'status':True}
+
+        vn_names = list(updatedVnData)
+        for start in range(0, len(vn_names), batch_size):
+            batch = vn_names[start:start + batch_size]
+            try:
+                response = self.putVirtualNetwork(json=[updatedVnData[vn] for vn in batch])
+                self.log.info(response)
+                taskStatus = self._task.wait_for_task_complete(response,\
+                                                  timeout=DEFAULT_SUMMARY_TIMEOUT)
+            except Exception as error:
+                taskStatus, reason = None, str(error)
+            else:
+                if taskStatus and not taskStatus['isError']:
+                    continue
+                reason = taskStatus['failureReason'] if taskStatus else 'Task did not complete'
+            self.log.error("Updating VirtualNetworks {} failed:{}".format(batch, reason))
+            for vn in batch:
+                for sg_name in changed_by[vn]:
+                    results[sg_name].update({'status':False, 'failureReason':
+                                             'Failed in updating SG in VirtualNetworks: {}'.format(reason),
+                                             'TaskStatus':taskStatus})
+        return [results[sg_name] for sg_name in sgVnMap]
+
+    def getSecurityGroupIdsByNames(self, names):
+        '''
+        Resolve many Security Group names to ids with one paginated inventory walk,
+        or from the Security Group index when enabled.
+
+        Args:
+            names(list): Security Group names
+        Returns:
+            dict: Security Group name -> id, for the names found in DNAC
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        check_type(names,list)
+        if self._sg_index is not None:
+            entries = [self._sg_index.lookup(name) for name in names]
+            return dict((entry['name'], entry['id']) for entry in entries if entry)
+        wanted = set(names)
+        return dict((sg['name'], sg['id']) for sg in self._getAllSecurityGroups()
+                    if sg['name'] in wanted)
+
+    def _getAllSecurityGroups(self, page_size=DEFAULT_SGT_PAGE_SIZE):
+        '''
+        GET every Security Group in DNAC, page_size Security Groups per request.
+
+        Args:
+            page_size(int): Number of Security Groups per request
+        Returns:
+            list: Security Groups
+        '''
+        return self.getAllSecurityGroups(page_size=page_size)['SecurityGroupList']
+
+    def getAllSecurityGroups(self, page_size=DEFAULT_SGT_PAGE_SIZE, max_workers=DEFAULT_FETCH_WORKERS):
+        '''
+        GET every Security Group in DNAC. The pages are planned from the Security Group count
+        of the summary and fetched by up to max_workers concurrent requests.
+
+        Args:
+            page_size(int): Number of Security Groups per request
+            max_workers(int): Maximum number of requests in flight
+        Returns:
+            dict: status and SecurityGroupList, the Security Groups in DNAC order
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        check_type(page_size,int,may_be_none=False)
+        check_type(max_workers,int,may_be_none=False)
+
+        count = self.getSecurityGroupCount()
+        total = count['SecurityGroupCount'] if count['status'] else 0
+
+        def fetch_page(offset, limit):
+            params = {'offset': offset, 'limit': limit}
+            return self.get_securityGroup(params=params, timeout=DEFAULT_SUMMARY_TIMEOUT)['response']
+        security_groups = fetch_all(fetch_page, total, page_size=page_size, max_workers=max_workers)
+        return {'status': True, 'SecurityGroupList': security_groups}
+
+    def iter_security_groups(self, page_size=DEFAULT_SGT_PAGE_SIZE, prefetch=True, params=None):
+        '''
+        Iterate over the Security Groups in DNAC, requesting them page_size at a time.
+        The next page is fetched in the background while the current one is consumed.
+
+        Args:
+            page_size(int): Number of Security Groups per request
+            prefetch(bool): False to fetch a page only once the previous one is consumed
+            params(dict): Additional query parameters, e.g. {'name': 'SGT1'}
+        Returns:
+            generator: Security Groups
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        check_type(page_size,int,may_be_none=False)
+        check_type(prefetch,bool)
+        check_type(params,dict)
+
+        def fetch_page(offset, limit):
+            page_params = dict(params or {}, offset=offset, limit=limit)
+            return self.get_securityGroup(params=page_params, timeout=DEFAULT_SUMMARY_TIMEOUT)['response']
+        return paginate(fetch_page, page_size=page_size, prefetch=prefetch)
+
+    def addSecurityGroupToVirtualNetwork(self, sg_name, virtualNetworks, wait=True):
         '''
         Add Security Group To VirtualNetwork
 
         Args:
             virtualNetworks(list): List of Virtual Network names
             sg_name(str): Security Group name
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect
         '''
         check_type(sg_name,basestring)
         check_type(virtualNetworks,list)
+        check_type(wait,bool)
 
         securityGroup = self.getSecurityGroupIdByName(sg_name)
         self.log.info(securityGroup)
         if securityGroup['status']:
             sg_idref = {"idRef":securityGroup['id']}
         else:
-            return {'status':False, 'failureReason':securityGroup['failureReason']}
+            return self._task.resolved({'status':False, 'failureReason':securityGroup['failureReason']},\
+                                       wait=wait)
         self.log.info("Updating virtualNetworks")
         updatedVnData=[]
         vn_list = self.getVirtualNetwork()
@@ -138,12 +528,17 @@ class SecurityGroups(object):
                     updatedVnData.append(vndata)
 
         if len(updatedVnData) != len(virtualNetworks):
-            return {'status':False, 'failureReason':'Not all virtualNetworks \
-                    provided, exist in DNAC, Create VirtualNetwork in DNAC first'}
+            return self._task.resolved({'status':False, 'failureReason':'Not all virtualNetworks \
+                    provided, exist in DNAC, Create VirtualNetwork in DNAC first'}, wait=wait)
         response = self.putVirtualNetwork(json=updatedVnData)
         self.log.info(response)
-        taskStatus = self._task.wait_for_task_complete(response,\
-                                          timeout=DEFAULT_SUMMARY_TIMEOUT)
+        return self._task.handle(response, functools.partial(self._addSecurityGroupToVirtualNetworkDone,\
+                                 sg_name, virtualNetworks), wait=wait, timeout=DEFAULT_SUMMARY_TIMEOUT)
+
+    def _addSecurityGroupToVirtualNetworkDone(self, sg_name, virtualNetworks, taskStatus):
+        '''
+        Complete addSecurityGroupToVirtualNetwork once its task ended.
+        '''
         if (taskStatus['isError']):
             self.log.error("Add sg to vn failed:{0}".format\
                                            (taskStatus['failureReason']))
@@ -158,7 +553,7 @@ class SecurityGroups(object):
         return {"status":True,'TaskStatus': taskStatus}
 
     def updateSecurityGroup(self, name, securityGroupTag=None, description=None,\
-                                     propagateToAci=None, virtualNetworks=None):
+                                     propagateToAci=None, virtualNetworks=None, wait=True):
         '''
         Update Security Group in DNAC
 
@@ -168,6 +563,7 @@ class SecurityGroups(object):
             description(str): Description of Security Group
             propagateToAci(bool): True or False
             virtualNetworks(list): List of Virtual Network names
+            wait(bool): False to return a TaskFuture instead of waiting for the task
 
         Raises:
             TypeError: If the parameter types are incorrect
@@ -177,13 +573,14 @@ class SecurityGroups(object):
         check_type(description,basestring)
         check_type(securityGroupTag,int)
         check_type(propagateToAci,bool)
+        check_type(wait,bool)
 
         self.log.info("Updating security group")
         params= { "name" : name }
         response_sg = self.get_securityGroup(params=params)
         if not response_sg['response']:
-            return {"status" : False,'failureReason':'No response \
-                                                 from get operation'}
+            return self._task.resolved({"status" : False,'failureReason':'No response \
+                                                 from get operation'}, wait=wait)
         sgt_data= {
                     "id":response_sg['response'][0]['id'],
                     "resourceVersion":response_sg['response'][0]['resourceVersion'],
@@ -202,9 +599,15 @@ class SecurityGroups(object):
             sgt_data["propagateToAci"] = propagateToAci
 
         sg_response = self.put_securityGroup(json=[sgt_data])
-        taskStatus = self._task.wait_for_task_complete(sg_response, \
-                                       timeout=DEFAULT_SUMMARY_TIMEOUT)
+        return self._task.handle(sg_response, functools.partial(self._updateSecurityGroupDone,\
+                                 name, virtualNetworks, wait), wait=wait, timeout=DEFAULT_SUMMARY_TIMEOUT)
+
+    def _updateSecurityGroupDone(self, name, virtualNetworks, wait, taskStatus):
+        '''
+        Complete updateSecurityGroup once its task ended, chaining the Virtual Network update.
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(name)
         if (taskStatus['isError']):
             self.log.error("Updating security group failed:{0}".\
                                     format(taskStatus['failureReason']))
@@ -214,9 +617,9 @@ class SecurityGroups(object):
                     'TaskStatus': taskStatus
                    }
         if virtualNetworks:
-            return self.addSecurityGroupToVirtualNetwork(name,virtualNetworks)
-        return {'status':True,'TaskStatus': taskStatus}
+            return self.addSecurityGroupToVirtualNetwork(name,virtualNetworks,wait=wait)
         self.log.info("Updating security group successful")
+        return {'status':True,'TaskStatus': taskStatus}
 
     def checkSecurityGroupsExistingInDnac(self, securityGroupList, expect=True):
         '''
@@ -232,15 +635,16 @@ class SecurityGroups(object):
         check_type(expect,bool)
 
         self.log.info("Start to check sg_list in DNAC")
-        missing_list=[]
-        exist_list=[]
-        for sg in securityGroupList:
-            params= { "name" : sg }
-            response = self.get_securityGroup(params=params)
-            if response['response']:
-                exist_list.append(sg)
-            else:
-                missing_list.append(sg)
+        names = set(securityGroupList)
+        # One inventory walk when it takes fewer requests than one GET per name. A walk costs the
+        # count and at least one page, so up to 2 names are always checked one by one, without the count.
+        count = self.getSecurityGroupCount() if len(names) > 2 else {'status': False}
+        if count['status'] and len(names) > -(-count['SecurityGroupCount'] // DEFAULT_SGT_PAGE_SIZE):
+            found = self.verifySecurityGroups(list(names))['exist']
+        else:
+            found = set(sg for sg in names if self.get_securityGroup(params={"name": sg})['response'])
+        exist_list = [sg for sg in securityGroupList if sg in found]
+        missing_list = [sg for sg in securityGroupList if sg not in found]
 
         if expect and missing_list:
             return {'status':False, 'failureReason':"These expected security\
@@ -251,6 +655,28 @@ class SecurityGroups(object):
         else:
             return {'status' : True }
 
+    def verifySecurityGroups(self, securityGroups, by='name'):
+        '''
+        Verify many Security Groups with one paginated fetch of the Security Group inventory.
+
+        Args:
+            securityGroups(list): Security Group names (or values of the by field), or Security Group
+                                  dicts whose other fields are compared with DNAC,
+                                  e.g. {'name': 'SGT1', 'securityGroupTag': 1001}
+            by(str): Field identifying a Security Group, e.g. 'name' or 'securityGroupTag'
+        Returns:
+            dict: status, exist and missing (sets of names or tags) and mismatches
+                  (name or tag -> field -> expected and actual values)
+        Raises:
+            TypeError: If the parameter types are incorrect
+        '''
+        check_type(securityGroups,list)
+        check_type(by,basestring)
+
+        self.log.info("Start to verify {} Security Groups in DNAC".format(len(securityGroups)))
+        inventory = self.getAllSecurityGroups()['SecurityGroupList']
+        return verify_inventory(securityGroups, inventory, field_key(by))
+
     def getSecurityGroupIdByName(self, name):
         '''
         GET Security Group by name
@@ -266,6 +692,13 @@ class SecurityGroups(object):
         check_type(name,basestring)
 
         self.log.info("Fetching security group id for {}".format(name))
+        if self._sg_index is not None:
+            entry = self._sg_index.lookup(name)
+            if entry:
+                return {"status" : True, 'id':entry['id']}
+            self.log.error('No security group with name {} found in DNAC.'.format(name))
+            return {"status" : False, 'id':'', 'failureReason':
+                    'No security group with name {} found in DNAC.'.format(name)}
         params = { "name" : name }
         response_sg = self.get_securityGroup(params=params,timeout=DEFAULT_SGT_TIMEOUT)
         self.log.debug(response_sg)
@@ -292,6 +725,13 @@ class SecurityGroups(object):
         check_type(name,basestring)
 
         self.log.info("Fetching security group tag for {}".format(name))
+        if self._sg_index is not None:
+            entry = self._sg_index.lookup(name)
+            if entry:
+                return {"status" : True, 'securityGroupTag':entry['securityGroupTag']}
+            self.log.error('No security group with name {} found in DNAC'.format(name))
+            return {"status" : False, 'securityGroupTag':'', 'failureReason':
+                    'No security group with name {} found in DNAC.'.format(name)}
         params = { "name": name}
         response_sg = self.get_securityGroup(params=params)
         self.log.debug(response_sg)
@@ -324,12 +764,13 @@ class SecurityGroups(object):
             self.log.error("No Summary response from DNAC")
             return {'status':False, "count":0, 'failureReason':"No Summary response from DNAC"}
 
-    def deleteSecurityGroupByName(self, name):
+    def deleteSecurityGroupByName(self, name, wait=True):
         '''
         DELETE Security Group by name
 
         Args:
             name(str): Name of Security Group
+            wait(bool): False to return a TaskFuture instead of waiting for the task
 
         Returns:
             dict: response of api call
@@ -337,11 +778,13 @@ class SecurityGroups(object):
             ApiClientException: when unexpected query parameters are passed.
         '''
         check_type(name,basestring)
+        check_type(wait,bool)
 
         params= { "name" : name }
         response_sg = self.get_securityGroup(params=params)
         if not response_sg['response']:
-            return {"status" : False,'failureReason':'No response from get operation'}
+            return self._task.resolved({"status" : False,'failureReason':'No response from get operation'},\
+                                       wait=wait)
         sgt_data= {
                     "id":response_sg['response'][0]['id'],
                     "vnAgnostic":response_sg['response'][0]['vnAgnostic'],
@@ -353,8 +796,15 @@ class SecurityGroups(object):
                 }
         delete_response = self.put_securityGroup(json=[sgt_data])
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response)
+        return self._task.handle(delete_response, functools.partial(self._deleteSecurityGroupByNameDone,\
+                                 name, sgt_data["name"]), wait=wait)
+
+    def _deleteSecurityGroupByNameDone(self, name, sg_name, taskStatus):
+        '''
+        Complete deleteSecurityGroupByName once its task ended.
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(sg_name)
         if (taskStatus['isError']):
             self.log.error("Deleting security group failed:{0}".format\
                                                  (taskStatus['failureReason']))
@@ -366,12 +816,13 @@ class SecurityGroups(object):
                                                   #################".format(name))
         return {"status" : True,'TaskStatus': taskStatus}
 
-    def deleteSecurityGroupByTag(self, securityGroupTag):
+    def deleteSecurityGroupByTag(self, securityGroupTag, wait=True):
         '''
         DELETE Security Group by Tag
 
         Args:
             securityGroupTag(int): Tag number of Security Group
+            wait(bool): False to return a TaskFuture instead of waiting for the task
 
         Returns:
             dict: response of api call
@@ -379,11 +830,13 @@ class SecurityGroups(object):
             ApiClientException: when unexpected query parameters are passed.
         '''
         check_type(securityGroupTag,int)
+        check_type(wait,bool)
 
         params = { 'securityGroupTag' : securityGroupTag }
         response_sg = self.get_securityGroup(params=params)
         if not response_sg['response']:
-            return {"status" : False,'failureReason':'No response from get operation'}
+            return self._task.resolved({"status" : False,'failureReason':'No response from get operation'},\
+                                       wait=wait)
         sgt_data= {
                     "id":response_sg['response'][0]['id'],
                     "vnAgnostic":response_sg['response'][0]['vnAgnostic'],
@@ -396,8 +849,15 @@ class SecurityGroups(object):
 
         delete_response = self.put_securityGroup(json=[sgt_data])
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response)
+        return self._task.handle(delete_response, functools.partial(self._deleteSecurityGroupByTagDone,\
+                                 securityGroupTag, sgt_data["name"]), wait=wait)
+
+    def _deleteSecurityGroupByTagDone(self, securityGroupTag, sg_name, taskStatus):
+        '''
+        Complete deleteSecurityGroupByTag once its task ended.
+        '''
         self.log.info(taskStatus)
+        self._invalidateSecurityGroupIndex(sg_name)
         if (taskStatus['isError']):
             self.log.error("Deleting security group failed:{0}".format\
                                                     (taskStatus['failureReason']))
@@ -19,11 +19,16 @@ SOFTWARE.
 """
 
 from __future__ import absolute_import, division, print_function, unicode_literals
+import functools
+import json
 import logging
 from builtins import *
 from past.builtins import basestring
+from ...cache import PolicyMatrixIndex, DEFAULT_POLICY_INDEX_TTL
 from ...client_manager import DnacClientManager
+from ...pagination import paginate, fetch_all, DEFAULT_PAGE_SIZE, DEFAULT_FETCH_WORKERS
 from ...utils import check_type
+from ...verification import verify_inventory, field_key
 
 logger = logging.getLogger("SecurityGroupsPolicy")
 
@@ -34,6 +39,7 @@ DEFAULT_SUMMARY_TIMEOUT=240
 DEFAULT_VERSION = "v2"
 POLICY_PATH = "/data/customer-facing-service/policy/access"
 POLICY_SUMMARY_PATH = "/data/customer-facing-service/summary/policy/access"
+POLICY_COUNT_PATH = "/data/customer-facing-service/count/policy/access"
 SCALABLE_GROUP_SUMMARY_PATH = "/data/customer-facing-service/summary/scalablegroup/access"
 ACACONTROLLERPATH = "/v1/aca-controller-service"
 
@@ -62,10 +68,109 @@ class SGTPolicy(object):
         self._task = session.task
         self._contract = session.accesscontracts
         self._securitygroup = session.securitygroups
+        self._policy_index = None
+        self._policy_scope = None
         self.log = logger
 
+    def enablePolicyMatrixIndex(self, ttl=DEFAULT_POLICY_INDEX_TTL):
+        """
+        Enable the in-memory policy matrix index.
+
+        The policy list is then fetched once (and every ttl seconds) into a dict keyed by
+        (producer idRef, consumer idRef) instead of once per update_policy/delete_policy
+        call. Policies created, updated or deleted through this object update the index.
+
+        Args:
+            ttl(int): Seconds the index stays valid, None to never expire
+        Raises:
+            TypeError: If the parameter types are incorrect
+        """
+        check_type(ttl,int)
+
+        self._policy_index = PolicyMatrixIndex(lambda: self.getAllPolicies()["PolicyList"], ttl=ttl)
+        self.log.info("Policy matrix index enabled, ttl:{}".format(ttl))
+
+    def disablePolicyMatrixIndex(self):
+        """
+        Disable the in-memory policy matrix index, every lookup fetches the policy list again.
+        """
+        self._policy_index = None
+
+    def getPolicyScope(self, refresh=False):
+        """
+        GET the policy scope new policies are created in.
+
+        The scope is read once from a single policy (limit=1) and cached for the
+        lifetime of this object, see setPolicyScope for clusters without policies.
+
+        Args:
+            refresh(bool): Read the scope from DNAC again
+        Returns:
+            dict: {'status':True, 'policyScope':<id>} or {'status':False, 'failureReason':<reason>}
+        Raises:
+            TypeError: If the parameter types are incorrect
+        """
+        check_type(refresh,bool)
+
+        if self._policy_scope is None or refresh:
+            policy_response = self.get_policyAccess(params={'offset': 0, 'limit': 1})
+            if not policy_response["response"]:
+                self.log.error("No policy in DNAC to read the policy scope from")
+                return {'status':False, 'failureReason':'No policy in DNAC to read the policy scope '
+                        'from, provide it with setPolicyScope'}
+            self._policy_scope = policy_response["response"][0]["policyScope"]
+        return {'status':True, 'policyScope':self._policy_scope}
+
+    def setPolicyScope(self, policyScope):
+        """
+        Set the policy scope new policies are created in, instead of reading it from DNAC.
+
+        Args:
+            policyScope(str): Policy scope id
+        Raises:
+            TypeError: If the parameter types are incorrect
+        """
+        check_type(policyScope,basestring,may_be_none=False)
+
+        self._policy_scope = policyScope
+
+    def _getPolicyBetween(self, src_sg_id, dst_sg_id):
+        """
+        Find the policy from a source to a destination Security Group.
+
+        Args:
+            src_sg_id(str): Source security group id
+            dst_sg_id(str): Destination security group id
+        Returns:
+            dict: policy as returned by DNAC, None when not found
+        """
+        if self._policy_index is not None:
+            return self._policy_index.lookup(src_sg_id, dst_sg_id)
+        policy_response = self.get_policyAccess()
+        for aca in policy_response["response"]:
+            if dst_sg_id == aca["consumer"]["scalableGroup"][0]["idRef"] and \
+                        src_sg_id == aca["producer"]["scalableGroup"][0]["idRef"]:
+                return aca
+        return None
+
+    def _updatePolicyIndex(self, taskStatus, action, *args):
+        """
+        Apply a policy write to the policy matrix index, when enabled.
+
+        Args:
+            taskStatus(dict): task status of the write
+            action(str): PolicyMatrixIndex method reflecting the write, add/update/remove
+            args(list): arguments of the PolicyMatrixIndex method
+        """
+        if self._policy_index is None:
+            return
+        if taskStatus and not taskStatus['isError']:
+            getattr(self._policy_index, action)(*args)
+        else:
+            self._policy_index.invalidate()
+
     def createSecurityGroupPolicy(self, policy_name, producer_name, \
-                                               consumer_name, contract_name):
+                                               consumer_name, contract_name, wait=True):
         """
         Create policy for group based access control
 
@@ -74,6 +179,7 @@ class SGTPolicy(object):
             producer_name(str): Policy source name
             consumer_name(str): Policy Destination name
             contract_name(str): contract name to be associated to policy
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Returns:
             dict: response of api call
         Raises:
@@ -83,6 +189,7 @@ class SGTPolicy(object):
         check_type(producer_name,basestring)
         check_type(consumer_name,basestring)
         check_type(contract_name,basestring)
+        check_type(wait,bool)
 
         self.log.info("Start to create policy from {} to {} with contract {}".format\
                                        (producer_name, consumer_name, contract_name))
@@ -97,15 +204,17 @@ class SGTPolicy(object):
         if sg_response["status"]:
             producer_id = sg_response["id"]
         else:
-            return sg_response
+            return self._task.resolved(sg_response, wait=wait)
         sg_response = self._securitygroup.getSecurityGroupIdByName(consumer_name)
         if sg_response["status"]:
             consumer_id = sg_response["id"]
         else:
-            return sg_response
+            return self._task.resolved(sg_response, wait=wait)
 
-        access_policy_response = self.get_policyAccess()
-        policy_scope_id = access_policy_response["response"][0]["policyScope"]
+        scope_response = self.getPolicyScope()
+        if not scope_response["status"]:
+            return self._task.resolved(scope_response, wait=wait)
+        policy_scope_id = scope_response["policyScope"]
 
         self.log.info("Inside create new policy the Idref of the contract is: {0}".\
                                                                  format(contract_id))
@@ -130,21 +239,29 @@ class SGTPolicy(object):
             "name": policy_name
             }]
         policy_response = self.post_policyAccess(json=sgtpolicy_data)
-        taskStatus = self._task.wait_for_task_complete(policy_response, \
-                                        timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(policy_response, functools.partial(self._createSecurityGroupPolicyDone,\
+                                 sgtpolicy_data[0], producer_name, consumer_name, contract_name),\
+                                 wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _createSecurityGroupPolicyDone(self, sgtpolicy, producer_name, consumer_name, contract_name,\
+                                                                                    taskStatus):
+        """
+        Complete createSecurityGroupPolicy once its task ended.
+        """
         self.log.info(taskStatus)
+        self._updatePolicyIndex(taskStatus, "add", sgtpolicy)
         if (taskStatus['isError']):
             self.log.error("Creating policy failed:{0}".format\
                                                   (taskStatus['failureReason']))
             return {'status':False, "failureReason":"Creating Policy {} failed:\
-                    {}".format(taskStatus['failureReason']),'TaskStatus': taskStatus}
+                    {}".format(sgtpolicy['name'], taskStatus['failureReason']),'TaskStatus': taskStatus}
         self.log.info("############################################################")
         self.log.info("#----SUCCESSFULLY CREATED SGT POLICY from {} to {} with contract {}----#".\
                                  format(producer_name, consumer_name, contract_name))
         self.log.info("############################################################")
         return {'status':True,'TaskStatus': taskStatus}
 
-    def update_policy(self, src_sg_name, dst_sg_name, mode=None, new_contract_name=None):
+    def update_policy(self, src_sg_name, dst_sg_name, mode=None, new_contract_name=None, wait=True):
         """
         Update policy details for Group Based Access Control
 
@@ -153,6 +270,7 @@ class SGTPolicy(object):
             dst_sg_name(str): Destination security group name
             mode(str): Mode of policy
             new_contract_name(str): contract name to be updated
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect
         """
@@ -160,6 +278,7 @@ class SGTPolicy(object):
         check_type(dst_sg_name,basestring)
         check_type(mode,basestring)
         check_type(new_contract_name,basestring)
+        check_type(wait,bool)
 
         self.log.info("Start to update policy from {} to {} in DNAC".\
                                                   format(src_sg_name, dst_sg_name))
@@ -170,28 +289,25 @@ class SGTPolicy(object):
         if sg_response["status"]:
             src_sg_id = sg_response["id"]
         else:
-            return sg_response
+            return self._task.resolved(sg_response, wait=wait)
         sg_response = self._securitygroup.getSecurityGroupIdByName(dst_sg_name)
         if sg_response["status"]:
             dst_sg_id = sg_response["id"]
         else:
-            return sg_response
-
-        policy_response = self.get_policyAccess()
-        for aca in policy_response["response"]:
-            if dst_sg_id in aca["consumer"]["scalableGroup"][0]["idRef"] and \
-                        src_sg_id in aca["producer"]["scalableGroup"][0]["idRef"]:
-                policy_id = aca["id"]
-                policy_scope = aca['policyScope']
-                policy_name = aca['name']
-                policy_status = aca['policyStatus']
-                contract_id = aca['contract']['idRef']
-                policy_priority = aca['priority']
-                self.log.info(policy_id)
-                break
+            return self._task.resolved(sg_response, wait=wait)
+
+        aca = self._getPolicyBetween(src_sg_id, dst_sg_id)
+        if aca is not None:
+            policy_id = aca["id"]
+            policy_scope = aca['policyScope']
+            policy_name = aca['name']
+            policy_status = aca['policyStatus']
+            contract_id = aca['contract']['idRef']
+            policy_priority = aca['priority']
+            self.log.info(policy_id)
         if policy_id == '':
             self.log.error('Policy is not found')
-            return {"status": False}
+            return self._task.resolved({"status": False}, wait=wait)
 
         if mode is not None:
             policy_status = mode
@@ -204,7 +320,7 @@ class SGTPolicy(object):
                     break
             if contract_id == '':
                 self.log.error('The contract is not found')
-                return {"status": False}
+                return self._task.resolved({"status": False}, wait=wait)
         sgtpolicy_data = [{
                 "id": policy_id,
                 "policyScope": policy_scope,
@@ -217,9 +333,16 @@ class SGTPolicy(object):
                 }]
 
         policy_response = self.put_policyAccess(json=sgtpolicy_data)
-        taskStatus = self._task.wait_for_task_complete(policy_response,\
-                                     timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(policy_response, functools.partial(self._update_policyDone,\
+                                 sgtpolicy_data[0], src_sg_name, dst_sg_name),\
+                                 wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _update_policyDone(self, sgtpolicy, src_sg_name, dst_sg_name, taskStatus):
+        """
+        Complete update_policy once its task ended.
+        """
         self.log.debug(taskStatus)
+        self._updatePolicyIndex(taskStatus, "update", sgtpolicy)
         if (taskStatus['isError']):
             self.log.error("Updating policy failed:{0}".format\
                                                 (taskStatus['failureReason']))
@@ -232,18 +355,20 @@ class SGTPolicy(object):
         self.log.info("######################################################")
         return {"status": True,'TaskStatus': taskStatus}
 
-    def delete_policy(self, src_sg_name, dst_sg_name):
+    def delete_policy(self, src_sg_name, dst_sg_name, wait=True):
         """
         Delete Policy for Group Based Access Control
 
         Args:
             src_sg_name(str): Source security group name
             dst_sg_name(str): Destination security group name
+            wait(bool): False to return a TaskFuture instead of waiting for the task
         Raises:
             TypeError: If the parameter types are incorrect
         """
         check_type(src_sg_name,basestring)
         check_type(dst_sg_name,basestring)
+        check_type(wait,bool)
 
         self.log.info("Start to delete policy from {} to {}".format(src_sg_name, dst_sg_name))
         delete_id = ""
@@ -254,35 +379,40 @@ class SGTPolicy(object):
         if sg_response["status"]:
             src_sg_id = sg_response["id"]
         else:
-            return sg_response
+            return self._task.resolved(sg_response, wait=wait)
         sg_response = self._securitygroup.getSecurityGroupIdByName(dst_sg_name)
         if sg_response["status"]:
             dst_sg_id = sg_response["id"]
         else:
-            return sg_response
+            return self._task.resolved(sg_response, wait=wait)
 
-        policy_response = self.get_policyAccess()
         if src_sg_id == '' or dst_sg_id == '' :
             self.log.error("The source or destination security group is not found")
-        for aca in policy_response["response"]:
-            if dst_sg_id in aca["consumer"]["scalableGroup"][0]["idRef"] and src_sg_id in \
-                                              aca["producer"]["scalableGroup"][0]["idRef"]:
-                delete_id = aca["id"]
-                self.log.info("Delete ref id {}".format(delete_id))
+        aca = self._getPolicyBetween(src_sg_id, dst_sg_id)
+        if aca is not None:
+            delete_id = aca["id"]
+            self.log.info("Delete ref id {}".format(delete_id))
 
         if delete_id == '':
             self.log.error("The policy is not found")
-            return {'status':False}
+            return self._task.resolved({'status':False}, wait=wait)
 
         delete_response = self.delete_policyAccessById(delete_id)
         self.log.debug(delete_response)
-        taskStatus = self._task.wait_for_task_complete(delete_response, \
-                                                 timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+        return self._task.handle(delete_response, functools.partial(self._delete_policyDone,\
+                                 delete_id, src_sg_name, dst_sg_name, src_sg_id, dst_sg_id),\
+                                 wait=wait, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT)
+
+    def _delete_policyDone(self, delete_id, src_sg_name, dst_sg_name, src_sg_id, dst_sg_id, taskStatus):
+        """
+        Complete delete_policy once its task ended.
+        """
         self.log.info(taskStatus)
+        self._updatePolicyIndex(taskStatus, "remove", src_sg_id, dst_sg_id)
         if (taskStatus['isError']):
             self.log.error("Deleting policy failed:{0}".format(taskStatus['failureReason']))
             return {'status':False, "failureReason":"Deleting Policy {} failed:{}".format\
-                    (taskStatus['failureReason']),'TaskStatus': taskStatus}
+                    (delete_id, taskStatus['failureReason']),'TaskStatus': taskStatus}
         self.log.info("###################################################################")
         self.log.info("#----SUCCESSFULLY DELETED SGT POLICY from {} to {}----#".format\
                                                                  (src_sg_name, dst_sg_name))
@@ -307,22 +437,29 @@ class SGTPolicy(object):
         self.log.info("Total Policy count in DNAC {}".format(count))
         return {'status':True,'Total Policy Count':count}
 
-    def getAllPolicyName(self):
+    def getAllPolicyName(self, stream=False):
         """
         GET all Policy name list
 
+        Args:
+            stream(bool): read the summary records one at a time while they are received, see
+                          iter_policyAccessSummary
         Returns:
             Total Policy name list present in DNAC
         Raises:
             ApiClientException: when parameters are passed
         """
+        check_type(stream,bool)
         self.log.info("Start to get all policies in DNAC")
         policylist = []
         params = {'gbpSummary': 'true'}
-        policy_response = self.get_policyAccessSummary(params=params)
-        policy_response_summary = policy_response["response"][0]
+        if stream:
+            policy_summary = self.iter_policyAccessSummary(params=params)
+        else:
+            policy_response = self.get_policyAccessSummary(params=params)
+            policy_summary = policy_response["response"][0]["acaGBPSummary"]
 
-        for policy in policy_response_summary["acaGBPSummary"]:
+        for policy in policy_summary:
             producer_name = policy["producerName"]
             consumer_name = policy["consumerName"]
             contract_name = policy["contractName"]
@@ -331,6 +468,60 @@ class SGTPolicy(object):
             policylist.append(policy_dict)
         return {"status": True,'PolicyNameList': policylist}
 
+    def getAllPolicies(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_FETCH_WORKERS):
+        """
+        GET every policy in DNAC. The pages are planned from the policy count and fetched by
+        up to max_workers concurrent requests. When the count can't be read, e.g. on a release
+        without the count endpoint, the policies are walked page by page with iter_policies.
+
+        Args:
+            page_size(int): number of policies per request
+            max_workers(int): maximum number of requests in flight
+        Returns:
+            dict: status and PolicyList, the policies in DNAC order
+        Raises:
+            TypeError: If the parameter types are incorrect
+        """
+        check_type(page_size,int,may_be_none=False)
+        check_type(max_workers,int,may_be_none=False)
+
+        try:
+            total = self.get_policyAccessCount()["response"]
+        except Exception as error:
+            self.log.warning("Policy count unavailable, walking the policies serially: {}".format(error))
+            total = None
+        if isinstance(total, bool) or not isinstance(total, int):
+            return {"status": True, 'PolicyList': list(self.iter_policies(page_size=page_size))}
+
+        def fetch_page(offset, limit):
+            params = {'offset': offset, 'limit': limit}
+            return self.get_policyAccess(params=params, timeout=DEFAULT_SUMMARY_TIMEOUT)["response"]
+        policies = fetch_all(fetch_page, total, page_size=page_size, max_workers=max_workers)
+        return {"status": True, 'PolicyList': policies}
+
+    def iter_policies(self, page_size=DEFAULT_PAGE_SIZE, prefetch=True, params=None):
+        """
+        Iterate over the policies in DNAC, requesting them page_size at a time.
+        The next page is fetched in the background while the current one is consumed.
+
+        Args:
+            page_size(int): number of policies per request
+            prefetch(bool): False to fetch a page only once the previous one is consumed
+            params(dict): additional query parameters
+        Returns:
+            generator: policies
+        Raises:
+            TypeError: If the parameter types are incorrect
+        """
+        check_type(page_size,int,may_be_none=False)
+        check_type(prefetch,bool)
+        check_type(params,dict)
+
+        def fetch_page(offset, limit):
+            page_params = dict(params or {}, offset=offset, limit=limit)
+            return self.get_policyAccess(params=page_params, timeout=DEFAULT_SUMMARY_TIMEOUT)["response"]
+        return paginate(fetch_page, page_size=page_size, prefetch=prefetch)
+
     def is_policy_exist_in_dnac(self, policy_list, expect=True):
         """
         Find policy list exist in DNAC
@@ -351,8 +542,10 @@ class SGTPolicy(object):
         self.log.info("Policy list in ACA DNAC: {}".format(policylist_aca))
         missing_list = []
         exist_list = []
+        # Policies may hold lists or dicts, compare them on their canonical JSON text
+        policy_keys = set(json.dumps(policy, sort_keys=True) for policy in policylist_aca)
         for policy in policy_list:
-            if policy in policylist_aca:
+            if isinstance(policy, dict) and json.dumps(policy, sort_keys=True) in policy_keys:
                 exist_list.append(policy)
                 continue
             else:
@@ -380,6 +573,27 @@ class SGTPolicy(object):
                                 "or have different information".format(exist_list))
                 return {'status':False,'ExistList': exist_list}
 
+    def verifyPolicies(self, policies):
+        """
+        Verify many policies with one streamed read of the policy summary.
+
+        Args:
+            policies(list): (producer, consumer, contract) name tuples, or policy summary dicts whose other
+                            fields are compared with DNAC, e.g. {'producerName': 'SGT1',
+                            'consumerName': 'SGT2', 'contractName': 'Permit_IP', 'policyStatus': 'ENABLED'}
+        Returns:
+            dict: status, exist and missing (sets of (producer, consumer, contract) tuples) and
+                  mismatches (tuple -> field -> expected and actual values)
+        Raises:
+            TypeError: If the parameter types are incorrect
+        """
+        check_type(policies,list)
+
+        self.log.info("Start to verify {} policies in DNAC".format(len(policies)))
+        inventory = self.iter_policyAccessSummary(params={'gbpSummary': 'true'})
+        expected = [tuple(policy) if isinstance(policy, list) else policy for policy in policies]
+        return verify_inventory(expected, inventory, field_key('producerName', 'consumerName', 'contractName'))
+
     ################################################################################
     ###############################  Base APIs #####################################
     ################################################################################
@@ -403,6 +617,27 @@ class SGTPolicy(object):
         self.log.debug("Response {}".format(response))
         return response
 
+    def get_policyAccessCount(self, **kwargs):
+        """
+        GET the number of policies for Group Based Access Control, the endpoint wrapped by
+        get_policyaccess_count in the 2.3.3 release
+
+        Args:
+            kwargs (dict): additional parameters to be passed
+        Returns:
+            dict: response of api call, the count in "response"
+        Raises:
+            ApiClientException: when unexpected query parameters are passed
+        """
+        url = '/'+ DEFAULT_VERSION + POLICY_COUNT_PATH
+        method = 'GET'
+        self.log.debug("Method {} \nURL {} \nData {}".format(method, url, kwargs))
+        response = self._session.api_switch_call(method=method,
+                                                 resource_path=url,
+                                                 **kwargs)
+        self.log.debug("Response {}".format(response))
+        return response
+
     def get_policyAccessSummary(self,**kwargs):
         """
         GET Policy access summary details for Group Based Access Control
@@ -423,6 +658,25 @@ class SGTPolicy(object):
         self.log.debug("Response {}".format(response))
         return response
 
+    def iter_policyAccessSummary(self, **kwargs):
+        """
+        GET Policy access summary, yielding the acaGBPSummary records one at a time
+
+        The response is streamed and parsed incrementally, so the memory used does not depend on the size
+        of the policy matrix. It bypasses the response cache.
+
+        Args:
+            kwargs (dict): additional parameters to be passed
+        Returns:
+            generator: acaGBPSummary records
+        Raises:
+            ApiClientException: when unexpected query parameters are passed
+        """
+        url = '/'+ DEFAULT_VERSION + POLICY_SUMMARY_PATH
+        method = 'GET'
+        self.log.debug("Method {} \nURL {} \nData {}".format(method, url, kwargs))
+        return self._session.stream_items(method, url, ("response", 0, "acaGBPSummary"), **kwargs)
+
     def post_policyAccess(self, **kwargs):
         """
         POST request for Policy access
@@ -0,0 +1,290 @@
+"""async_client_manager.py
+
+asyncio front end for DnacClientManager and the versioned API wrappers.
+
+The SDK talks to DNAC through requests, so every blocking call is handed to a bounded
+worker pool owned by AsyncDnacClientManager. The size of that pool caps the number of
+DNAC requests in flight, while the event loop itself never blocks. Task waits never hold a
+worker: methods taking wait are submitted with wait=False and their TaskFuture is awaited.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import asyncio
+import functools
+import inspect
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .client_manager import DnacClientManager
+from .config import DEFAULT_MAX_CONCURRENCY
+from .polling import FixedInterval, is_task_complete, task_duration
+
+logger = logging.getLogger("AsyncClientManager")
+log = logger
+
+TASK_COMPLETION_POLL_INTERVAL = 2
+GLOBAL_TASK_TIMEOUT = 360
+
+
+class AsyncDnacClientManager(object):
+    """ asyncio client manager mirroring DnacClientManager.
+
+    Usage:
+        client = AsyncDnacClientManager(server, username, password)
+        await client.connect()
+        response = await client.call_api("GET", "/v2/data/customer-facing-service/virtualnetworkcontext")
+        await client.disconnect()
+    """
+
+    def __init__(self, server=None, username=None, password=None, version="v1", base_url="/api",
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, client=None, **kwargs):
+        """ Object initializer.
+
+        The initializer never authenticates, call connect() from the event loop instead.
+
+        Args:
+            server (str): cluster server name (routable DNS address or ip)
+            username (str): user name to authenticate with
+            password (str): password to authenticate with
+            version (str): version of the API to be used
+            base_url (str): default/constant portion of the url
+            max_concurrency (int): maximum number of blocking calls in flight
+            client (DnacClientManager): existing client to drive instead of creating a new one
+            kwargs (dict): additional DnacClientManager arguments (keep_alive, pool_maxsize, ...)
+        """
+
+        self.log = log
+        if client is None:
+            kwargs.setdefault("pool_maxsize", max_concurrency)
+            client = DnacClientManager(server, username, password, version=version, base_url=base_url,
+                                       connect=False, **kwargs)
+        self._client = client
+        self.max_concurrency = max_concurrency
+        self._executor = None
+
+    def __repr__(self):
+        """ Overrides the default object representation to display the object attributes. """
+
+        return "[Async API Client: {} <max_concurrency:{}>]".format(self._client, self.max_concurrency)
+
+    @property
+    def client(self):
+        """ The blocking DnacClientManager driven by this object. """
+        return self._client
+
+    @property
+    def executor(self):
+        """ Worker pool of the blocking calls, created on first use and again after close(). """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        return self._executor
+
+    async def run(self, func, *args, **kwargs):
+        """ Runs a blocking callable on the worker pool.
+
+        Args:
+            func (callable): blocking callable
+            args (list): positional arguments of func
+            kwargs (dict): keyword arguments of func
+
+        Returns:
+            object: return value of func
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def connect(self, force=False):
+        """ Generates a new ticket without blocking the event loop.
+
+        Args:
+            force (bool): If true, forces a new connection, else authenticates the existing one
+        """
+
+        await self.run(self._client.connect, force=force)
+
+    async def reconnect_clients(self):
+        await self.run(self._client.reconnect_clients)
+
+    async def disconnect(self):
+        """ Deletes the generated ticket, the worker pool is kept for a later connect(). """
+
+        await self.run(self._client.disconnect)
+
+    def close(self):
+        """ Releases the worker pool, a later call creates a new one. """
+
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def call_api(self, method, resource_path, **kwargs):
+        """ Awaitable DnacClientManager.call_api.
+
+        Args:
+            method (str): http method, support "GET", "POST", "PUT", "DELETE"
+            resource_path (str): resource_path
+            kwargs (dict): same keyword arguments as DnacClientManager.call_api
+
+        Returns:
+            dict: response of request.
+        """
+
+        return await self.run(self._client.call_api, method, resource_path, **kwargs)
+
+    async def api_switch_call(self, method=None, resource_path=None, **kwargs):
+        '''
+        JUST A WRAPPER
+        '''
+        return await self.call_api(method, resource_path, **kwargs)
+
+
+class AsyncApiWrapper(object):
+    """ Exposes the public methods of a versioned API wrapper as coroutines.
+
+    Usage:
+        securitygroups = AsyncApiWrapper(dnac.securitygroups, async_client)
+        await securitygroups.createSecurityGroup("SGT1", 1001)
+    """
+
+    def __init__(self, api, async_client):
+        """ Object initializer.
+
+        Args:
+            api (object): versioned wrapper such as SecurityGroups or SGTPolicy
+            async_client (AsyncDnacClientManager): client owning the worker pool
+        """
+
+        self._api = api
+        self._async_client = async_client
+
+    def __repr__(self):
+        return "<Async {}>".format(type(self._api).__name__)
+
+    def __getattr__(self, name):
+        """ Wraps public callables of the underlying API as coroutine functions.
+
+        Args:
+            name (str): name of attribute
+
+        Returns:
+            object: coroutine function for public methods, else the attribute itself
+        """
+
+        attr = getattr(self._api, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        if not accepts_wait(attr):
+            @functools.wraps(attr)
+            async def coroutine(*args, **kwargs):
+                return await self._async_client.run(attr, *args, **kwargs)
+            return coroutine
+
+        @functools.wraps(attr)
+        async def coroutine(*args, **kwargs):
+            wait = kwargs.pop("wait", True)
+            task_future = await self._async_client.run(attr, *args, wait=False, **kwargs)
+            if not wait:
+                return task_future
+            # The task is polled by the shared poller, no worker is held while it runs
+            return await wrap_task_future(task_future)
+
+        return coroutine
+
+
+def accepts_wait(func):
+    """ True when func takes a wait argument, i.e. returns a TaskFuture with wait=False. """
+
+    try:
+        return "wait" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def wrap_task_future(task_future):
+    """ asyncio future of the running loop resolved with the result of a polling.TaskFuture.
+
+    Args:
+        task_future (TaskFuture): handle returned by a wrapper method called with wait=False
+
+    Returns:
+        asyncio.Future: future resolved, or failed, like task_future
+    """
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def copy_state(task_future):
+        if future.cancelled():
+            return
+        if task_future.cancelled():
+            future.cancel()
+        elif task_future.exception() is not None:
+            future.set_exception(task_future.exception())
+        else:
+            future.set_result(task_future.result())
+
+    task_future.add_done_callback(lambda task_future: loop.call_soon_threadsafe(copy_state, task_future))
+    return future
+
+
+class AsyncTask(AsyncApiWrapper):
+    """ Async Task wrapper whose waits sleep on the event loop instead of a worker thread. """
+
+    def track(self, response, timeout=GLOBAL_TASK_TIMEOUT):
+        '''
+            Function: track
+            Input: response containing task details.
+                timeout: Max time the Task considered completed.
+            Result: asyncio future resolved with the task response, or False when the task didn't
+                complete in time. The task is polled by the shared background poller.
+        '''
+        return asyncio.wrap_future(self._api.track(response, timeout=timeout))
+
+    async def wait_for_many(self, task_responses, timeout=GLOBAL_TASK_TIMEOUT):
+        '''
+            Function: wait_for_many
+            Input: task_responses: list of responses containing task details.
+                timeout: Max time each Task considered completed.
+            Result: async iterator of (task id, task response or False on timeout), in completion order.
+        '''
+        async def completion(task_id, future):
+            return task_id, await future
+
+        waiters = [completion(response['response']['taskId'], self.track(response, timeout=timeout))
+                   for response in task_responses]
+        for waiter in asyncio.as_completed(waiters):
+            yield await waiter
+
+    async def wait_for_task_complete(self, response, timeout=GLOBAL_TASK_TIMEOUT, count=2):
+        '''
+            Function: wait_for_task_complete
+            Input: response containing task details.
+                timeout: Max time the Task considered completed.
+                count: accepted for compatibility with Task.wait_for_task_complete
+            Result:  task response
+            Raises: AssertionError when the task didn't complete in time, like Task.wait_for_task_complete
+        '''
+        task_id = response['response']['taskId']
+        poll_strategy = getattr(self._api, "poll_strategy", None) or FixedInterval(TASK_COMPLETION_POLL_INTERVAL)
+        start_time = time.time()
+        task_response = None
+        delays = None
+        while True:
+            if time.time() > start_time + timeout:
+                logger.error("Timer Exceeded")
+                raise AssertionError("Task {0} didn't complete within {1} seconds".format(task_response, timeout))
+            task_response = await self._async_client.run(self._api.get_task_by_id, task_id)
+            if is_task_complete(task_response):
+                poll_strategy.observe(task_response.get("serviceType"),
+                                      task_duration(task_response, time.time() - start_time))
+                return task_response
+            logger.info("Task not completed yet, waiting:{}".format(task_response))
+            delays = delays or poll_strategy.delays(task_response.get("serviceType"))
+            await asyncio.sleep(max(0, min(next(delays), start_time + timeout - time.time())))
@@ -0,0 +1,293 @@
+"""auth.py
+
+Lifetime management of the Maglev authentication cookie.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import os
+import json
+import time
+import threading
+import weakref
+import logging
+
+from .config import DEFAULT_TOKEN_CACHE_PATH
+from .concurrency import SingleFlight
+
+logger = logging.getLogger("Auth")
+log = logger
+
+DEFAULT_TOKEN_RETRY_INTERVAL = 30
+_LOGIN = "login"
+
+
+class TokenManager(object):
+    """ Keeps an authentication token valid with at most one login in flight.
+
+    A token younger than refresh_after is used as is. Between refresh_after and expires_after the
+    token is still used while a login runs on a background thread, so no caller waits on it. Only
+    an expired (or never issued) token makes the callers wait, and they all wait for the same login.
+    With background set, a timer also starts that login when the token reaches refresh_after, so an
+    idle client comes back with a valid token. The timer only holds a weak reference: it never keeps
+    the client alive and is cancelled once the TokenManager is garbage collected.
+
+    Usage:
+        tokens = TokenManager(client.login, refresh_after=600, expires_after=900)
+        tokens.refresh()
+        tokens.ensure_valid()
+    """
+
+    def __init__(self, login, refresh_after, expires_after, background=True,
+                 retry_interval=DEFAULT_TOKEN_RETRY_INTERVAL):
+        """ Object initializer.
+
+        Args:
+            login (callable): authenticates and installs the new token, raises on failure
+            refresh_after (int): token age (seconds) from which a background login is started
+            expires_after (int): token age (seconds) from which the token is no longer used
+            background (bool): if True, a timer refreshes the token even when no call is made
+            retry_interval (int): seconds between two background logins after a failed one
+        """
+
+        self.log = log
+        self.refresh_after = refresh_after
+        self.expires_after = expires_after
+        self.background = background
+        self.retry_interval = retry_interval
+        self.issued_at = None
+        self._login = login
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        # One element list shared with the finalizer, which cancels the pending timer
+        self._timer = [None]
+        self._failed_at = None
+        # Bumped by stop, a login started before is not published
+        self._generation = 0
+        weakref.finalize(self, _cancel_timer, self._timer)
+
+    def age(self):
+        """ Seconds since the token was issued, None when there is no token. """
+
+        issued_at = self.issued_at
+        if issued_at is None:
+            return None
+        return time.time() - issued_at
+
+    def ensure_valid(self):
+        """ Makes sure the token can be sent, blocks only when it expired. """
+
+        age = self.age()
+        if age is not None and age < self.refresh_after:
+            return
+        if age is None or age >= self.expires_after:
+            self.log.debug("Token age: '{}'. Re-authentication will be initiated.".format(age))
+            self.refresh()
+        else:
+            self.refresh_in_background()
+
+    def refresh(self, min_age=None):
+        """ Logs in and waits for the new token, joining the login already in flight if any.
+
+        Args:
+            min_age (int): skip the login when the token is younger than this many seconds
+
+        Returns:
+            bool: False when the login was skipped
+        """
+
+        if min_age is not None:
+            age = self.age()
+            if age is not None and age < min_age:
+                self.log.debug("Token age: '{}'. Token was just renewed, keeping it.".format(age))
+                return False
+        self._flight.do(_LOGIN, self._do_login)
+        return True
+
+    def refresh_in_background(self):
+        """ Starts a login on a background thread unless one is running, just failed or there is no token.
+
+        Returns:
+            bool: True if a login was started
+        """
+
+        if self.issued_at is None:
+            return False
+        failed_at = self._failed_at
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_interval:
+            return False
+        started = self._flight.start(_LOGIN, self._do_background_login)
+        if started:
+            self.log.debug("Token age: '{}'. Token renewal started.".format(self.age()))
+        return started
+
+    def restore(self, issued_at):
+        """ Adopts a token issued earlier, e.g. by another process.
+
+        Args:
+            issued_at (float): time.time() at which the token was issued
+        """
+
+        self.issued_at = issued_at
+        self._failed_at = None
+        self._schedule(max(0, self.refresh_after - self.age()))
+
+    def stop(self):
+        """ Cancels the background refresh and forgets the token. """
+
+        with self._lock:
+            timer, self._timer[0] = self._timer[0], None
+            self.issued_at = None
+            self._generation += 1
+        if timer is not None:
+            timer.cancel()
+
+    def _do_login(self):
+        generation = self._generation
+        self._login()
+        with self._lock:
+            if generation != self._generation:
+                self.log.debug("Token manager stopped during the login, the new token is not used.")
+                return
+            issued_at = self.issued_at = time.time()
+            self._failed_at = None
+        self.log.debug("New login time: '{}'".format(int(issued_at)))
+        self._schedule(self.refresh_after)
+
+    def _do_background_login(self):
+        try:
+            self._do_login()
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            self.log.warning("Token renewal failed, the current token is kept: {}".format(e))
+            self._schedule(self.retry_interval)
+
+    def _schedule(self, delay):
+        if not self.background:
+            return
+        timer = threading.Timer(delay, _refresh_in_background, (weakref.ref(self),))
+        timer.daemon = True
+        with self._lock:
+            previous, self._timer[0] = self._timer[0], timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+
+
+def _refresh_in_background(tokens_ref):
+    tokens = tokens_ref()
+    if tokens is not None:
+        tokens.refresh_in_background()
+
+
+def _cancel_timer(timer_slot):
+    timer = timer_slot[0]
+    if timer is not None:
+        timer.cancel()
+
+
+class TokenCache(object):
+    """ Authentication tokens kept in a local file so that new processes can reuse them.
+
+    The file maps "server|username" to the token and the time it was issued. It is created with
+    mode 0600 in a 0700 directory and replaced atomically, a file readable by other users is
+    ignored. Passwords are never written.
+
+    Usage:
+        cache = TokenCache("~/.sgtpolicysdk/tokens.json")
+        cache.set(TokenCache.key(server, username), cookie, time.time())
+        cache.get(TokenCache.key(server, username), max_age=900)
+    """
+
+    def __init__(self, path=DEFAULT_TOKEN_CACHE_PATH):
+        """ Object initializer.
+
+        Args:
+            path (str): path of the cache file, "~" is expanded
+        """
+
+        self.log = log
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(server, username):
+        """ Cache key of a user on a cluster. """
+
+        return "{}|{}".format(server, username)
+
+    def get(self, key, max_age=None):
+        """ Returns a cached token.
+
+        Args:
+            key (str): cache key, see TokenCache.key
+            max_age (int): ignore a token issued more than this many seconds ago
+
+        Returns:
+            dict: {'token', 'issued_at'}, None when there is no usable token
+        """
+
+        with self._lock:
+            entry = self._read().get(key)
+        if not entry or 'token' not in entry or 'issued_at' not in entry:
+            return None
+        if max_age is not None and time.time() - entry['issued_at'] >= max_age:
+            return None
+        return entry
+
+    def set(self, key, token, issued_at, max_age=None):
+        """ Stores a token, dropping the tokens older than max_age.
+
+        Args:
+            key (str): cache key, see TokenCache.key
+            token (str): token to store
+            issued_at (float): time.time() at which the token was issued
+            max_age (int): age (seconds) from which the stored tokens are dropped
+        """
+
+        with self._lock:
+            entries = self._read()
+            if max_age is not None:
+                now = time.time()
+                entries = dict((k, v) for k, v in entries.items()
+                               if isinstance(v, dict) and now - v.get('issued_at', 0) < max_age)
+            entries[key] = {'token': token, 'issued_at': issued_at}
+            self._write(entries)
+
+    def discard(self, key):
+        """ Removes the token of a key. """
+
+        with self._lock:
+            entries = self._read()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+
+    def _read(self):
+        try:
+            if os.name == "posix" and os.stat(self.path).st_mode & 0o077:
+                self.log.warning("Ignoring token cache {}, it is accessible by other users.".format(self.path))
+                return {}
+            with open(self.path) as cache_file:
+                entries = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.log.warning("Ignoring unreadable token cache {}: {}".format(self.path, e))
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries):
+        directory = os.path.dirname(self.path)
+        temp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.log.warning("Could not write token cache {}: {}".format(self.path, e))
@@ -0,0 +1,515 @@
+"""cache.py
+
+In-memory caches used by the API wrappers.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import copy
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger("Cache")
+log = logger
+
+DEFAULT_SG_INDEX_TTL = 300
+DEFAULT_SG_INDEX_MAX_SIZE = 20000
+DEFAULT_POLICY_INDEX_TTL = 300
+DEFAULT_RESPONSE_CACHE_TTL = 30
+DEFAULT_RESPONSE_CACHE_MAX_SIZE = 1000
+
+#: Resource families a write invalidates, by family of the written path.
+RESOURCE_FAMILIES = {
+    'scalablegroup': ('scalablegroup', 'virtualnetworkcontext', 'policy'),
+    'contract': ('contract', 'policy'),
+    'policy': ('policy',),
+    'virtualnetworkcontext': ('virtualnetworkcontext', 'scalablegroup'),
+}
+
+
+class TTLCache(object):
+    """ Thread-safe mapping with LRU eviction and per-entry expiry.
+
+    Usage:
+        cache = TTLCache(ttl=60, max_size=1000)
+        cache.set("key", "value")
+        cache.get("key")
+    """
+
+    def __init__(self, ttl=None, max_size=None):
+        """ Object initializer.
+
+        Args:
+            ttl (int): seconds an entry stays valid, None to never expire
+            max_size (int): maximum number of entries, None for no bound
+        """
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        """ Returns the value of a live entry and marks it most recently used.
+
+        Args:
+            key (object): key of the entry
+            default (object): returned when the entry is missing or expired
+
+        Returns:
+            object: value of the entry
+        """
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """ Adds or replaces an entry, evicting the least recently used ones past max_size.
+
+        Args:
+            key (object): key of the entry
+            value (object): value of the entry
+            ttl (int): seconds this entry stays valid, defaults to the cache ttl
+
+        Returns:
+            int: number of entries evicted to make room
+        """
+
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while self.max_size is not None and len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def pop(self, key, default=None):
+        """ Removes an entry.
+
+        Args:
+            key (object): key of the entry
+            default (object): returned when the entry is missing
+
+        Returns:
+            object: value of the removed entry
+        """
+
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def keys(self):
+        """ Snapshot of the keys, least recently used first. """
+
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        """ Removes every entry. """
+
+        with self._lock:
+            self._data.clear()
+
+
+class SecurityGroupIndex(object):
+    """ name -> {id, securityGroupTag, resourceVersion} index of the DNAC Security Groups.
+
+    The index is filled by one bulk inventory fetch. Names the SDK created, updated or deleted
+    are invalidated and resolved again with a per-name query on their next lookup.
+    """
+
+    def __init__(self, fetch_all, fetch_by_name, ttl=DEFAULT_SG_INDEX_TTL, max_size=DEFAULT_SG_INDEX_MAX_SIZE):
+        """ Object initializer.
+
+        Args:
+            fetch_all (callable): returns every Security Group in DNAC
+            fetch_by_name (callable): returns the list of Security Groups matching a name
+            ttl (int): seconds an entry (and the bulk load) stays valid, None to never expire
+            max_size (int): maximum number of Security Groups kept, None for no bound
+        """
+
+        self.log = log
+        self._fetch_all = fetch_all
+        self._fetch_by_name = fetch_by_name
+        self._entries = TTLCache(ttl=ttl, max_size=max_size)
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._complete = False
+        self._stale = set()
+
+    @property
+    def ttl(self):
+        return self._entries.ttl
+
+    @property
+    def max_size(self):
+        return self._entries.max_size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, name):
+        """ Returns the index entry of a Security Group.
+
+        Args:
+            name (str): Security Group name
+
+        Returns:
+            dict: {'name', 'id', 'securityGroupTag', 'resourceVersion'}, None when not in DNAC
+        """
+
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+        with self._lock:
+            if not self._is_fresh():
+                self.load()
+            entry = self._entries.get(name)
+            if entry is not None:
+                return entry
+            if self._complete and name not in self._stale:
+                return None
+        self.log.debug("Security group index miss for {}, querying DNAC.".format(name))
+        security_groups = self._fetch_by_name(name)
+        if not security_groups:
+            return None
+        with self._lock:
+            self._stale.discard(name)
+            return self.add(security_groups[0])
+
+    def load(self):
+        """ Replaces the index content with one bulk inventory fetch. """
+
+        security_groups = self._fetch_all()
+        with self._lock:
+            # Taken before the entries are added, so the load never outlives its entries
+            loaded_at = time.monotonic()
+            self._entries.clear()
+            self._stale.clear()
+            for security_group in security_groups:
+                self.add(security_group)
+            self._complete = self.max_size is None or len(security_groups) <= self.max_size
+            self._loaded_at = loaded_at
+        self.log.info("Security group index loaded with {} security groups.".format(len(security_groups)))
+
+    def add(self, security_group):
+        """ Adds a Security Group returned by DNAC to the index. An entry evicted to make room makes
+        the index incomplete: a name it doesn't hold is then queried rather than reported absent.
+
+        Args:
+            security_group (dict): Security Group as returned by DNAC
+
+        Returns:
+            dict: the index entry
+        """
+
+        entry = {
+            'name': security_group['name'],
+            'id': security_group['id'],
+            'securityGroupTag': security_group.get('securityGroupTag'),
+            'resourceVersion': security_group.get('resourceVersion'),
+        }
+        with self._lock:
+            if self._entries.set(entry['name'], entry):
+                self._complete = False
+        return entry
+
+    def invalidate(self, *names):
+        """ Drops Security Groups changed by a write, they are queried again on next lookup.
+
+        Args:
+            names (list): Security Group names
+        """
+
+        with self._lock:
+            for name in names:
+                self._entries.pop(name)
+                self._stale.add(name)
+
+    def clear(self):
+        """ Drops the whole index, the next lookup reloads it. """
+
+        with self._lock:
+            self._entries.clear()
+            self._stale.clear()
+            self._loaded_at = None
+            self._complete = False
+
+    def _is_fresh(self):
+        if self._loaded_at is None:
+            return False
+        return self.ttl is None or time.monotonic() - self._loaded_at < self.ttl
+
+
+class PolicyMatrixIndex(object):
+    """ (producer idRef, consumer idRef) -> policy index of the DNAC policy matrix.
+
+    The index is filled by one policy list fetch and kept up to date by the SDK writes. Policies
+    created by the SDK are indexed without an id until the next load, which the first lookup of
+    such a pair triggers.
+    """
+
+    def __init__(self, fetch_all, ttl=DEFAULT_POLICY_INDEX_TTL):
+        """ Object initializer.
+
+        Args:
+            fetch_all (callable): returns every policy in DNAC
+            ttl (int): seconds the index stays valid, None to never expire
+        """
+
+        self.log = log
+        self.ttl = ttl
+        self._fetch_all = fetch_all
+        self._policies = {}
+        self._lock = threading.RLock()
+        self._loaded_at = None
+
+    def __len__(self):
+        return len(self._policies)
+
+    @staticmethod
+    def key(policy):
+        """ (producer idRef, consumer idRef) of a policy as returned by DNAC. """
+
+        return (policy["producer"]["scalableGroup"][0]["idRef"],
+                policy["consumer"]["scalableGroup"][0]["idRef"])
+
+    def lookup(self, producer_id, consumer_id):
+        """ Returns the policy from a producer Security Group to a consumer Security Group.
+
+        Args:
+            producer_id (str): idRef of the producer (source) Security Group
+            consumer_id (str): idRef of the consumer (destination) Security Group
+
+        Returns:
+            dict: policy with its id, contract idRef, policyStatus, priority, policyScope and name,
+                  None when there is no policy between the Security Groups
+        """
+
+        with self._lock:
+            if not self._is_fresh():
+                self.load()
+            policy = self._policies.get((producer_id, consumer_id))
+            if policy is not None and policy.get("id") is None:
+                self.load()
+                policy = self._policies.get((producer_id, consumer_id))
+            return policy
+
+    def load(self):
+        """ Replaces the index content with one policy list fetch. """
+
+        policies = self._fetch_all()
+        with self._lock:
+            self._policies = dict((self.key(policy), policy) for policy in policies)
+            self._loaded_at = time.monotonic()
+        self.log.info("Policy matrix index loaded with {} policies.".format(len(policies)))
+
+    def add(self, policy):
+        """ Adds a policy created by the SDK, the policy body may lack the id.
+
+        Args:
+            policy (dict): policy as posted to DNAC
+        """
+
+        with self._lock:
+            if self._loaded_at is not None:
+                self._policies[self.key(policy)] = dict(policy)
+
+    def update(self, policy):
+        """ Replaces the fields of an indexed policy with those of a policy updated by the SDK.
+
+        Args:
+            policy (dict): policy as put to DNAC
+        """
+
+        with self._lock:
+            indexed = self._policies.get(self.key(policy))
+            if indexed is not None:
+                indexed.update(policy)
+
+    def remove(self, producer_id, consumer_id):
+        """ Drops a policy deleted by the SDK.
+
+        Args:
+            producer_id (str): idRef of the producer (source) Security Group
+            consumer_id (str): idRef of the consumer (destination) Security Group
+        """
+
+        with self._lock:
+            self._policies.pop((producer_id, consumer_id), None)
+
+    def invalidate(self):
+        """ Drops the whole index after a write with unknown outcome, the next lookup reloads it. """
+
+        with self._lock:
+            self._policies = {}
+            self._loaded_at = None
+
+    def _is_fresh(self):
+        if self._loaded_at is None:
+            return False
+        return self.ttl is None or time.monotonic() - self._loaded_at < self.ttl
+
+
+class ResponseCache(object):
+    """ Cache of the decoded GET responses of the scalablegroup, contract, policy and
+    virtualnetworkcontext resources.
+
+    Entries are keyed on the resource path and the query parameters. A write (POST, PUT, DELETE) to a
+    family drops the entries of the families it affects (RESOURCE_FAMILIES), a write to any other
+    path drops every entry. A GET started before an invalidation is never stored. A write answered with
+    a task is applied when the task completes, so its families are dropped once more then (complete_task).
+
+    Usage:
+        cache = ResponseCache(ttl=30, path_ttls={"virtualnetworkcontext": 120, "summary": 0})
+    """
+
+    def __init__(self, ttl=DEFAULT_RESPONSE_CACHE_TTL, max_size=DEFAULT_RESPONSE_CACHE_MAX_SIZE, path_ttls=None):
+        """ Object initializer.
+
+        Args:
+            ttl (int): seconds a response stays valid
+            max_size (int): maximum number of responses kept, least recently used ones are evicted
+            path_ttls (dict): path substring -> ttl overriding ttl for the matching paths, 0 to not cache them
+        """
+
+        self.log = log
+        self.path_ttls = dict(path_ttls or {})
+        self._entries = TTLCache(ttl=ttl, max_size=max_size)
+        self._tasks = TTLCache(max_size=max_size)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def ttl(self):
+        return self._entries.ttl
+
+    @property
+    def generation(self):
+        """ Counter bumped by every invalidation, to pass to set. """
+
+        return self._generation
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def family(resource_path):
+        """ Resource family of a path, None when the path belongs to no family. """
+
+        for segment in resource_path.split("/"):
+            if segment in RESOURCE_FAMILIES:
+                return segment
+        return None
+
+    @staticmethod
+    def key(resource_path, params=None):
+        """ Cache key of a GET request. """
+
+        return (resource_path, json.dumps(params, sort_keys=True, default=str) if params else None)
+
+    def ttl_for(self, resource_path):
+        """ ttl of the responses of a path. """
+
+        for path, ttl in self.path_ttls.items():
+            if path in resource_path:
+                return ttl
+        return self.ttl
+
+    def cacheable(self, resource_path):
+        """ Whether the responses of a path are cached. """
+
+        return self.family(resource_path) is not None and self.ttl_for(resource_path) != 0
+
+    def get(self, key):
+        """ Returns a copy of a cached response, None when it is not cached. """
+
+        value = self._entries.get(key)
+        return None if value is None else copy.deepcopy(value)
+
+    def set(self, key, value, generation=None):
+        """ Caches a copy of a response.
+
+        Args:
+            key (tuple): cache key, see ResponseCache.key
+            value (object): decoded response
+            generation (int): generation read before the request was sent, the response is dropped
+                              when an invalidation happened since
+        """
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries.set(key, copy.deepcopy(value), ttl=self.ttl_for(key[0]))
+
+    def invalidate(self, resource_path=None):
+        """ Drops the responses a write to a path may have changed.
+
+        Args:
+            resource_path (str): written path, None to drop every response
+        """
+
+        family = None if resource_path is None else self.family(resource_path)
+        with self._lock:
+            self._generation += 1
+            if family is None:
+                self._entries.clear()
+                return
+            families = RESOURCE_FAMILIES[family]
+            for key in self._entries.keys():
+                if self.family(key[0]) in families:
+                    self._entries.pop(key)
+
+    def track_task(self, task_id, resource_path):
+        """ Remembers the path of a write answered with a task, see complete_task.
+
+        Args:
+            task_id (str): id of the task running the write
+            resource_path (str): written path
+        """
+
+        self._tasks.set(task_id, resource_path)
+
+    def complete_task(self, task_id):
+        """ Drops the responses the write of a completed task may have changed, once per task.
+
+        Args:
+            task_id (str): id of the completed task
+
+        Returns:
+            bool: True if the task ran a tracked write
+        """
+
+        resource_path = self._tasks.pop(task_id)
+        if resource_path is None:
+            return False
+        self.invalidate(resource_path)
+        return True
+
+    def clear(self):
+        """ Drops every response. """
+
+        self.invalidate()
@@ -6,39 +6,94 @@ Notes:
 __author__ = 'Pawan Singh <pawansi@cisco.com>'
 __copyright__ = 'Copyright 2022, Cisco Systems'
 
+import collections.abc
+import copy
+import itertools
 import json
 import requests
 import os
 import sys
 import importlib
 import time
+import threading
 import logging
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from .config import (
+    DEFAULT_KEEP_ALIVE,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_TOKEN_REFRESH,
+    DEFAULT_TOKEN_CACHE,
+    DEFAULT_WAIT_ON_RATE_LIMIT,
+    DEFAULT_RESPONSE_CACHE,
+    DEFAULT_COALESCE_REQUESTS,
+    DEFAULT_LAZY_CONNECT,
+)
+from . import jsoncodec
+from .auth import TokenManager, TokenCache
+from .cache import ResponseCache
+from .concurrency import SingleFlight
+from .ratelimit import RateLimiter
 logger = logging.getLogger("ClientManager")
 log = logger
 
+def _wrap(value):
+    """ Attribute access view of a decoded JSON value, the value itself when it is a scalar. """
+
+    if type(value) is dict:
+        return ResponseDict(value)
+    if type(value) is list:
+        return ResponseList(value)
+    return value
+
+
 class ResponseDict(dict):
-    """ Data structure to extend dict attribute access """
+    """ Data structure to extend dict attribute access
 
-    def __init__(self, response):
+    The view is lazy: nested objects and arrays are wrapped when first read and stored back in
+    place of the plain value, so a response is never copied as a whole and the decoded value is
+    not kept aside.
+    """
+
+    def __init__(self, response=None, **kwargs):
         """ initialize a dict to ResponseDict
 
         Args:
             response (dict): dict to convert
         """
-        self._response = response
-        for k, v in response.items():
-            if isinstance(v, dict):
-                self[k] = ResponseDict(v)
-            else:
-                self[k] = v
-            if isinstance(v, list):
-                val_list = []
-                for item in v:
-                    if isinstance(item, dict):
-                        val_list.append(ResponseDict(item))
-                    else:
-                        val_list.append(item)
-                self[k] = val_list
+
+        super(ResponseDict, self).__init__(response or {}, **kwargs)
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        wrapped = _wrap(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        return _wrap(dict.pop(self, key, *default))
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            dict.__setitem__(self, key, default)
+        return self[key]
+
+    def values(self):
+        # Views read through __getitem__, so the values are wrapped when iterated
+        return collections.abc.ValuesView(self)
+
+    def items(self):
+        return collections.abc.ItemsView(self)
+
+    def copy(self):
+        return ResponseDict(self)
 
     def __getattr__(self, name):
         """ extend attribute access
@@ -50,15 +105,56 @@ class ResponseDict(dict):
             object: attribute of response
         """
 
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
         return self.get(name)
-        
+
+    def __reduce__(self):
+        return (ResponseDict, (dict(self),))
+
+
+class ResponseList(list):
+    """ List counterpart of ResponseDict, wrapping the objects and arrays it holds when first read. """
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResponseList(list.__getitem__(self, index))
+        value = list.__getitem__(self, index)
+        wrapped = _wrap(value)
+        if wrapped is not value:
+            list.__setitem__(self, index, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def pop(self, *index):
+        return _wrap(list.pop(self, *index))
+
+    def copy(self):
+        return ResponseList(self)
+
 class ClientManager(object):
-    """ Client manager to interact with API Clients of various services. """
+    """ Client manager to interact with API Clients of various services.
+
+    Thread safety:
+        A single client manager can be shared by any number of worker threads. Every request
+        is sent with its own copy of the headers, the common headers are replaced (never
+        mutated in place) under a lock, and authentication state changes are serialized by
+        the same lock.
+    """
 
     TIMEOUT = 60
     AUTHORIZATION_TOKEN = 'X-JWT-ACCESS-TOKEN'
 
-    def __init__(self, server, username, password, base_url, protocol="https", port=None):
+    def __init__(self, server, username, password, base_url, protocol="https", port=None,
+                 keep_alive=DEFAULT_KEEP_ALIVE, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, wait_on_rate_limit=DEFAULT_WAIT_ON_RATE_LIMIT):
         """ Object initializer
 
         Initializer also authenticates using the credentials, and stores the generated
@@ -71,6 +167,11 @@ class ClientManager(object):
             base_url (str): default/constant portion of the url
             protocol (str): network protocol - http or https
             port (str): port number
+            keep_alive (bool): if True, API calls reuse pooled keep-alive connections
+            pool_connections (int): number of per-host connection pools to cache
+            pool_maxsize (int): maximum number of connections kept open per host
+            wait_on_rate_limit (bool): if True, requests go through the rate limiter of the cluster and
+                                       requests answered with 429/503 are sent again
 
         Raises:
             ApiClientException: when unsupported protocol is passed
@@ -95,6 +196,15 @@ class ClientManager(object):
 
         self._default_headers = {}
         self._common_headers = {}
+        self._auth_lock = threading.RLock()
+
+        self.keep_alive = keep_alive
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._http_session = None
+
+        self.wait_on_rate_limit = wait_on_rate_limit
+        self.rate_limiter = RateLimiter.for_cluster(self.server_url)
 
     def __repr__(self):
         """ Overrides the default object representation to display the object attributes. """
@@ -128,6 +238,43 @@ class ClientManager(object):
         """ Disconnect from API client"""
 
         self.log.info("Disconnecting from the API client.")
+        self.close_http_session()
+
+    @property
+    def http_session(self):
+        """ Pooled HTTP session shared by every API call of this client.
+
+        The session is created on first use. Cookies are never stored in the session, the
+        authentication cookie is carried explicitly in the common headers.
+
+        Returns:
+            requests.Session: session with keep-alive connection pools mounted
+        """
+
+        session = self._http_session
+        if session is not None:
+            return session
+        with self._auth_lock:
+            if self._http_session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                      pool_maxsize=self.pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._http_session = session
+                self.log.debug("Created HTTP session with pool_connections={} pool_maxsize={}"
+                               .format(self.pool_connections, self.pool_maxsize))
+            return self._http_session
+
+    def close_http_session(self):
+        """ Closes the pooled HTTP session and all of its keep-alive connections. """
+
+        with self._auth_lock:
+            session, self._http_session = self._http_session, None
+        if session is not None:
+            self.log.debug("Closing HTTP session.")
+            session.close()
 
     def authenticate(self):
         """ Generates a new authentication ticket or token. """
@@ -150,17 +297,47 @@ class ClientManager(object):
 
     @property
     def common_headers(self):
+        """ Headers sent with every request.
+
+        The dict in use is returned, as before. Changing it in place is not thread safe: assign
+        common_headers (or use pop_common_header) to change the headers while requests are in flight.
+        """
         return self._common_headers
 
     @common_headers.setter
     def common_headers(self, headers):
         """ Set common headers of client.
 
+        The headers are merged into a new dict which then replaces the current one, so a
+        request already in flight keeps the headers it started with.
+
         Args:
             headers (dict): headers to set.
         """
 
-        self._common_headers.update(headers)
+        with self._auth_lock:
+            common_headers = dict(self._common_headers)
+            common_headers.update(headers)
+            self._common_headers = common_headers
+
+    def pop_common_header(self, name):
+        """ Remove a common header of client.
+
+        Args:
+            name (str): name of the header to remove.
+
+        Returns:
+            str: value of the removed header
+
+        Raises:
+            KeyError: when the header is not set
+        """
+
+        with self._auth_lock:
+            common_headers = dict(self._common_headers)
+            value = common_headers.pop(name)
+            self._common_headers = common_headers
+        return value
 
     def call_api(self,
                  method,
@@ -252,14 +429,14 @@ class ClientManager(object):
         #if "//" in url:
         #    url = url.replace("//", "/")
         if "headers" in kwargs:
-            headers = kwargs.pop("headers")
+            headers = dict(kwargs.pop("headers"))
         else:
-            headers = self.default_headers
+            headers = dict(self.default_headers)
 
         if not kwargs.get("timeout"):
             kwargs["timeout"] = ClientManager.TIMEOUT
 
-        headers.update(self.common_headers)
+        headers.update(self._common_headers)
 
         if "verify" in kwargs:
             verify = kwargs.pop("verify")
@@ -269,11 +446,19 @@ class ClientManager(object):
 
         self.log.debug("Request:\nmethod:\n{}\nurl: {}\nheaders: {}\nParameters: {}"
                        .format(method, url, headers, kwargs))
-        response = requests.request(method, url, headers=headers, verify=verify, **kwargs)
+        requester = self.http_session if self.keep_alive else requests
+        if self.wait_on_rate_limit:
+            response = self.rate_limiter.send(
+                lambda: requester.request(method, url, headers=headers, verify=verify, **kwargs),
+                retry="files" not in kwargs)
+        else:
+            response = requester.request(method, url, headers=headers, verify=verify, **kwargs)
 
         time_taken = response.elapsed.seconds + response.elapsed.microseconds / 1e6
+        # Reading the text of a streamed response would download it
         self.log.debug("API Response:\nurl: {}\nmethod: {}\ntime taken in seconds: {}\ntext: {}"
-                       .format(url, method, format(time_taken, '.2f'), response.text))
+                       .format(url, method, format(time_taken, '.2f'),
+                               "<streamed>" if kwargs.get("stream") else response.text))
 
         if hasattr(response, 'headers'):
             if response.headers and 'set-cookie' in response.headers:
@@ -281,7 +466,7 @@ class ClientManager(object):
                 if ClientManager.AUTHORIZATION_TOKEN in response.headers['set-cookie']:
                     self.log.debug("Response cookie has {}. Update cookie: {}".format(
                         ClientManager.AUTHORIZATION_TOKEN, response.headers['set-cookie']))
-                    self.common_headers["Cookie"] = response.headers['set-cookie']
+                    self.common_headers = {"Cookie": response.headers['set-cookie']}
 
         if raise_exception:
             try:
@@ -293,24 +478,38 @@ class ClientManager(object):
                 raise e
 
         if response_dict:
-            if response.text:
-                return json.loads(response.text)
+            if response.content:
+                return jsoncodec.loads(response.content)
             else:
                 return response
         else:
             return response
 
 class DnacClientManager(ClientManager):
-    """ Client manager to interact with API Client. """
+    """ Client manager to interact with API Client.
+
+    Thread safety:
+        One DnacClientManager (and therefore one DNACenterSGTPolicyAPI) can be shared by N
+        worker threads. The Maglev cookie age is checked without locking on the hot path.
+        Logins are single-flight: a cookie older than FORTY_FIVE_MIN is renewed on a
+        background thread while the requests keep using it, and only an expired cookie
+        (SIXTY_MIN) makes the threads wait, all of them for the same login.
+    """
     MAGLEV_TIMEOUT = 30 # As requested by Maglev team via Olaf
     FORTY_FIVE_MIN = 600
     SIXTY_MIN = 900
-
-    def __init__(self, server, username, password, version="v1",base_url = "/api", connect=True):
+    RECONNECT_MIN_AGE = 30
+
+    def __init__(self, server, username, password, version="v1",base_url = "/api", connect=True,
+                 keep_alive=DEFAULT_KEEP_ALIVE, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, token_refresh=DEFAULT_TOKEN_REFRESH,
+                 token_cache=DEFAULT_TOKEN_CACHE, wait_on_rate_limit=DEFAULT_WAIT_ON_RATE_LIMIT,
+                 response_cache=DEFAULT_RESPONSE_CACHE, coalesce_requests=DEFAULT_COALESCE_REQUESTS,
+                 lazy_connect=DEFAULT_LAZY_CONNECT):
         """ Object initializer.
 
         Initializer also aunthenticates using the credentials, and stores the generated
-        authentication ticket.
+        authentication ticket, unless lazy_connect defers it to the first API call.
 
         Args:
             server (str): cluster server name (routable DNS address or ip)
@@ -318,6 +517,20 @@ class DnacClientManager(ClientManager):
             password (str): password to authenticate with
             version (str): version of the API to be used
             connect (bool): flag to authenticate and establish swagger client
+            keep_alive (bool): if True, API calls reuse pooled keep-alive connections
+            pool_connections (int): number of per-host connection pools to cache
+            pool_maxsize (int): maximum number of connections kept open per host
+            token_refresh (bool): if True, the Maglev cookie is renewed by a timer even when idle
+            token_cache (bool or str): if set, the Maglev cookie is shared with other processes through
+                                       the default token cache file (True) or the given file
+            wait_on_rate_limit (bool): if True, requests are rate limited per cluster and the
+                                       requests answered with 429/503 are sent again
+            response_cache (bool or ResponseCache): if set, the GET responses of the SG, contract, policy
+                                                    and virtual network resources are cached, True for a
+                                                    ResponseCache with the default ttl and size
+            coalesce_requests (bool): if True, concurrent identical GETs share one HTTP request
+            lazy_connect (bool): if True (and connect is True), the initializer sends no request and the
+                                 first API call authenticates, concurrent first calls sharing one login
         """
 
         #base_url = base_url
@@ -328,14 +541,38 @@ class DnacClientManager(ClientManager):
             username,
             password,
             base_url,
-            protocol=protocol)
+            protocol=protocol,
+            keep_alive=keep_alive,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            wait_on_rate_limit=wait_on_rate_limit)
 
         self.default_headers = {"Content-Type": "application/json"}
         self.__connected = False
+        # Bumped by disconnect, a login started before is not published
+        self._auth_generation = 0
         self.cas_ticket = None
-        self._maglev_token_time = ""
+        self._tokens = TokenManager(self._maglev_authenticate,
+                                    refresh_after=DnacClientManager.FORTY_FIVE_MIN,
+                                    expires_after=DnacClientManager.SIXTY_MIN,
+                                    background=token_refresh)
+        if response_cache is True:
+            response_cache = ResponseCache()
+        elif response_cache is False:
+            response_cache = None
+        self.response_cache = response_cache
+        self.coalesce_requests = coalesce_requests
+        self._in_flight_gets = SingleFlight()
+        self._write_epochs = itertools.count()
+        self._write_epoch = next(self._write_epochs)
+        if token_cache:
+            self._token_cache = TokenCache() if token_cache is True else TokenCache(token_cache)
+        else:
+            self._token_cache = None
+        self._connect_on_first_call = connect and lazy_connect
+        self._connecting = SingleFlight()
         #self.initialize_loggers()
-        if connect:
+        if connect and not lazy_connect:
             self.connect()
         self.setup_api()
 
@@ -362,21 +599,36 @@ class DnacClientManager(ClientManager):
             self.__connected = False
 
         self.log.info("Connecting to the Apic-em northbound API client.")
-        self._maglev_authenticate()
-        self._maglev_token_time = int(time.time())
-        self.log.debug("Initial Maglev login time: '{}'.".format(self._maglev_token_time))
+        if self.__connected:
+            self.log.info("Already connected to Northbound API client.")
+            return
+        if not force and self._restore_maglev_token():
+            return
+        self._tokens.refresh()
+
     def reconnect_clients(self):
-        self.connect()
+        """ Logs in again, unless a login completed in the last RECONNECT_MIN_AGE seconds.
+
+        Concurrent callers share one login, so N threads recovering from the same failure cause a
+        single authentication.
+        """
+
+        self._tokens.refresh(min_age=DnacClientManager.RECONNECT_MIN_AGE)
 
     def disconnect(self):
         """ Deletes the generated ticket and effectively disconnecting the user. """
 
-        try:
-            self.log.info("Disconnecting the Apic-em northbound API client.")
-            self.common_headers.pop("Cookie")
-        except KeyError:
-            self.log.info("Already disconnected from Northbound API client.")
-        self.__connected = False
+        with self._auth_lock:
+            try:
+                self.log.info("Disconnecting the Apic-em northbound API client.")
+                self.pop_common_header("Cookie")
+            except KeyError:
+                self.log.info("Already disconnected from Northbound API client.")
+            self.__connected = False
+            self._connect_on_first_call = False
+            self._auth_generation += 1
+        self._tokens.stop()
+        self.close_http_session()
 
     def api_switch_call(self,method=None,resource_path=None, **kwargs):
         '''
@@ -423,9 +675,8 @@ class DnacClientManager(ClientManager):
         else:
             copyargs = {'method': method, 'URL': "{}{}".format(self.server, resource_path)}
         copyargs.update(kwargs)
-        if self.__connected :
-            self.log.debug("Checking the validity of the Maglev cookie.")
-            self._handle_maglev_idle_timeout()
+        if "auth" not in kwargs:
+            self._check_maglev_token()
         headers = self.default_headers.copy()
         #TODO (mingyazh): remove trailing back slash of resource path in client
         if not kwargs.get("timeout"):
@@ -436,13 +687,15 @@ class DnacClientManager(ClientManager):
         if "headers" in kwargs:
             headers.update(kwargs.pop("headers"))
         resource_path = resource_path.rstrip('\/')
+        if "json" in kwargs and "data" not in kwargs and "files" not in kwargs:
+            kwargs["data"] = jsoncodec.dumps_bytes(kwargs.pop("json"))
+            headers.setdefault("Content-Type", "application/json")
         if "data" in kwargs and "files" not in kwargs:
-            if isinstance(kwargs["data"], dict):
-                kwargs["data"] = json.dumps(kwargs["data"])
+            if isinstance(kwargs["data"], (dict, list)):
                 if "encode" in kwargs:
-                    kwargs["data"] = kwargs["data"].encode(kwargs.pop("encode"))
-            if isinstance(kwargs["data"], list):
-                kwargs["data"] = json.dumps(kwargs["data"]).encode("utf-8")
+                    kwargs["data"] = jsoncodec.dumps(kwargs["data"]).encode(kwargs.pop("encode"))
+                else:
+                    kwargs["data"] = jsoncodec.dumps_bytes(kwargs["data"])
         if "files" in kwargs:
             if kwargs["files"]:
                 if isinstance(kwargs["files"], dict):
@@ -475,22 +728,115 @@ class DnacClientManager(ClientManager):
         if "dna" in kwargs:
             del kwargs['dna']
 
-        response = super(DnacClientManager, self).call_api(method=method,
-                                                             resource_path=resource_path,
-                                                             headers=headers,
-                                                             timeout=timeout,
-                                                             **kwargs)
-        if isinstance(response, dict):
-            return ResponseDict(response)
-        if isinstance(response, list):
-            response_list = []
-            for item in response:
-                if isinstance(item, dict):
-                    response_list.append(ResponseDict(item))
-                else:
-                    response_list.append(item)
-            return response_list
-        return response
+        cache = self.response_cache
+        cache_key = None
+        plain_get = (method == "GET" and kwargs.get("response_dict", True)
+                     and "auth" not in kwargs and "stream" not in kwargs)
+        if method != "GET":
+            self._write_epoch = next(self._write_epochs)
+        if cache is not None:
+            if method != "GET":
+                cache.invalidate(resource_path)
+            elif plain_get and cache.cacheable(resource_path):
+                cache_key = cache.key(resource_path, kwargs.get("params"))
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    self.log.debug("Response cache hit: {}".format(resource_path))
+                    return self._response_object(cached)
+                generation = cache.generation
+
+        if plain_get and self.coalesce_requests:
+            # A GET sent after a write never joins a GET sent before it
+            flight_key = (resource_path, ResponseCache.key(resource_path, kwargs.get("params"))[1],
+                          self._write_epoch)
+            response, shared = self._in_flight_gets.share(flight_key, self._send, method, resource_path,
+                                                          headers, timeout, kwargs)
+            if shared:
+                self.log.debug("Shared in-flight response: {}".format(resource_path))
+                response = copy.deepcopy(response)
+        else:
+            response = self._send(method, resource_path, headers, timeout, kwargs)
+        if method != "GET":
+            self._write_epoch = next(self._write_epochs)
+
+        if cache is not None:
+            if cache_key is not None and isinstance(response, (dict, list)):
+                cache.set(cache_key, response, generation=generation)
+            elif method != "GET":
+                cache.invalidate(resource_path)
+                task_id = self._task_id(response)
+                if task_id:
+                    cache.track_task(task_id, resource_path)
+            elif self._is_completed_task(resource_path, response):
+                # The write a task ran for is only applied once the task completed
+                cache.complete_task(response["response"].get("id"))
+        return self._response_object(response)
+
+    def _send(self, method, resource_path, headers, timeout, kwargs):
+        """ Sends a request, logging in again and resending it once when it is rejected with 401. """
+
+        cookie = self._common_headers.get("Cookie")
+        try:
+            return super(DnacClientManager, self).call_api(method=method,
+                                                           resource_path=resource_path,
+                                                           headers=headers,
+                                                           timeout=timeout,
+                                                           **kwargs)
+        except requests.exceptions.HTTPError as e:
+            if (e.response is None or e.response.status_code != 401 or not self.__connected
+                    or "auth" in kwargs or "files" in kwargs):
+                raise
+            self.log.info("Request rejected with 401, authenticating again.")
+            self._reauthenticate(cookie)
+            return super(DnacClientManager, self).call_api(method=method,
+                                                           resource_path=resource_path,
+                                                           headers=headers,
+                                                           timeout=timeout,
+                                                           **kwargs)
+
+    def stream_items(self, method, resource_path, item_path, chunk_size=jsoncodec.STREAM_CHUNK_SIZE, **kwargs):
+        """ Sends a request with stream=True and yields the items of an array of the JSON response as they are
+        received, see jsoncodec.iter_items.
+
+        Streamed requests bypass the response cache and are never coalesced. The request is sent when the
+        iteration starts and the connection is released when it ends.
+
+        Args:
+            method (str): http method
+            resource_path (str): resource_path
+            item_path (tuple): keys and indexes leading to the array, e.g. ("response", 0, "acaGBPSummary")
+            chunk_size (int): size (bytes) of the chunks read from the response
+            kwargs (dict): arguments of call_api
+
+        Yields:
+            ResponseDict: items of the array
+        """
+
+        response = self.call_api(method, resource_path, stream=True, response_dict=False, **kwargs)
+        try:
+            for item in jsoncodec.iter_items(response.iter_content(chunk_size), item_path):
+                yield _wrap(item)
+        finally:
+            response.close()
+
+    @staticmethod
+    def _response_object(response):
+        """ Lazy attribute access view of a decoded response, see ResponseDict. """
+
+        return _wrap(response)
+
+    @staticmethod
+    def _task_id(response):
+        if not isinstance(response, dict) or not isinstance(response.get("response"), dict):
+            return None
+        return response["response"].get("taskId")
+
+    @staticmethod
+    def _is_completed_task(resource_path, response):
+        if "/task/" not in resource_path or not isinstance(response, dict):
+            return False
+        task = response.get("response")
+        return isinstance(task, dict) and bool(task.get("endTime"))
 
     def _authenticate(self):
         """ Generates a new authentication cas_ticket. """
@@ -517,26 +863,64 @@ class DnacClientManager(ClientManager):
         else:
             self.log.info("Already connected to Northbound API client.")
     def _maglev_authenticate(self):
-        """ Generates a new authentication cookie for Maglev. """
+        """ Generates a new authentication cookie for Maglev.
 
-        if not self.__connected:
-            resource_path = "/api/system/" + self.version + "/identitymgmt/login"
-            response = self.call_api("GET",
-                                     resource_path,
-                                     auth=(self.username, self.password),
-                                     raise_exception=True,
-                                     response_dict=False,
-                                     verify=False,full_path=True)
-            if (not hasattr(self, 'common_headers')
-                or not self.common_headers
-                or 'Cookie' not in self.common_headers
-                or 'X-JWT-ACCESS-TOKEN' not in self.common_headers['Cookie']):
-                # If cookie is not generated for a user, don't want to proceed
-                raise Exception("Cannot create NB client for an unauthorized user {}"
-                                .format(self.username))
+        The requests in flight keep the previous cookie, the new one is installed in the common
+        headers by call_api when the login response sets it.
+        """
+
+        generation = self._auth_generation
+        resource_path = "/api/system/" + self.version + "/identitymgmt/login"
+        response = self.call_api("GET",
+                                 resource_path,
+                                 auth=(self.username, self.password),
+                                 raise_exception=True,
+                                 response_dict=False,
+                                 verify=False,full_path=True)
+        set_cookie = response.headers.get('set-cookie', '') if hasattr(response, 'headers') else ''
+        if ClientManager.AUTHORIZATION_TOKEN not in (set_cookie or ''):
+            # If cookie is not generated for a user, don't want to proceed
+            raise Exception("Cannot create NB client for an unauthorized user {}"
+                            .format(self.username))
+        with self._auth_lock:
+            if generation != self._auth_generation:
+                # disconnect() ran during the login, drop the cookie the login response installed
+                try:
+                    self.pop_common_header("Cookie")
+                except KeyError:
+                    pass
+                self.log.info("Disconnected during the login, the new cookie is dropped.")
+                return
             self.__connected = True
-        else:
-            self.log.info("Already connected to Northbound API client.")
+        if self._token_cache is not None:
+            self._token_cache.set(TokenCache.key(self.server, self.username), self._common_headers['Cookie'],
+                                  time.time(), max_age=DnacClientManager.SIXTY_MIN)
+
+    def _restore_maglev_token(self):
+        """ Reuses the Maglev cookie of the token cache, if it holds one that did not expire.
+
+        Returns:
+            bool: True if a cached cookie is now used
+        """
+
+        if self._token_cache is None:
+            return False
+        entry = self._token_cache.get(TokenCache.key(self.server, self.username),
+                                      max_age=DnacClientManager.SIXTY_MIN)
+        if entry is None:
+            return False
+        self.common_headers = {"Cookie": entry['token']}
+        self.__connected = True
+        self._tokens.restore(entry['issued_at'])
+        self.log.info("Reusing the cached Maglev cookie issued {} seconds ago."
+                      .format(int(time.time() - entry['issued_at'])))
+        return True
+
+    def _reauthenticate(self, rejected_cookie):
+        """ Logs in again after a request was rejected with a cookie, unless another thread already did. """
+
+        if self._common_headers.get("Cookie") == rejected_cookie:
+            self._tokens.refresh()
 
     def add_new_apis(self, client_path):
         """ Add new clients to DnacClientManager.
@@ -565,22 +949,15 @@ class DnacClientManager(ClientManager):
                         client_instance = getattr(client_module, obj)(self)
                         setattr(self, client_name, client_instance)
 
-    def _handle_maglev_idle_timeout(self):
-        """ Handles the timeout for the maglev login """
-
-        elapsed_time = int(time.time()) - self._maglev_token_time
-        self.log.debug("Initial login: '{}', Elapsed time: '{}'.".format(self._maglev_token_time,
-                                                                         elapsed_time))
-        if DnacClientManager.FORTY_FIVE_MIN <= elapsed_time < DnacClientManager.SIXTY_MIN:
-            self.log.debug("Cookie Age: '{}'. Cookie will be renewed.".format(elapsed_time))
-            self._maglev_token_time = int(time.time())
-            self.log.debug("New login time: '{}'".format(self._maglev_token_time))
-        elif elapsed_time >= DnacClientManager.SIXTY_MIN:
-            self.log.debug("Cookie Age: '{}'. Re-authentication will be initiated".format(elapsed_time))
-            self.__connected = False
-            self._maglev_authenticate()
-            self._maglev_token_time = int(time.time())
-            self.log.debug("New login time: '{}'".format(self._maglev_token_time))
-        else:
-            self.log.debug("Cookie age: '{}'. It is still valid.".format(elapsed_time))
+    def _check_maglev_token(self):
+        """ Makes sure the Maglev cookie is valid before a request is sent.
+
+        The common case (connected, cookie younger than FORTY_FIVE_MIN) takes no lock. An older
+        cookie is renewed in the background, an expired one is renewed before the request is sent.
+        With lazy_connect, the first requests wait for one shared connect.
+        """
 
+        if self.__connected:
+            self._tokens.ensure_valid()
+        elif self._connect_on_first_call:
+            self._connecting.do("connect", self.connect)
@@ -0,0 +1,132 @@
+"""concurrency.py
+
+Synchronization helpers shared by the client managers.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import threading
+import logging
+
+logger = logging.getLogger("Concurrency")
+log = logger
+
+
+class _Call(object):
+    """ One in-flight call of a SingleFlight group. """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight(object):
+    """ Collapses concurrent calls sharing a key into one execution.
+
+    The first caller of a key runs the function, the callers arriving while it runs wait for it and
+    get the same result (or exception). Once the call returned the key is free again.
+
+    Usage:
+        flight = SingleFlight()
+        flight.do("login", client.login)
+    """
+
+    def __init__(self):
+        """ Object initializer. """
+
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        """ Whether a call of a key is running. """
+
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn, *args, **kwargs):
+        """ Runs fn, or waits for the running call of the same key.
+
+        Args:
+            key (object): key shared by the calls to collapse
+            fn (callable): function to run
+            args (list): positional arguments of fn
+            kwargs (dict): keyword arguments of fn
+
+        Returns:
+            object: result of fn
+
+        Raises:
+            Exception: the exception fn raised
+        """
+
+        return self.share(key, fn, *args, **kwargs)[0]
+
+    def share(self, key, fn, *args, **kwargs):
+        """ Same as do, also telling whether the result comes from the call of another caller.
+
+        Callers that mutate the result should copy it when it is shared.
+
+        Returns:
+            tuple: (result of fn, True if another caller ran fn)
+        """
+
+        call, leader = self._join(key)
+        if leader:
+            self._run(key, call, fn, args, kwargs)
+        else:
+            call.event.wait()
+        return call.outcome(), not leader
+
+    def start(self, key, fn, *args, **kwargs):
+        """ Runs fn on a daemon thread unless a call of the same key is already running.
+
+        Args:
+            key (object): key shared by the calls to collapse
+            fn (callable): function to run
+            args (list): positional arguments of fn
+            kwargs (dict): keyword arguments of fn
+
+        Returns:
+            bool: True if a new call was started
+        """
+
+        call, leader = self._join(key)
+        if not leader:
+            return False
+        thread = threading.Thread(target=self._run, args=(key, call, fn, args, kwargs),
+                                  name="SingleFlight-{}".format(key))
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _run(self, key, call, fn, args, kwargs):
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            log.debug("Single flight call {} failed: {}".format(key, e))
+        except BaseException as e:
+            # KeyboardInterrupt, SystemExit...: the waiters get it too, the caller still sees it
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
@@ -43,3 +43,53 @@ DEFAULT_WAIT_ON_RATE_LIMIT = True
 #: **verify** default value.
 #: Controls whether to verify the server's TLS certificate or not.
 DEFAULT_VERIFY = True
+
+#: **keep_alive** default value.
+#: Reuse pooled keep-alive HTTP connections across API calls.
+DEFAULT_KEEP_ALIVE = True
+
+#: **pool_connections** default value.
+#: Number of per-host connection pools kept by the HTTP session.
+DEFAULT_POOL_CONNECTIONS = 10
+
+#: **pool_maxsize** default value.
+#: Maximum number of keep-alive connections kept open per host.
+DEFAULT_POOL_MAXSIZE = 10
+
+#: **max_concurrency** default value.
+#: Maximum number of DNAC requests in flight for the asyncio client.
+DEFAULT_MAX_CONCURRENCY = 32
+
+#: **token_refresh** default value.
+#: Renew the Maglev authentication cookie on a background timer before it expires, even when idle.
+#: Off by default: calls renew the cookie themselves, the timer only helps long idle clients.
+DEFAULT_TOKEN_REFRESH = False
+
+#: **token_cache** default value.
+#: Reuse the authentication cookie of earlier processes, True for the default path or a file path.
+DEFAULT_TOKEN_CACHE = False
+
+#: Default file of the authentication cookie cache.
+DEFAULT_TOKEN_CACHE_PATH = '~/.sgtpolicysdk/tokens.json'
+
+#: **rate limit** default values, shared by the clients of a cluster when wait_on_rate_limit is enabled.
+#: Highest number of requests in flight, lowered on 429/503 answers and raised back on success.
+DEFAULT_RATE_LIMIT_CONCURRENCY = 32
+
+#: Maximum number of requests per second, None for no bound.
+DEFAULT_RATE_LIMIT_RATE = None
+
+#: Number of times a request answered with 429/503 is sent again.
+DEFAULT_RATE_LIMIT_RETRIES = 5
+
+#: **response_cache** default value.
+#: Cache the GET responses of the Security Group, contract, policy and Virtual Network resources.
+DEFAULT_RESPONSE_CACHE = False
+
+#: **coalesce_requests** default value.
+#: Concurrent identical GET requests share one HTTP request and its response.
+DEFAULT_COALESCE_REQUESTS = True
+
+#: **lazy_connect** default value.
+#: Authenticate on the first API call instead of when the client is created.
+DEFAULT_LAZY_CONNECT = False
@@ -52,6 +52,9 @@ VERIFY_ENVIRONMENT_VARIABLE = 'DNA_CENTER_VERIFY'
 #: name of the environment verify variable
 VERIFY_STRING_ENVIRONMENT_VARIABLE = 'DNA_CENTER_VERIFY_STRING'
 
+#: name of the environment token_cache variable
+TOKEN_CACHE_ENVIRONMENT_VARIABLE = 'DNA_CENTER_TOKEN_CACHE'
+
 
 def _is_bool(value):
     if isinstance(value, str):
@@ -123,3 +126,11 @@ def get_env_verify():
         VERIFY_STRING_ENVIRONMENT_VARIABLE, str, str) or \
         _get_env_value(VERIFY_ENVIRONMENT_VARIABLE, bool, _is_bool)
     return DNA_CENTER_VERIFY
+
+
+def get_env_token_cache():
+    DNA_CENTER_TOKEN_CACHE = os.getenv(TOKEN_CACHE_ENVIRONMENT_VARIABLE)
+    if DNA_CENTER_TOKEN_CACHE is not None and \
+            DNA_CENTER_TOKEN_CACHE.lower() in ('true', 'false'):
+        return _is_bool(DNA_CENTER_TOKEN_CACHE)
+    return DNA_CENTER_TOKEN_CACHE
@@ -0,0 +1,270 @@
+"""jsoncodec.py
+
+JSON encoding and decoding of the request and response bodies.
+
+The fastest installed backend is used: orjson, then ujson, then the standard library json module.
+Bodies are decoded from the response bytes, without building the intermediate text. The items of a large
+array can also be decoded one at a time while a streamed response is received, see iter_items.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import re
+import json
+import codecs
+import logging
+
+logger = logging.getLogger("JsonCodec")
+log = logger
+
+#: Backends by order of preference.
+BACKENDS = ('orjson', 'ujson', 'json')
+#: Size (bytes) of the chunks read from a streamed response.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = '0123456789.eE+-'
+
+
+class JsonCodec(object):
+    """ loads/dumps of one JSON backend.
+
+    Usage:
+        codec = JsonCodec.load("orjson")
+        codec.loads(response.content)
+        codec.dumps_bytes({"name": "SGT1"})
+    """
+
+    def __init__(self, name, loads, dumps_bytes):
+        """ Object initializer.
+
+        Args:
+            name (str): backend name
+            loads (callable): decodes bytes or str
+            dumps_bytes (callable): encodes to UTF-8 bytes
+        """
+
+        self.name = name
+        self.loads = loads
+        self.dumps_bytes = dumps_bytes
+
+    def __repr__(self):
+        return "[JsonCodec: {}]".format(self.name)
+
+    def dumps(self, obj):
+        """ Encodes to str. """
+
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    @classmethod
+    def load(cls, name):
+        """ Returns the codec of a backend.
+
+        Args:
+            name (str): one of BACKENDS
+
+        Raises:
+            ImportError: when the backend is not installed
+            ValueError: when the backend is unknown
+        """
+
+        if name == 'orjson':
+            import orjson
+            return cls(name, orjson.loads, orjson.dumps)
+        if name == 'ujson':
+            import ujson
+            return cls(name, ujson.loads,
+                       lambda obj: ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8"))
+        if name == 'json':
+            return cls(name, json.loads,
+                       lambda obj: json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode("utf-8"))
+        raise ValueError("Unknown JSON backend {}, expected one of {}.".format(name, ", ".join(BACKENDS)))
+
+    @classmethod
+    def best(cls):
+        """ Returns the codec of the first installed backend of BACKENDS. """
+
+        for name in BACKENDS:
+            try:
+                return cls.load(name)
+            except ImportError:
+                continue
+
+
+_codec = JsonCodec.best()
+log.debug("Using the {} JSON backend.".format(_codec.name))
+
+
+def get_backend():
+    """ Name of the backend in use. """
+
+    return _codec.name
+
+
+def set_backend(name):
+    """ Selects the backend used by the SDK.
+
+    Args:
+        name (str): one of BACKENDS
+
+    Raises:
+        ImportError: when the backend is not installed
+    """
+
+    global _codec
+    _codec = JsonCodec.load(name)
+
+
+def loads(data):
+    """ Decodes a JSON document given as bytes or str. """
+
+    return _codec.loads(data)
+
+
+def dumps(obj):
+    """ Encodes to a JSON str. """
+
+    return _codec.dumps(obj)
+
+
+def dumps_bytes(obj):
+    """ Encodes to UTF-8 JSON bytes. """
+
+    return _codec.dumps_bytes(obj)
+
+
+class _StreamReader(object):
+    """ Reads the values of a JSON document received in chunks.
+
+    Only the text not consumed yet is buffered: values are decoded with the C scanner of the json module
+    and a value cut by the end of a chunk is decoded again once the next chunk arrived.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._scanner = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """ Appends the next chunk to the buffer, returns False at the end of the document. """
+
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._decoder.decode(b"", final=True)
+            elif isinstance(chunk, bytes):
+                text = self._decoder.decode(chunk)
+            else:
+                text = chunk
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        """ Next non whitespace character, None at the end of the document. """
+
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return None
+
+    def expect(self, chars):
+        """ Consumes the next non whitespace character, which must be one of chars. """
+
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError("Expecting one of {!r} in the JSON document, got {!r}.".format(chars, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """ Decodes the next value. """
+
+        self.peek()
+        while True:
+            try:
+                value, end = self._scanner.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the end of the buffer may go on in the next chunk
+            if (end == len(self.buffer) or self.buffer[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def enter(self, step):
+        """ Moves to the value of a key of the current object, or of an index of the current array.
+
+        Returns:
+            bool: False when the key or index does not exist
+        """
+
+        if isinstance(step, int):
+            if self.peek() != '[':
+                return False
+            self.pos += 1
+            if self.peek() == ']':
+                return False
+            for _ in range(step):
+                self.value()
+                if self.expect(',]') == ']':
+                    return False
+            return True
+        if self.peek() != '{':
+            return False
+        self.pos += 1
+        if self.peek() == '}':
+            return False
+        while True:
+            key = self.value()
+            self.expect(':')
+            if key == step:
+                return True
+            self.value()
+            if self.expect(',}') == '}':
+                return False
+
+
+def iter_items(chunks, path=()):
+    """ Yields one by one the items of an array of a JSON document received in chunks.
+
+    Only the item being decoded is held in memory, whatever the size of the array, and the first item is
+    available as soon as its chunk arrived. The document is not read past the end of the array.
+
+    Args:
+        chunks (iterable): bytes or str chunks of the document, e.g. response.iter_content(STREAM_CHUNK_SIZE)
+        path (tuple): keys (str) and indexes (int) leading to the array, e.g. ("response", 0, "acaGBPSummary")
+
+    Yields:
+        object: decoded items, none when the path does not lead to an array
+
+    Raises:
+        ValueError: when the document is not valid JSON
+    """
+
+    reader = _StreamReader(chunks)
+    for step in path:
+        if not reader.enter(step):
+            return
+    if reader.peek() != '[':
+        return
+    reader.pos += 1
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
@@ -0,0 +1,121 @@
+"""pagination.py
+
+Walks the offset/limit paginated collections of DNAC (Security Groups, contracts, policies) page by page, or
+fetches all their pages concurrently when the size of the collection is known.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("Pagination")
+log = logger
+
+#: Number of objects requested per page.
+DEFAULT_PAGE_SIZE = 500
+#: Maximum number of pages fetched concurrently by fetch_all.
+DEFAULT_FETCH_WORKERS = 8
+
+
+def iter_pages(fetch_page, page_size=DEFAULT_PAGE_SIZE, prefetch=True, offset=0):
+    """ Yields the pages of a collection until a page shorter than page_size.
+
+    With prefetch, the next page is requested on a background thread as soon as a page is yielded, so the
+    request overlaps with the processing of the caller. At most two pages are held: the one being processed
+    and the one being fetched.
+
+    Args:
+        fetch_page (callable): fetch_page(offset, limit) returns the list of objects of a page
+        page_size (int): number of objects per page
+        prefetch (bool): fetch the next page while the current one is processed
+        offset (int): offset of the first page
+
+    Yields:
+        list: non empty pages, in order
+
+    Raises:
+        Exception: the exception fetch_page raised, when the page it failed on is reached
+    """
+
+    if not prefetch:
+        while True:
+            page = fetch_page(offset, page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Prefetch")
+    future = executor.submit(fetch_page, offset, page_size)
+    try:
+        while True:
+            page = future.result()
+            if len(page) < page_size:
+                if page:
+                    yield page
+                return
+            offset += page_size
+            future = executor.submit(fetch_page, offset, page_size)
+            yield page
+    finally:
+        # The caller may stop early, the page being fetched is then dropped
+        future.cancel()
+        executor.shutdown(wait=False)
+
+
+def paginate(fetch_page, page_size=DEFAULT_PAGE_SIZE, prefetch=True, offset=0):
+    """ Yields the objects of a collection one by one, see iter_pages.
+
+    Args:
+        fetch_page (callable): fetch_page(offset, limit) returns the list of objects of a page
+        page_size (int): number of objects per page
+        prefetch (bool): fetch the next page while the current one is processed
+        offset (int): offset of the first object
+
+    Yields:
+        object: objects of the collection, in order
+    """
+
+    for page in iter_pages(fetch_page, page_size=page_size, prefetch=prefetch, offset=offset):
+        for item in page:
+            yield item
+
+
+def fetch_all(fetch_page, total, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_FETCH_WORKERS):
+    """ Fetches every object of a collection of known size, requesting its pages concurrently.
+
+    The total plans ceil(total / page_size) offset/limit requests, run by at most max_workers threads and
+    merged in offset order. When the last planned page is full, the collection grew after it was counted and
+    the remaining pages are walked one after the other.
+
+    Args:
+        fetch_page (callable): fetch_page(offset, limit) returns the list of objects of a page
+        total (int): number of objects of the collection, e.g. read from its summary
+        page_size (int): number of objects per page
+        max_workers (int): maximum number of pages fetched at the same time
+
+    Returns:
+        list: objects of the collection, in order
+
+    Raises:
+        Exception: the first exception fetch_page raised, in offset order
+    """
+
+    offsets = range(0, max(total, 0), page_size)
+    if not offsets:
+        return list(paginate(fetch_page, page_size=page_size, prefetch=False))
+    workers = max(1, min(max_workers, len(offsets)))
+    log.debug("Fetching {} objects with {} requests of {} on {} workers."
+              .format(total, len(offsets), page_size, workers))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FetchAll") as executor:
+        pages = list(executor.map(lambda offset: fetch_page(offset, page_size), offsets))
+    objects = [item for page in pages for item in page]
+    if len(pages[-1]) == page_size:
+        objects.extend(paginate(fetch_page, page_size=page_size, prefetch=False,
+                                offset=offsets[-1] + page_size))
+    return objects
@@ -0,0 +1,479 @@
+"""polling.py
+
+Polling strategies deciding how long Task waits between two GET /v1/task/{id} calls, the
+TaskPoller tracking many tasks at once and the TaskFuture returned by wrappers called with wait=False.
+
+A strategy hands out, for every wait, an iterator of sleep durations (the first task check is
+always immediate) and is told how long each completed task took, keyed by the task serviceType.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import heapq
+import itertools
+import random
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger("Polling")
+log = logger
+
+DEFAULT_POLL_INTERVAL = 2
+DEFAULT_INITIAL_INTERVAL = 0.25
+DEFAULT_MAX_INTERVAL = 10
+DEFAULT_BACKOFF_FACTOR = 2
+DEFAULT_JITTER = 0.2
+DEFAULT_SMOOTHING = 0.3
+DEFAULT_POLL_WORKERS = 8
+DEFAULT_CALLBACK_WORKERS = 4
+
+
+class FixedInterval(object):
+    """ Polls every interval seconds, the historical Task behaviour.
+
+    Usage:
+        dnac.task.set_poll_strategy(FixedInterval(2))
+    """
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        """ Object initializer.
+
+        Args:
+            interval (float): seconds between two task checks
+        """
+
+        self.interval = interval
+
+    def __repr__(self):
+        return "{}(interval={})".format(type(self).__name__, self.interval)
+
+    def delays(self, operation=None):
+        """ Sleep durations between the task checks of one wait.
+
+        Args:
+            operation (str): serviceType of the task
+
+        Returns:
+            iterator: seconds to sleep before each following check
+        """
+
+        while True:
+            yield self.interval
+
+    def observe(self, operation, elapsed):
+        """ Records how long a task took to complete.
+
+        Args:
+            operation (str): serviceType of the task
+            elapsed (float): seconds the task took
+        """
+
+        pass
+
+
+class ExponentialBackoff(FixedInterval):
+    """ Sleeps initial_interval, then factor times longer after every check, up to max_interval.
+
+    Every duration is spread by +/- jitter (a fraction of it) so that many waiters do not poll in lockstep.
+
+    Usage:
+        dnac.task.set_poll_strategy(ExponentialBackoff(initial_interval=0.1, max_interval=5))
+    """
+
+    def __init__(self, initial_interval=DEFAULT_INITIAL_INTERVAL, factor=DEFAULT_BACKOFF_FACTOR,
+                 max_interval=DEFAULT_MAX_INTERVAL, jitter=DEFAULT_JITTER):
+        """ Object initializer.
+
+        Args:
+            initial_interval (float): seconds to sleep after the first check
+            factor (float): growth of the sleep duration after every check
+            max_interval (float): cap of the sleep duration
+            jitter (float): fraction of the sleep duration randomly added or removed
+        """
+
+        super(ExponentialBackoff, self).__init__(initial_interval)
+        self.initial_interval = initial_interval
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+    def __repr__(self):
+        return "{}(initial_interval={}, factor={}, max_interval={}, jitter={})".format(
+            type(self).__name__, self.initial_interval, self.factor, self.max_interval, self.jitter)
+
+    def delays(self, operation=None):
+        interval = self.initial_interval
+        while True:
+            yield self._spread(interval)
+            interval = min(interval * self.factor, self.max_interval)
+
+    def _spread(self, interval):
+        if not self.jitter:
+            return interval
+        return max(0, interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+class AdaptiveBackoff(ExponentialBackoff):
+    """ ExponentialBackoff whose first sleep is the average completion time of the same serviceType.
+
+    The average is an exponential moving average of the completion times observed so far, so a
+    task type that usually completes in 3 seconds is checked right after 3 seconds, then with
+    a fresh backoff starting at initial_interval.
+
+    Usage:
+        dnac.task.set_poll_strategy(AdaptiveBackoff())
+    """
+
+    def __init__(self, initial_interval=DEFAULT_INITIAL_INTERVAL, factor=DEFAULT_BACKOFF_FACTOR,
+                 max_interval=DEFAULT_MAX_INTERVAL, jitter=DEFAULT_JITTER, smoothing=DEFAULT_SMOOTHING):
+        """ Object initializer.
+
+        Args:
+            initial_interval (float): seconds to sleep after the first check of unknown task types
+            factor (float): growth of the sleep duration after every check
+            max_interval (float): cap of the sleep duration
+            jitter (float): fraction of the sleep duration randomly added or removed
+            smoothing (float): weight of the latest completion time in the moving average
+        """
+
+        super(AdaptiveBackoff, self).__init__(initial_interval, factor, max_interval, jitter)
+        self.smoothing = smoothing
+        self._averages = {}
+        self._lock = threading.Lock()
+
+    def expected_duration(self, operation):
+        """ Average completion time of a serviceType, None before its first completion.
+
+        Args:
+            operation (str): serviceType of the task
+
+        Returns:
+            float: seconds
+        """
+
+        with self._lock:
+            return self._averages.get(operation)
+
+    def delays(self, operation=None):
+        expected = self.expected_duration(operation)
+        if expected is not None and expected > self.initial_interval:
+            yield self._spread(min(expected, self.max_interval))
+        for delay in super(AdaptiveBackoff, self).delays(operation):
+            yield delay
+
+    def observe(self, operation, elapsed):
+        with self._lock:
+            average = self._averages.get(operation)
+            if average is None:
+                self._averages[operation] = elapsed
+            else:
+                self._averages[operation] = self.smoothing * elapsed + (1 - self.smoothing) * average
+        log.debug("Task {} completed in {:.3f}s, expected {:.3f}s".format(operation, elapsed,
+                                                                         self._averages[operation]))
+
+
+def task_duration(task_response, default):
+    """ Seconds a completed task took according to DNAC, default when DNAC does not tell.
+
+    Args:
+        task_response (dict): task as returned by GET /v1/task/{id}
+        default (float): duration measured by the caller
+
+    Returns:
+        float: seconds
+    """
+
+    start_time = task_response.get("startTime")
+    end_time = task_response.get("endTime")
+    if isinstance(start_time, int) and isinstance(end_time, int) and end_time >= start_time:
+        return (end_time - start_time) / 1000.0
+    return default
+
+
+def is_task_complete(task_response):
+    """ True once a task either failed or ended.
+
+    Args:
+        task_response (dict): task as returned by GET /v1/task/{id}
+
+    Returns:
+        bool: task completion
+    """
+
+    if task_response["isError"] is True:
+        return True
+    return not task_response["isError"] and task_response.get("endTime") is not None
+
+
+class _TrackedTask(object):
+    """ A task followed by TaskPoller. """
+
+    def __init__(self, task_id, timeout, poll_strategy):
+        self.task_id = task_id
+        self.future = Future()
+        self.poll_strategy = poll_strategy
+        self.start_time = time.time()
+        self.deadline = time.monotonic() + timeout
+        self.delays = None
+
+
+class TaskPoller(object):
+    """ Tracks many DNAC tasks with one scheduler thread.
+
+    Every tracked task is checked right away, then on its own poll strategy schedule; the checks
+    due at the same time are run by a small pool of workers. Each task resolves a
+    concurrent.futures.Future with its final task response, or False when it did not complete
+    within its timeout. A check that raises is retried on the same schedule, the future only fails
+    with the error when it is still raised at the timeout. The scheduler thread exits when no task
+    is left and restarts on demand.
+
+    Usage:
+        poller = TaskPoller(dnac.task.get_task_by_id)
+        future = poller.track(task_id, timeout=120)
+        task_response = future.result()
+    """
+
+    def __init__(self, get_task, poll_strategy=None, max_workers=DEFAULT_POLL_WORKERS):
+        """ Object initializer.
+
+        Args:
+            get_task (callable): returns the task response of a task id
+            poll_strategy (object): default polling strategy, AdaptiveBackoff when None
+            max_workers (int): maximum number of task checks in flight
+        """
+
+        self.log = log
+        self._get_task = get_task
+        self.poll_strategy = poll_strategy or AdaptiveBackoff()
+        self.max_workers = max_workers
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executor = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._schedule) + self._in_flight
+
+    def track(self, task_id, timeout, poll_strategy=None):
+        """ Starts following a task.
+
+        Args:
+            task_id (str): task id
+            timeout (float): seconds after which the task is given up
+            poll_strategy (object): polling strategy of this task, defaults to the poller one
+
+        Returns:
+            Future: resolved with the task response, or False on timeout
+        """
+
+        tracked = _TrackedTask(task_id, timeout, poll_strategy or self.poll_strategy)
+        with self._condition:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            self._push(time.monotonic(), tracked)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="TaskPoller")
+                self._thread.daemon = True
+                self._thread.start()
+        return tracked.future
+
+    def close(self):
+        """ Gives up every tracked task and releases the workers. """
+
+        with self._condition:
+            tracked_tasks = [entry[2] for entry in self._schedule]
+            self._schedule = []
+            executor, self._executor = self._executor, None
+            self._condition.notify()
+        for tracked in tracked_tasks:
+            tracked.future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _push(self, when, tracked):
+        heapq.heappush(self._schedule, (when, next(self._sequence), tracked))
+        self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._schedule and not self._in_flight:
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    if self._schedule and self._schedule[0][0] <= now:
+                        break
+                    self._condition.wait(self._schedule[0][0] - now if self._schedule else None)
+                due = []
+                while self._schedule and self._schedule[0][0] <= now:
+                    due.append(heapq.heappop(self._schedule)[2])
+                self._in_flight += len(due)
+                executor = self._executor
+            for tracked in due:
+                executor.submit(self._check, tracked)
+
+    def _check(self, tracked):
+        next_check = None
+        try:
+            if tracked.future.done():
+                return
+            task_response = self._get_task(tracked.task_id)
+            if is_task_complete(task_response):
+                tracked.poll_strategy.observe(task_response.get("serviceType"),
+                                              task_duration(task_response, time.time() - tracked.start_time))
+                tracked.future.set_result(task_response)
+            elif time.monotonic() >= tracked.deadline:
+                self.log.error("Task {} didn't complete in time, last status:{}".format(tracked.task_id,
+                                                                                      task_response))
+                tracked.future.set_result(False)
+            else:
+                if tracked.delays is None:
+                    tracked.delays = tracked.poll_strategy.delays(task_response.get("serviceType"))
+                next_check = min(time.monotonic() + next(tracked.delays), tracked.deadline)
+        except Exception as error:
+            if time.monotonic() >= tracked.deadline:
+                self.log.error("Checking task {} failed: {}".format(tracked.task_id, error))
+                if not tracked.future.done():
+                    tracked.future.set_exception(error)
+            else:
+                self.log.warning("Checking task {} failed, retrying: {}".format(tracked.task_id, error))
+                if tracked.delays is None:
+                    tracked.delays = tracked.poll_strategy.delays()
+                next_check = min(time.monotonic() + next(tracked.delays), tracked.deadline)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                if next_check is not None and self._executor is not None:
+                    self._push(next_check, tracked)
+                elif next_check is not None:
+                    tracked.future.cancel()
+                self._condition.notify()
+
+
+class TaskFuture(object):
+    """ Handle of a DNAC operation submitted with wait=False.
+
+    The result is what the same wrapper returns with wait=True, typically a {'status': ...} dict.
+    It is computed by the wrapper handler once the shared TaskPoller resolved the task; the handler
+    runs on a callback executor, never on the poller threads. A handler submitting a follow-up task
+    returns its TaskFuture, which this one then completes with.
+
+    Usage:
+        future = dnac.securitygroups.createSecurityGroup("SGT1", 1001, wait=False)
+        future.add_done_callback(lambda future: print(future.result()))
+        future.result(timeout=120)
+    """
+
+    def __init__(self, task_future=None, handler=None, executor=None, task_id=None):
+        """ Object initializer.
+
+        Args:
+            task_future (Future): future resolved with the task response, or False on timeout
+            handler (callable): turns the task response into the operation result
+            executor (Executor): runs the handler
+            task_id (str): id of the DNAC task
+        """
+
+        self.task_id = task_id
+        self._future = Future()
+        self._handler = handler
+        self._executor = executor
+        if task_future is not None:
+            task_future.add_done_callback(self._task_done)
+
+    def __repr__(self):
+        return "<TaskFuture task_id={} done={}>".format(self.task_id, self.done())
+
+    @classmethod
+    def resolved(cls, result):
+        """ TaskFuture already holding result, for operations that ended before submitting a task.
+
+        Args:
+            result (object): operation result
+
+        Returns:
+            TaskFuture: done future
+        """
+
+        task_future = cls()
+        task_future._future.set_result(result)
+        return task_future
+
+    def result(self, timeout=None):
+        """ Result of the operation.
+
+        Args:
+            timeout (float): seconds to wait, None to wait forever
+
+        Returns:
+            object: what the wrapper returns with wait=True
+
+        Raises:
+            concurrent.futures.TimeoutError: if the operation did not complete within timeout
+        """
+
+        return self._future.result(timeout)
+
+    def exception(self, timeout=None):
+        """ Exception raised by the operation, None when it succeeded. """
+
+        return self._future.exception(timeout)
+
+    def done(self):
+        """ True once the result is available. """
+
+        return self._future.done()
+
+    def cancelled(self):
+        return self._future.cancelled()
+
+    def add_done_callback(self, fn):
+        """ Calls fn(task_future) once the result is available, right away if it already is.
+
+        Args:
+            fn (callable): completion callback
+        """
+
+        self._future.add_done_callback(lambda future: fn(self))
+
+    def _task_done(self, task_future):
+        if task_future.cancelled():
+            self._future.cancel()
+            return
+        error = task_future.exception()
+        if error is not None:
+            self._future.set_exception(error)
+            return
+        self._executor.submit(self._run_handler, task_future.result())
+
+    def _run_handler(self, task_response):
+        try:
+            result = self._handler(task_response)
+        except Exception as error:
+            log.error("Completing task {} failed: {}".format(self.task_id, error))
+            self._future.set_exception(error)
+            return
+        if isinstance(result, TaskFuture):
+            # The handler submitted a follow-up task, complete with its result
+            result.add_done_callback(self._chained_done)
+        else:
+            self._future.set_result(result)
+
+    def _chained_done(self, task_future):
+        if task_future.cancelled():
+            self._future.cancel()
+            return
+        error = task_future.exception()
+        if error is not None:
+            self._future.set_exception(error)
+        else:
+            self._future.set_result(task_future.result())
@@ -0,0 +1,251 @@
+"""ratelimit.py
+
+Client side rate limiting of the requests sent to a DNAC cluster.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import time
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+
+from .config import (
+    DEFAULT_RATE_LIMIT_CONCURRENCY,
+    DEFAULT_RATE_LIMIT_RATE,
+    DEFAULT_RATE_LIMIT_RETRIES,
+)
+
+logger = logging.getLogger("RateLimit")
+log = logger
+
+#: HTTP status codes DNAC answers with when it sheds load.
+THROTTLE_STATUS_CODES = (429, 503)
+#: Backoff (seconds) of the first retry of a throttled request without Retry-After, doubled on each retry.
+DEFAULT_THROTTLE_BACKOFF = 1
+#: Upper bound (seconds) of the wait before retrying a throttled request.
+MAX_THROTTLE_BACKOFF = 60
+
+
+def parse_retry_after(value):
+    """ Seconds to wait according to a Retry-After header.
+
+    Args:
+        value (str): header value, delay-seconds or HTTP-date
+
+    Returns:
+        float: seconds to wait, None when the header is missing or invalid
+    """
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket(object):
+    """ Token bucket pacing the requests, which can also be blocked until a point in time.
+
+    With rate None the bucket never runs out of tokens and only the blocks (Retry-After) apply.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE_LIMIT_RATE, burst=None):
+        """ Object initializer.
+
+        Args:
+            rate (float): tokens (requests) added per second, None for no pacing
+            burst (int): maximum number of tokens, defaults to one second worth of tokens
+        """
+
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Takes one token, sleeping until one is available and the bucket is not blocked. """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def block(self, seconds):
+        """ Holds every acquisition for a number of seconds.
+
+        Args:
+            seconds (float): seconds from now during which no token is handed out
+        """
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class AimdLimiter(object):
+    """ Limit of the requests in flight, adjusted by additive increase / multiplicative decrease.
+
+    Every successful request raises the limit by 1/limit (about one per round of limit requests),
+    a throttled one multiplies it by decrease_factor. Only requests sent after the last decrease can
+    decrease the limit again, so the throttled answers of one round count once.
+    """
+
+    def __init__(self, max_limit=DEFAULT_RATE_LIMIT_CONCURRENCY, min_limit=1, decrease_factor=0.5):
+        """ Object initializer.
+
+        Args:
+            max_limit (int): highest and initial number of requests in flight
+            min_limit (int): lowest number of requests in flight
+            decrease_factor (float): factor applied to the limit on throttling
+        """
+
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.decrease_factor = decrease_factor
+        self.limit = float(max_limit)
+        self._in_flight = 0
+        self._decreased_at = None
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self):
+        """ Waits until one more request may be sent.
+
+        Returns:
+            float: time the request was admitted, to pass to release
+        """
+
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    def release(self, admitted_at, throttled=None):
+        """ Ends a request and adjusts the limit to its outcome.
+
+        Args:
+            admitted_at (float): value returned by acquire
+            throttled (bool): True if DNAC throttled the request, False if it was served, None to
+                              leave the limit unchanged (e.g. connection error)
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                if self._decreased_at is None or admitted_at >= self._decreased_at:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._decreased_at = time.monotonic()
+                    log.info("Throttled by DNAC, requests in flight limited to {}.".format(int(self.limit)))
+            elif throttled is not None and self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+
+class RateLimiter(object):
+    """ Rate limiter of one DNAC cluster, shared by every client of the process talking to it.
+
+    Requests first take a token of the bucket then a slot of the AIMD limiter. A 429 or 503 answer
+    lowers the concurrency, blocks the bucket for the Retry-After delay (or an exponential backoff)
+    and the request is sent again, up to max_retries times.
+
+    Usage:
+        limiter = RateLimiter.for_cluster("https://10.0.0.1")
+        response = limiter.send(lambda: session.request("GET", url))
+    """
+
+    _clusters = {}
+    _clusters_lock = threading.Lock()
+
+    def __init__(self, max_concurrency=DEFAULT_RATE_LIMIT_CONCURRENCY, max_rate=DEFAULT_RATE_LIMIT_RATE,
+                 max_retries=DEFAULT_RATE_LIMIT_RETRIES):
+        """ Object initializer.
+
+        Args:
+            max_concurrency (int): maximum number of requests in flight
+            max_rate (float): maximum number of requests per second, None for no bound
+            max_retries (int): number of times a throttled request is sent again
+        """
+
+        self.log = log
+        self.bucket = TokenBucket(rate=max_rate)
+        self.concurrency = AimdLimiter(max_limit=max_concurrency)
+        self.max_retries = max_retries
+
+    @classmethod
+    def for_cluster(cls, cluster, **kwargs):
+        """ Returns the rate limiter of a cluster, creating it on first use.
+
+        Args:
+            cluster (str): cluster identifier, e.g. the server url
+            kwargs (dict): RateLimiter arguments, used when the rate limiter is created
+
+        Returns:
+            RateLimiter: rate limiter shared by the clients of the cluster
+        """
+
+        with cls._clusters_lock:
+            limiter = cls._clusters.get(cluster)
+            if limiter is None:
+                limiter = cls._clusters[cluster] = cls(**kwargs)
+            return limiter
+
+    def send(self, request, retry=True):
+        """ Sends a request within the rate limits.
+
+        Args:
+            request (callable): sends the request and returns the requests.Response
+            retry (bool): if False, a throttled request is not sent again
+
+        Returns:
+            requests.Response: the first response that was not throttled, or the last throttled one
+        """
+
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            admitted_at = self.concurrency.acquire()
+            try:
+                response = request()
+            except Exception:
+                self.concurrency.release(admitted_at)
+                raise
+            throttled = response.status_code in THROTTLE_STATUS_CODES
+            self.concurrency.release(admitted_at, throttled=throttled)
+            if not throttled or not retry or attempt >= self.max_retries:
+                return response
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = DEFAULT_THROTTLE_BACKOFF * 2 ** attempt
+            delay = min(delay, MAX_THROTTLE_BACKOFF)
+            attempt += 1
+            self.log.warning("DNAC answered {}, retry {}/{} in {:.1f} seconds."
+                             .format(response.status_code, attempt, self.max_retries, delay))
+            self.bucket.block(delay)
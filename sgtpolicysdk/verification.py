@@ -0,0 +1,88 @@
+"""verification.py
+
+Bulk verification of expected Security Groups, contracts and policies against a DNAC inventory.
+
+The inventory is fetched once and indexed in a dict by key (name, tag, (producer, consumer, contract), ...), so
+thousands of expected items are checked in one pass instead of one request or one list scan per item.
+
+Notes:
+    Column size maintained throughout the file is 120 columns.
+"""
+__author__ = 'Pawan Singh <pawansi@cisco.com>'
+__copyright__ = 'Copyright 2022, Cisco Systems'
+
+import logging
+
+logger = logging.getLogger("Verification")
+log = logger
+
+
+def field_key(*fields):
+    """ Key function reading one field of an object, or a tuple of several fields.
+
+    Args:
+        fields (str): field names, e.g. "name" or "producerName", "consumerName", "contractName"
+
+    Returns:
+        callable: key function of an object (dict)
+    """
+
+    if len(fields) == 1:
+        field = fields[0]
+        return lambda obj: obj.get(field)
+    return lambda obj: tuple(obj.get(field) for field in fields)
+
+
+def index_inventory(inventory, key):
+    """ Indexes inventory objects by key, the first object of a key wins.
+
+    Args:
+        inventory (iterable): objects (dicts) read from DNAC, e.g. a paginated iterator
+        key (callable): key function of an object
+
+    Returns:
+        dict: key -> object
+    """
+
+    index = {}
+    for obj in inventory:
+        index.setdefault(key(obj), obj)
+    return index
+
+
+def verify_inventory(expected, inventory, key):
+    """ Checks the existence, and the attributes, of expected items in an inventory.
+
+    An expected item is either a key (e.g. a name) or an object (dict): the key of an object is computed with the
+    key function and each of its other fields is compared with the field of the inventory object.
+
+    Args:
+        expected (iterable): keys or objects expected in DNAC
+        inventory (iterable or dict): objects read from DNAC, or an index returned by index_inventory
+        key (callable): key function of an object
+
+    Returns:
+        dict: status (True when nothing is missing or mismatched), exist and missing (sets of keys), mismatches
+              (key -> {field: {'expected': value, 'actual': value}})
+    """
+
+    index = inventory if isinstance(inventory, dict) else index_inventory(inventory, key)
+    exist = set()
+    missing = set()
+    mismatches = {}
+    for item in expected:
+        item_key = key(item) if isinstance(item, dict) else item
+        actual = index.get(item_key)
+        if actual is None:
+            missing.add(item_key)
+            continue
+        exist.add(item_key)
+        if isinstance(item, dict):
+            diff = dict((field, {'expected': value, 'actual': actual.get(field)})
+                        for field, value in item.items() if actual.get(field) != value)
+            if diff:
+                mismatches[item_key] = diff
+    log.debug("Verified {} items: {} exist, {} missing, {} mismatched."
+              .format(len(exist) + len(missing), len(exist), len(missing), len(mismatches)))
+    return {'status': not missing and not mismatches, 'exist': exist, 'missing': missing,
+            'mismatches': mismatches}
@@ -0,0 +1,31 @@
+"""Unit tests of the DNA Center release resolution of sgtpolicysdk.api."""
+import unittest
+
+from sgtpolicysdk.api import DNACenterSGTPolicyAPI, resolve_api_version, load_api_version
+from sgtpolicysdk.config import DEFAULT_VERSION
+
+
+class ResolveApiVersionTest(unittest.TestCase):
+
+    def test_releases(self):
+        self.assertEqual(resolve_api_version('2.3.3'), 'v2_3_3')
+        self.assertEqual(resolve_api_version('2.3.4'), 'v2_3_4')
+        self.assertEqual(resolve_api_version('1.2.10'), 'v1_2_10')
+
+    def test_four_part_versions_keep_their_precedence(self):
+        self.assertEqual(resolve_api_version('2.2.3.3'), 'v2_3_3')
+        self.assertEqual(resolve_api_version('2.2.1.2'), 'v2_1_2')
+
+    def test_default_version(self):
+        self.assertEqual(resolve_api_version(DEFAULT_VERSION), 'v2_3_3')
+        self.assertEqual(load_api_version(DEFAULT_VERSION)[0].__module__, 'sgtpolicysdk.api.v2_3_3.task')
+
+    def test_unknown_version(self):
+        self.assertIsNone(resolve_api_version('9.9.9'))
+        self.assertIsNone(load_api_version('9.9.9'))
+        with self.assertRaises(ValueError):
+            DNACenterSGTPolicyAPI(server='192.0.2.1', username='u', password='p', version='9.9.9', connect=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Unit tests of sgtpolicysdk.auth.TokenManager."""
+import threading
+import time
+import unittest
+
+from sgtpolicysdk.auth import TokenManager
+
+
+class TokenManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.logins = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def login(self):
+        self.release.wait(5)
+        self.logins += 1
+        if self.fail:
+            raise IOError('login failed')
+
+    def tokens(self, **kwargs):
+        tokens = TokenManager(self.login, refresh_after=600, expires_after=900, background=False, **kwargs)
+        self.addCleanup(tokens.stop)
+        return tokens
+
+    def wait_for(self, condition):
+        deadline = time.time() + 5
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_refresh(self):
+        tokens = self.tokens()
+        self.assertIsNone(tokens.age())
+        self.assertTrue(tokens.refresh())
+        self.assertEqual(self.logins, 1)
+        self.assertLess(tokens.age(), 5)
+        self.assertFalse(tokens.refresh(min_age=60))
+        self.assertEqual(self.logins, 1)
+
+    def test_concurrent_refreshes_share_one_login(self):
+        tokens = self.tokens()
+        self.release.clear()
+        threads = [threading.Thread(target=tokens.refresh) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.logins, 1)
+
+    def test_ensure_valid(self):
+        tokens = self.tokens()
+        tokens.ensure_valid()
+        self.assertEqual(self.logins, 1)
+        tokens.ensure_valid()
+        self.assertEqual(self.logins, 1)
+        # Past refresh_after the token is still used while a background login runs
+        tokens.issued_at = time.time() - 700
+        self.release.clear()
+        tokens.ensure_valid()
+        self.assertEqual(self.logins, 1)
+        self.release.set()
+        self.wait_for(lambda: self.logins == 2 and tokens.age() < 5)
+        # Past expires_after the caller waits for the login
+        tokens.issued_at = time.time() - 1000
+        tokens.ensure_valid()
+        self.assertEqual(self.logins, 3)
+
+    def test_failed_background_login_keeps_the_token(self):
+        tokens = self.tokens(retry_interval=60)
+        tokens.refresh()
+        issued_at = tokens.issued_at = time.time() - 700
+        self.fail = True
+        self.assertTrue(tokens.refresh_in_background())
+        self.wait_for(lambda: self.logins == 2 and not tokens._flight.in_flight('login'))
+        self.assertEqual(tokens.issued_at, issued_at)
+        # Not retried before retry_interval
+        self.assertFalse(tokens.refresh_in_background())
+
+    def test_login_finishing_after_stop_is_dropped(self):
+        tokens = self.tokens()
+        tokens.refresh()
+        tokens.issued_at = time.time() - 700
+        self.release.clear()
+        self.assertTrue(tokens.refresh_in_background())
+        tokens.stop()
+        self.release.set()
+        self.wait_for(lambda: self.logins == 2 and not tokens._flight.in_flight('login'))
+        self.assertIsNone(tokens.issued_at)
+        self.assertFalse(tokens.refresh_in_background())
+
+    def test_restore(self):
+        tokens = self.tokens()
+        tokens.restore(time.time() - 100)
+        tokens.ensure_valid()
+        self.assertEqual(self.logins, 0)
+        self.assertGreaterEqual(tokens.age(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
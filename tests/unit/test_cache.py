@@ -0,0 +1,204 @@
+"""Unit tests of the in-memory caches of sgtpolicysdk.cache."""
+import unittest
+from unittest import mock
+
+from sgtpolicysdk.cache import TTLCache, SecurityGroupIndex, PolicyMatrixIndex
+
+
+class Clock(object):
+    """ time.monotonic replacement, advancing by step on every call. """
+
+    def __init__(self, now=100.0, step=0.0):
+        self.now = now
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def security_group(name, sg_id=None, tag=None):
+    return {'name': name, 'id': sg_id or 'id-' + name, 'securityGroupTag': tag, 'resourceVersion': 1}
+
+
+def policy(producer_id, consumer_id, policy_id=None):
+    return {'id': policy_id,
+            'producer': {'scalableGroup': [{'idRef': producer_id}]},
+            'consumer': {'scalableGroup': [{'idRef': consumer_id}]}}
+
+
+class TTLCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('sgtpolicysdk.cache.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_and_expiry(self):
+        cache = TTLCache(ttl=10)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=20)
+        self.assertEqual(cache.get('a'), 1)
+        self.clock.now += 10
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('missing', 'default'), 'default')
+        self.assertEqual(cache.get('b'), 2)
+        self.assertNotIn('a', cache)
+
+    def test_no_ttl_never_expires(self):
+        cache = TTLCache()
+        cache.set('a', 1)
+        self.clock.now += 10 ** 6
+        self.assertEqual(cache.get('a'), 1)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_size=2)
+        self.assertEqual(cache.set('a', 1), 0)
+        self.assertEqual(cache.set('b', 2), 0)
+        cache.get('a')
+        self.assertEqual(cache.set('c', 3), 1)
+        self.assertEqual(cache.keys(), ['a', 'c'])
+
+    def test_pop_and_clear(self):
+        cache = TTLCache()
+        cache.set('a', 1)
+        self.assertEqual(cache.pop('a'), 1)
+        self.assertIsNone(cache.pop('a'))
+        cache.set('b', 2)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class SecurityGroupIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('sgtpolicysdk.cache.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.inventory = [security_group('SG1'), security_group('SG2')]
+        self.fetch_all = mock.Mock(side_effect=lambda: list(self.inventory))
+        self.fetch_by_name = mock.Mock(side_effect=lambda name: [sg for sg in self.inventory if sg['name'] == name])
+
+    def index(self, **kwargs):
+        return SecurityGroupIndex(self.fetch_all, self.fetch_by_name, **kwargs)
+
+    def test_lookup_loads_once(self):
+        index = self.index(ttl=60)
+        self.assertEqual(index.lookup('SG1')['id'], 'id-SG1')
+        self.assertEqual(index.lookup('SG2')['id'], 'id-SG2')
+        self.assertIsNone(index.lookup('SG3'))
+        self.assertEqual(self.fetch_all.call_count, 1)
+        self.fetch_by_name.assert_not_called()
+
+    def test_load_expiry_reloads(self):
+        index = self.index(ttl=60)
+        index.lookup('SG1')
+        self.inventory.append(security_group('SG3'))
+        self.clock.now += 60
+        self.assertEqual(index.lookup('SG3')['id'], 'id-SG3')
+        self.assertEqual(self.fetch_all.call_count, 2)
+
+    def test_load_never_outlives_its_entries(self):
+        # Entries expire ttl after they were added, the load must not be considered fresher than them
+        for tick in range(20):
+            start = self.clock.now
+            self.clock.step = 0.001
+            index = self.index(ttl=60)
+            index.load()
+            self.clock.step = 0.0
+            self.clock.now = start + 59.995 + tick * 0.0005
+            self.assertEqual(index.lookup('SG1')['id'], 'id-SG1')
+            self.assertEqual(index.lookup('SG2')['id'], 'id-SG2')
+
+    def test_eviction_after_load_makes_index_incomplete(self):
+        index = self.index(ttl=60, max_size=2)
+        index.load()
+        self.inventory.append(security_group('SG3'))
+        index.add(security_group('SG3'))
+        # SG1, the least recently used entry, was evicted: it is queried, not reported absent
+        self.assertEqual(index.lookup('SG1')['id'], 'id-SG1')
+        self.fetch_by_name.assert_called_once_with('SG1')
+
+    def test_load_past_max_size_is_incomplete(self):
+        self.inventory.append(security_group('SG3'))
+        index = self.index(ttl=60, max_size=2)
+        self.assertEqual(index.lookup('SG1')['id'], 'id-SG1')
+        self.fetch_by_name.assert_called_once_with('SG1')
+
+    def test_invalidated_name_is_queried(self):
+        index = self.index(ttl=60)
+        index.load()
+        self.inventory[0] = security_group('SG1', sg_id='new-id')
+        index.invalidate('SG1')
+        self.assertEqual(index.lookup('SG1')['id'], 'new-id')
+        self.inventory.pop(0)
+        index.invalidate('SG1')
+        self.assertIsNone(index.lookup('SG1'))
+        self.assertEqual(self.fetch_all.call_count, 1)
+
+    def test_clear_reloads(self):
+        index = self.index(ttl=60)
+        index.load()
+        index.clear()
+        self.assertEqual(len(index), 0)
+        index.lookup('SG1')
+        self.assertEqual(self.fetch_all.call_count, 2)
+
+
+class PolicyMatrixIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('sgtpolicysdk.cache.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.policies = [policy('a', 'b', 'p1'), policy('b', 'a', 'p2')]
+        self.fetch_all = mock.Mock(side_effect=lambda: [dict(p) for p in self.policies])
+        self.index = PolicyMatrixIndex(self.fetch_all, ttl=60)
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup('a', 'b')['id'], 'p1')
+        self.assertEqual(self.index.lookup('b', 'a')['id'], 'p2')
+        self.assertIsNone(self.index.lookup('a', 'c'))
+        self.assertEqual(self.fetch_all.call_count, 1)
+
+    def test_ttl(self):
+        self.index.lookup('a', 'b')
+        self.clock.now += 60
+        self.index.lookup('a', 'b')
+        self.assertEqual(self.fetch_all.call_count, 2)
+
+    def test_added_policy_without_id_reloads(self):
+        self.index.lookup('a', 'b')
+        self.index.add(policy('a', 'c'))
+        self.policies.append(policy('a', 'c', 'p3'))
+        self.assertEqual(self.index.lookup('a', 'c')['id'], 'p3')
+        self.assertEqual(self.fetch_all.call_count, 2)
+
+    def test_add_before_load_is_ignored(self):
+        self.index.add(policy('a', 'c'))
+        self.assertEqual(len(self.index), 0)
+
+    def test_update_and_remove(self):
+        self.index.lookup('a', 'b')
+        updated = policy('a', 'b')
+        updated['policyStatus'] = 'DISABLED'
+        del updated['id']
+        self.index.update(updated)
+        self.assertEqual(self.index.lookup('a', 'b')['policyStatus'], 'DISABLED')
+        self.assertEqual(self.index.lookup('a', 'b')['id'], 'p1')
+        self.index.remove('a', 'b')
+        self.assertIsNone(self.index.lookup('a', 'b'))
+        self.assertEqual(self.fetch_all.call_count, 1)
+
+    def test_invalidate(self):
+        self.index.lookup('a', 'b')
+        self.index.invalidate()
+        self.index.lookup('a', 'b')
+        self.assertEqual(self.fetch_all.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Unit tests of the response cache, GET coalescing and login handling of sgtpolicysdk.client_manager."""
+import threading
+import time
+import unittest
+from unittest import mock
+
+from sgtpolicysdk.cache import ResponseCache
+from sgtpolicysdk.client_manager import ClientManager, DnacClientManager
+
+SG_PATH = "/dna/intent/api/v1/scalablegroup/access"
+CONTRACT_PATH = "/dna/intent/api/v1/contract/access"
+TASK_PATH = "/v1/task/{}"
+
+
+class FakeDnac(object):
+    """ Stub of ClientManager.call_api, recording the requests it answers. """
+
+    def __init__(self):
+        self.requests = []
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+
+    def __call__(self, method, resource_path, **kwargs):
+        with self.lock:
+            self.requests.append((method, resource_path))
+        if method == "GET" and "/task/" in resource_path:
+            task_id = resource_path.rsplit("/", 1)[1]
+            return {"response": {"id": task_id, "isError": False, "endTime": 1}}
+        if method == "GET":
+            self.release.wait(5)
+            return {"response": [{"name": "SG1", "requests": len(self.requests)}]}
+        return {"response": {"taskId": "task-{}".format(len(self.requests))}}
+
+    def count(self, method, resource_path):
+        with self.lock:
+            return self.requests.count((method, resource_path))
+
+
+class ClientTestCase(unittest.TestCase):
+
+    def client(self, **kwargs):
+        self.dnac = FakeDnac()
+        patcher = mock.patch.object(ClientManager, "call_api",
+                                    lambda client, method, resource_path, **kwargs: self.dnac(method, resource_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return DnacClientManager("192.0.2.1", "user", "password", connect=False, **kwargs)
+
+    def concurrent_gets(self, client, callers=5):
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(client.call_api("GET", SG_PATH)))
+                   for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, responses
+
+
+class ResponseCacheTest(ClientTestCase):
+
+    def test_gets_are_cached_per_path_and_params(self):
+        client = self.client(response_cache=True, coalesce_requests=False)
+        client.call_api("GET", SG_PATH)
+        client.call_api("GET", SG_PATH)
+        client.call_api("GET", SG_PATH, params={"name": "SG1"})
+        self.assertEqual(self.dnac.count("GET", SG_PATH), 2)
+
+    def test_write_drops_the_affected_families(self):
+        client = self.client(response_cache=True, coalesce_requests=False)
+        client.call_api("GET", SG_PATH)
+        client.call_api("GET", CONTRACT_PATH)
+        client.call_api("POST", CONTRACT_PATH, json={})
+        client.call_api("GET", SG_PATH)
+        client.call_api("GET", CONTRACT_PATH)
+        self.assertEqual(self.dnac.count("GET", SG_PATH), 1)
+        self.assertEqual(self.dnac.count("GET", CONTRACT_PATH), 2)
+
+    def test_completed_task_drops_the_families_of_its_write_once(self):
+        client = self.client(response_cache=True, coalesce_requests=False)
+        task_id = client.call_api("POST", SG_PATH, json=[])["response"]["taskId"]
+        client.call_api("GET", SG_PATH)
+        client.call_api("GET", CONTRACT_PATH)
+        client.call_api("GET", TASK_PATH.format(task_id))
+        self.assertEqual(len(client.response_cache), 1)
+        client.call_api("GET", SG_PATH)
+        client.call_api("GET", TASK_PATH.format(task_id))
+        client.call_api("GET", TASK_PATH.format("untracked"))
+        self.assertEqual(len(client.response_cache), 2)
+        self.assertEqual(self.dnac.count("GET", SG_PATH), 2)
+
+    def test_cached_responses_are_copies(self):
+        client = self.client(response_cache=ResponseCache(ttl=60), coalesce_requests=False)
+        client.call_api("GET", SG_PATH)["response"][0]["name"] = "changed"
+        self.assertEqual(client.call_api("GET", SG_PATH)["response"][0]["name"], "SG1")
+
+
+class CoalescingTest(ClientTestCase):
+
+    def test_identical_gets_in_flight_share_one_request(self):
+        client = self.client(coalesce_requests=True)
+        self.dnac.release.clear()
+        threads, responses = self.concurrent_gets(client)
+        time.sleep(0.1)
+        self.dnac.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.dnac.count("GET", SG_PATH), 1)
+        self.assertEqual(len(responses), 5)
+        # Every caller gets its own copy
+        responses[0]["response"][0]["name"] = "changed"
+        self.assertEqual(responses[1]["response"][0]["name"], "SG1")
+
+    def test_get_sent_after_a_write_does_not_join_an_earlier_get(self):
+        client = self.client(coalesce_requests=True)
+        self.dnac.release.clear()
+        threads, responses = self.concurrent_gets(client, callers=1)
+        time.sleep(0.1)
+        client.call_api("PUT", SG_PATH, json=[])
+        threads += self.concurrent_gets(client, callers=1)[0]
+        time.sleep(0.1)
+        self.dnac.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.dnac.count("GET", SG_PATH), 2)
+
+    def test_disabled(self):
+        client = self.client(coalesce_requests=False)
+        self.dnac.release.clear()
+        threads, responses = self.concurrent_gets(client, callers=3)
+        time.sleep(0.1)
+        self.dnac.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.dnac.count("GET", SG_PATH), 3)
+
+
+class LoginTest(unittest.TestCase):
+
+    def test_login_finishing_after_disconnect_is_dropped(self):
+        started, release = threading.Event(), threading.Event()
+
+        class Response(object):
+            headers = {"set-cookie": ClientManager.AUTHORIZATION_TOKEN + "=new"}
+
+        def call_api(client, method, resource_path, **kwargs):
+            started.set()
+            release.wait(5)
+            client.common_headers = {"Cookie": Response.headers["set-cookie"]}
+            return Response()
+        with mock.patch.object(ClientManager, "call_api", call_api):
+            client = DnacClientManager("192.0.2.1", "user", "password", connect=False)
+            login = threading.Thread(target=client.connect)
+            login.start()
+            started.wait(5)
+            client.disconnect()
+            release.set()
+            login.join(5)
+        self.assertNotIn("Cookie", client.common_headers)
+        self.assertIsNone(client._tokens.issued_at)
+        self.assertFalse(client._DnacClientManager__connected)
+
+
+if __name__ == '__main__':
+    unittest.main()
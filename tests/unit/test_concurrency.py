@@ -0,0 +1,101 @@
+"""Unit tests of sgtpolicysdk.concurrency.SingleFlight."""
+import threading
+import time
+import unittest
+
+from sgtpolicysdk.concurrency import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def run_concurrently(self, flight, fn, callers=5):
+        """ Starts callers threads sharing one call of fn, returns their (result, shared) or exception. """
+
+        outcomes = []
+        lock = threading.Lock()
+
+        def call():
+            try:
+                outcome = flight.share('key', fn)
+            except BaseException as error:
+                outcome = error
+            with lock:
+                outcomes.append(outcome)
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, outcomes
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return 'result'
+        threads, outcomes = self.run_concurrently(flight, fn)
+        while not flight.in_flight('key'):
+            pass
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(outcomes), [('result', False)] + [('result', True)] * 4)
+        self.assertFalse(flight.in_flight('key'))
+
+    def test_key_is_free_once_returned(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+        self.assertEqual(flight.do('key', lambda: 2), 2)
+
+    def test_exception_reaches_every_caller(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise ValueError('login failed')
+        threads, outcomes = self.run_concurrently(flight, fn, callers=3)
+        while not flight.in_flight('key'):
+            pass
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(outcomes), 3)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+    def test_base_exception_reaches_waiters_and_leader(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise KeyboardInterrupt()
+        threads, outcomes = self.run_concurrently(flight, fn, callers=3)
+        while not flight.in_flight('key'):
+            pass
+        # Let the other callers join the call before it raises
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(outcomes), 3)
+        self.assertTrue(all(isinstance(outcome, KeyboardInterrupt) for outcome in outcomes))
+        self.assertFalse(flight.in_flight('key'))
+
+    def test_start_runs_in_background_once(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        done = threading.Event()
+        self.assertTrue(flight.start('key', lambda: (release.wait(5), done.set())))
+        self.assertFalse(flight.start('key', done.set))
+        release.set()
+        self.assertTrue(done.wait(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Unit tests of the streaming JSON parsing of sgtpolicysdk.jsoncodec."""
+import json
+import unittest
+
+from sgtpolicysdk.jsoncodec import iter_items
+
+DOCUMENT = {
+    "response": [{
+        "acaGBPSummary": [
+            {"name": "SG1", "count": 1234567890, "ratio": -12.5e-3, "enabled": True, "note": None},
+            {"name": "héllo, wörld ✓ \"quoted\" [not] {an: array}", "ids": [1, 22, 333]},
+            98765,
+            "a,b]c",
+            [],
+            {},
+        ],
+    }],
+    "version": "1.0",
+}
+PATH = ("response", 0, "acaGBPSummary")
+
+
+def chunked(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class IterItemsTest(unittest.TestCase):
+
+    def test_every_chunk_boundary(self):
+        # Chunks cut numbers, strings, escapes and multi-byte UTF-8 characters at every position
+        data = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+        expected = DOCUMENT["response"][0]["acaGBPSummary"]
+        for size in range(1, len(data) + 1):
+            self.assertEqual(list(iter_items(chunked(data, size), PATH)), expected, size)
+
+    def test_str_chunks_and_whitespace(self):
+        data = json.dumps(DOCUMENT, indent=4)
+        self.assertEqual(list(iter_items(chunked(data, 7), PATH)), DOCUMENT["response"][0]["acaGBPSummary"])
+
+    def test_number_at_a_chunk_end(self):
+        self.assertEqual(list(iter_items([b'[12', b'34, 5', b'6.', b'5e', b'1]'])), [1234, 565.0])
+
+    def test_missing_path_or_not_an_array(self):
+        data = [json.dumps(DOCUMENT).encode("utf-8")]
+        self.assertEqual(list(iter_items(data, ("response", 1, "acaGBPSummary"))), [])
+        self.assertEqual(list(iter_items(data, ("missing",))), [])
+        self.assertEqual(list(iter_items(data, ("version",))), [])
+        self.assertEqual(list(iter_items([b'{"response": []}'], ("response",))), [])
+
+    def test_document_is_not_read_past_the_array(self):
+        read = []
+
+        def chunks():
+            for chunk in (b'{"response": [1, 2]', b', "other": ', b'[3]}'):
+                read.append(chunk)
+                yield chunk
+        self.assertEqual(list(iter_items(chunks(), ("response",))), [1, 2])
+        self.assertEqual(len(read), 1)
+
+    def test_items_are_yielded_as_they_arrive(self):
+        items = iter_items(iter([b'[{"a": 1},', b' {"b"']))
+        self.assertEqual(next(items), {"a": 1})
+
+    def test_invalid_document(self):
+        with self.assertRaises(ValueError):
+            list(iter_items([b'[1, 2', b' 3]']))
+        with self.assertRaises(ValueError):
+            list(iter_items([b'[{"a": 1}']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Unit tests of the paginated fetches of sgtpolicysdk.pagination."""
+import threading
+import unittest
+
+from sgtpolicysdk.pagination import fetch_all, iter_pages, paginate
+
+
+class Collection(object):
+    """ fetch_page stub over a list, recording the pages requested. """
+
+    def __init__(self, size, fail_at=None):
+        self.items = list(range(size))
+        self.fail_at = fail_at
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, offset, limit):
+        with self.lock:
+            self.requests.append((offset, limit))
+        if self.fail_at is not None and offset >= self.fail_at:
+            raise IOError('page {} failed'.format(offset))
+        return self.items[offset:offset + limit]
+
+
+class FetchAllTest(unittest.TestCase):
+
+    def test_pages_planned_from_the_total(self):
+        collection = Collection(1000)
+        self.assertEqual(fetch_all(collection, 1000, page_size=100, max_workers=4), collection.items)
+        # The last planned page is full, so one more page tells the collection did not grow
+        self.assertEqual(sorted(collection.requests), [(offset, 100) for offset in range(0, 1100, 100)])
+
+    def test_partial_last_page(self):
+        collection = Collection(950)
+        self.assertEqual(fetch_all(collection, 950, page_size=100), collection.items)
+        self.assertEqual(len(collection.requests), 10)
+
+    def test_growth_past_the_count(self):
+        collection = Collection(1234)
+        self.assertEqual(fetch_all(collection, 1000, page_size=100, max_workers=3), collection.items)
+
+    def test_shrink_below_the_count(self):
+        collection = Collection(420)
+        self.assertEqual(fetch_all(collection, 1000, page_size=100), collection.items)
+
+    def test_unknown_total_walks_serially(self):
+        collection = Collection(250)
+        self.assertEqual(fetch_all(collection, 0, page_size=100), collection.items)
+        self.assertEqual(collection.requests, [(0, 100), (100, 100), (200, 100)])
+
+    def test_first_exception_in_offset_order(self):
+        collection = Collection(1000, fail_at=300)
+        with self.assertRaises(IOError) as raised:
+            fetch_all(collection, 1000, page_size=100)
+        self.assertEqual(str(raised.exception), 'page 300 failed')
+
+
+class IterPagesTest(unittest.TestCase):
+
+    def test_pages(self):
+        for prefetch in (True, False):
+            collection = Collection(250)
+            self.assertEqual(list(iter_pages(collection, page_size=100, prefetch=prefetch)),
+                             [list(range(0, 100)), list(range(100, 200)), list(range(200, 250))])
+
+    def test_exact_multiple_yields_no_empty_page(self):
+        for prefetch in (True, False):
+            self.assertEqual(len(list(iter_pages(Collection(200), page_size=100, prefetch=prefetch))), 2)
+
+    def test_paginate_from_an_offset(self):
+        self.assertEqual(list(paginate(Collection(250), page_size=100, offset=120)), list(range(120, 250)))
+
+    def test_error_raised_when_its_page_is_reached(self):
+        pages = iter_pages(Collection(500, fail_at=100), page_size=100)
+        self.assertEqual(next(pages), list(range(100)))
+        with self.assertRaises(IOError):
+            next(pages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Unit tests of the task polling of sgtpolicysdk.polling."""
+import itertools
+import threading
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from sgtpolicysdk.polling import (
+    FixedInterval, ExponentialBackoff, AdaptiveBackoff, TaskPoller, TaskFuture, is_task_complete, task_duration,
+)
+
+RUNNING = {'isError': False, 'progress': 'running'}
+DONE = {'isError': False, 'progress': 'done', 'endTime': 2000, 'startTime': 500}
+
+
+class StrategyTest(unittest.TestCase):
+
+    def test_fixed_interval(self):
+        self.assertEqual(list(itertools.islice(FixedInterval(2).delays(), 3)), [2, 2, 2])
+
+    def test_exponential_backoff(self):
+        strategy = ExponentialBackoff(initial_interval=0.5, factor=2, max_interval=3, jitter=0)
+        self.assertEqual(list(itertools.islice(strategy.delays(), 5)), [0.5, 1, 2, 3, 3])
+
+    def test_adaptive_backoff_starts_with_the_average(self):
+        strategy = AdaptiveBackoff(initial_interval=0.5, factor=2, max_interval=10, jitter=0, smoothing=0.5)
+        self.assertEqual(next(strategy.delays('create')), 0.5)
+        strategy.observe('create', 4)
+        strategy.observe('create', 2)
+        self.assertEqual(strategy.expected_duration('create'), 3)
+        self.assertEqual(list(itertools.islice(strategy.delays('create'), 3)), [3, 0.5, 1])
+
+    def test_task_helpers(self):
+        self.assertFalse(is_task_complete(RUNNING))
+        self.assertTrue(is_task_complete(DONE))
+        self.assertTrue(is_task_complete({'isError': True}))
+        self.assertEqual(task_duration(DONE, 9), 1.5)
+        self.assertEqual(task_duration(RUNNING, 9), 9)
+
+
+class TaskPollerTest(unittest.TestCase):
+
+    def poller(self, get_task):
+        poller = TaskPoller(get_task, poll_strategy=FixedInterval(0.01))
+        self.addCleanup(poller.close)
+        return poller
+
+    def test_resolves_completed_tasks(self):
+        checks = {}
+
+        def get_task(task_id):
+            checks[task_id] = checks.get(task_id, 0) + 1
+            return dict(DONE, id=task_id) if checks[task_id] >= 3 else RUNNING
+        poller = self.poller(get_task)
+        futures = [poller.track('t{}'.format(i), timeout=5) for i in range(10)]
+        self.assertEqual([future.result(5)['id'] for future in futures], ['t{}'.format(i) for i in range(10)])
+        self.assertEqual(set(checks.values()), {3})
+
+    def test_timeout_resolves_false(self):
+        poller = self.poller(lambda task_id: RUNNING)
+        self.assertIs(poller.track('t', timeout=0.05).result(5), False)
+
+    def test_transient_errors_are_retried(self):
+        responses = iter([IOError('reset'), IOError('reset'), DONE])
+
+        def get_task(task_id):
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        poller = self.poller(get_task)
+        self.assertEqual(poller.track('t', timeout=5).result(5), DONE)
+
+    def test_error_at_the_timeout_fails_the_future(self):
+        def get_task(task_id):
+            raise IOError('down')
+        poller = self.poller(get_task)
+        future = poller.track('t', timeout=0.05)
+        with self.assertRaises(IOError):
+            future.result(5)
+
+    def test_close_cancels_tracked_tasks(self):
+        poller = TaskPoller(lambda task_id: RUNNING, poll_strategy=FixedInterval(10))
+        future = poller.track('t', timeout=60)
+        poller.close()
+        self.assertTrue(future.cancelled())
+
+
+class TaskFutureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_resolved(self):
+        future = TaskFuture.resolved({'status': True})
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), {'status': True})
+
+    def test_handler_result(self):
+        task_future = Future()
+        future = TaskFuture(task_future, lambda task: {'status': not task['isError']}, self.executor, task_id='t')
+        called = threading.Event()
+        future.add_done_callback(lambda done: called.set())
+        task_future.set_result(DONE)
+        self.assertEqual(future.result(5), {'status': True})
+        self.assertTrue(called.wait(5))
+
+    def test_handler_exception(self):
+        def handler(task):
+            raise KeyError('id')
+        task_future = Future()
+        future = TaskFuture(task_future, handler, self.executor)
+        task_future.set_result(DONE)
+        with self.assertRaises(KeyError):
+            future.result(5)
+
+    def test_task_exception_and_cancellation(self):
+        failed, cancelled = Future(), Future()
+        failed_future = TaskFuture(failed, lambda task: task, self.executor)
+        cancelled_future = TaskFuture(cancelled, lambda task: task, self.executor)
+        failed.set_exception(IOError('down'))
+        cancelled.cancel()
+        self.assertIsInstance(failed_future.exception(5), IOError)
+        self.assertTrue(cancelled_future.cancelled())
+
+    def test_chained_follow_up_task(self):
+        task_future, follow_up = Future(), Future()
+        chained = TaskFuture(follow_up, lambda task: {'status': True, 'step': 2}, self.executor)
+        future = TaskFuture(task_future, lambda task: chained, self.executor)
+        task_future.set_result(DONE)
+        follow_up.set_result(DONE)
+        self.assertEqual(future.result(5), {'status': True, 'step': 2})
+
+    def test_chained_cancellation(self):
+        task_future, follow_up = Future(), Future()
+        chained = TaskFuture(follow_up, lambda task: task, self.executor)
+        future = TaskFuture(task_future, lambda task: chained, self.executor)
+        task_future.set_result(DONE)
+        follow_up.cancel()
+        self.assertTrue(chained.cancelled())
+        for _ in range(500):
+            if future.done():
+                break
+            threading.Event().wait(0.01)
+        self.assertTrue(future.cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
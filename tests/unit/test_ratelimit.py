@@ -0,0 +1,129 @@
+"""Unit tests of the client side rate limiting of sgtpolicysdk.ratelimit."""
+import threading
+import time
+import unittest
+from email.utils import formatdate
+
+from sgtpolicysdk.ratelimit import AimdLimiter, RateLimiter, TokenBucket, parse_retry_after
+
+
+class Response(object):
+
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {} if retry_after is None else {'Retry-After': retry_after}
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+
+    def test_delay_seconds(self):
+        self.assertEqual(parse_retry_after('5'), 5.0)
+        self.assertEqual(parse_retry_after(' 1.5 '), 1.5)
+        self.assertEqual(parse_retry_after('-3'), 0.0)
+
+    def test_http_date(self):
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 30, usegmt=True)), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(''))
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_no_rate_only_blocks(self):
+        bucket = TokenBucket(rate=None)
+        start = time.monotonic()
+        for _ in range(100):
+            bucket.acquire()
+        bucket.block(0.05)
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+
+class AimdLimiterTest(unittest.TestCase):
+
+    def test_decrease_once_per_round(self):
+        limiter = AimdLimiter(max_limit=8)
+        admitted = [limiter.acquire() for _ in range(4)]
+        for admitted_at in admitted:
+            limiter.release(admitted_at, throttled=True)
+        self.assertEqual(limiter.limit, 4)
+        limiter.release(limiter.acquire(), throttled=True)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_additive_increase_and_bounds(self):
+        limiter = AimdLimiter(max_limit=4, min_limit=1)
+        for _ in range(5):
+            limiter.release(limiter.acquire(), throttled=True)
+        self.assertEqual(limiter.limit, 1)
+        limiter.release(limiter.acquire(), throttled=False)
+        self.assertEqual(limiter.limit, 2)
+        limiter.release(limiter.acquire(), throttled=None)
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(20):
+            limiter.release(limiter.acquire(), throttled=False)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_acquire_waits_for_a_slot(self):
+        limiter = AimdLimiter(max_limit=1)
+        admitted_at = limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(admitted_at, throttled=False)
+        self.assertTrue(acquired.wait(5))
+        thread.join(5)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def limiter(self, **kwargs):
+        return RateLimiter(max_concurrency=4, max_rate=None, **kwargs)
+
+    def test_throttled_requests_are_retried(self):
+        responses = iter([Response(429, '0'), Response(503, '0'), Response(200)])
+        limiter = self.limiter(max_retries=3)
+        self.assertEqual(limiter.send(lambda: next(responses)).status_code, 200)
+        self.assertEqual(limiter.concurrency.limit, 2)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+
+    def test_retries_are_bounded(self):
+        sent = []
+        limiter = self.limiter(max_retries=2)
+        response = limiter.send(lambda: sent.append(1) or Response(429, '0'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(sent), 3)
+        response = limiter.send(lambda: sent.append(1) or Response(429, '0'), retry=False)
+        self.assertEqual(len(sent), 4)
+
+    def test_exception_releases_the_slot(self):
+        limiter = self.limiter()
+
+        def request():
+            raise IOError('reset')
+        with self.assertRaises(IOError):
+            limiter.send(request)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+        self.assertEqual(limiter.concurrency.limit, 4)
+
+    def test_for_cluster_shares_one_limiter(self):
+        limiter = RateLimiter.for_cluster('https://192.0.2.10', max_concurrency=3)
+        self.assertIs(RateLimiter.for_cluster('https://192.0.2.10'), limiter)
+        self.assertIsNot(RateLimiter.for_cluster('https://192.0.2.11'), limiter)
+        self.assertEqual(limiter.concurrency.max_limit, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
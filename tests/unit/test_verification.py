@@ -0,0 +1,45 @@
+"""Unit tests of the bulk inventory verification of sgtpolicysdk.verification."""
+import unittest
+
+from sgtpolicysdk.verification import field_key, index_inventory, verify_inventory
+
+INVENTORY = [
+    {'name': 'SG1', 'securityGroupTag': 1001, 'description': 'first'},
+    {'name': 'SG2', 'securityGroupTag': 1002, 'description': 'second'},
+    {'name': 'SG1', 'securityGroupTag': 9999, 'description': 'duplicate'},
+]
+
+
+class VerifyInventoryTest(unittest.TestCase):
+
+    def test_keys(self):
+        result = verify_inventory(['SG1', 'SG3'], INVENTORY, field_key('name'))
+        self.assertEqual(result, {'status': False, 'exist': {'SG1'}, 'missing': {'SG3'}, 'mismatches': {}})
+        self.assertTrue(verify_inventory(['SG1', 'SG2'], INVENTORY, field_key('name'))['status'])
+
+    def test_objects_are_compared_field_by_field(self):
+        expected = [{'name': 'SG1', 'securityGroupTag': 1001},
+                    {'name': 'SG2', 'securityGroupTag': 2002, 'description': 'second'}]
+        result = verify_inventory(expected, INVENTORY, field_key('name'))
+        self.assertFalse(result['status'])
+        self.assertEqual(result['exist'], {'SG1', 'SG2'})
+        self.assertEqual(result['mismatches'], {'SG2': {'securityGroupTag': {'expected': 2002, 'actual': 1002}}})
+
+    def test_tuple_keys_and_prebuilt_index(self):
+        key = field_key('name', 'securityGroupTag')
+        index = index_inventory(INVENTORY, key)
+        self.assertEqual(len(index), 3)
+        result = verify_inventory([('SG1', 9999), ('SG2', 1001)], index, key)
+        self.assertEqual(result['exist'], {('SG1', 9999)})
+        self.assertEqual(result['missing'], {('SG2', 1001)})
+
+    def test_first_object_of_a_key_wins(self):
+        self.assertEqual(index_inventory(INVENTORY, field_key('name'))['SG1']['description'], 'first')
+
+    def test_inventory_iterator_is_read_once(self):
+        result = verify_inventory(['SG2'], iter(INVENTORY), field_key('name'))
+        self.assertTrue(result['status'])
+
+
+if __name__ == '__main__':
+    unittest.main()